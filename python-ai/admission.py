@@ -0,0 +1,170 @@
+"""
+ADMISSION CONTROL
+Batas concurrency per route dengan antrian tunggu terbatas. Request yang
+tidak bisa mulai dalam max wait ditolak cepat (429/503 + Retry-After)
+daripada ikut menumpuk dan membuat semua request lambat. Route prioritas
+(mis. /health, /ai/cri-only) punya lane sendiri yang tidak ikut antri di
+belakang route berat.
+"""
+
+import math
+import threading
+import time
+
+
+class Rejected(Exception):
+    """Request ditolak admission control"""
+
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Lane:
+    """Concurrency limit + antrian FIFO terbatas untuk satu route"""
+
+    def __init__(self, concurrency, queue, max_wait_ms):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.max_wait = max_wait_ms / 1000
+        self.cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.next_ticket = 0
+        self.serving = 0
+        self.abandoned = set()
+        self.service_ewma = None
+        self.stats = {
+            'admitted': 0, 'rejected_queue_full': 0, 'rejected_timeout': 0,
+            'wait_ms_total': 0.0, 'max_queue_depth': 0
+        }
+
+    def retry_after(self):
+        """Perkiraan detik sampai ada slot: rata-rata service time x antrian per slot"""
+        service = self.service_ewma or 1.0
+        return max(1, math.ceil(service * (self.waiting + 1) / self.concurrency))
+
+    def acquire(self):
+        started = time.perf_counter()
+        with self.cond:
+            if self.active < self.concurrency and self.waiting == 0:
+                self.active += 1
+                self.stats['admitted'] += 1
+                return
+            if self.waiting >= self.queue:
+                self.stats['rejected_queue_full'] += 1
+                raise Rejected(429, 'queue full', self.retry_after())
+
+            # FIFO: tiket antrian dilayani berurutan
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.waiting += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self.waiting)
+            deadline = started + self.max_wait
+            try:
+                while not (self.active < self.concurrency and ticket == self.serving):
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self.stats['rejected_timeout'] += 1
+                        raise Rejected(503, 'max wait exceeded', self.retry_after())
+                    self.cond.wait(remaining)
+            except Rejected:
+                # Tiket yang menyerah dilewati agar antrian di belakangnya tidak macet
+                self.abandoned.add(ticket)
+                self._advance()
+                raise
+            finally:
+                self.waiting -= 1
+
+            self.serving += 1
+            self._advance()
+            self.active += 1
+            self.stats['admitted'] += 1
+            self.stats['wait_ms_total'] += (time.perf_counter() - started) * 1000
+
+    def _advance(self):
+        while self.serving in self.abandoned:
+            self.abandoned.discard(self.serving)
+            self.serving += 1
+        self.cond.notify_all()
+
+    def release(self, service_seconds):
+        with self.cond:
+            self.active -= 1
+            if self.service_ewma is None:
+                self.service_ewma = service_seconds
+            else:
+                self.service_ewma += 0.2 * (service_seconds - self.service_ewma)
+            self.cond.notify_all()
+
+    def snapshot(self):
+        with self.cond:
+            admitted = self.stats['admitted']
+            return {
+                'concurrency': self.concurrency,
+                'queue_limit': self.queue,
+                'max_wait_ms': self.max_wait * 1000,
+                'active': self.active,
+                'queue_depth': self.waiting,
+                **self.stats,
+                'wait_ms_total': round(self.stats['wait_ms_total'], 2),
+                'wait_ms_avg': round(self.stats['wait_ms_total'] / admitted, 3) if admitted else 0,
+                'service_ms_ewma': round(self.service_ewma * 1000, 2) if self.service_ewma else None
+            }
+
+
+class AdmissionController:
+    """
+    Admission per route
+
+    Args:
+        routes: {rule: {'concurrency', 'queue', 'max_wait_ms'}} untuk route berat;
+            key 'METHOD rule' (mis. 'POST /ai/pending') hanya membatasi method itu
+        priority_routes: route dengan lane prioritas (tidak antri di belakang
+            route berat; hanya dibatasi priority_concurrency tanpa antrian)
+        priority_concurrency: batas concurrency lane prioritas
+    Route yang tidak terdaftar tidak dibatasi.
+    """
+
+    def __init__(self, routes, priority_routes=(), priority_concurrency=16):
+        self._lanes = {rule: _Lane(**cfg) for rule, cfg in routes.items()}
+        priority = _Lane(priority_concurrency, 0, 0)
+        for rule in priority_routes:
+            self._lanes[rule] = priority
+        self.priority_routes = list(priority_routes)
+
+    def acquire(self, rule, method=None):
+        """
+        Tunggu slot untuk route; raise Rejected jika antrian penuh / terlalu lama
+
+        Returns:
+            token untuk release(), atau None jika route tidak dibatasi
+        """
+        lane = self._lanes.get(f'{method} {rule}') if method else None
+        if lane is None:
+            lane = self._lanes.get(rule)
+        if lane is None:
+            return None
+        lane.acquire()
+        return lane, time.perf_counter()
+
+    def release(self, token):
+        if token is None:
+            return
+        lane, started = token
+        lane.release(time.perf_counter() - started)
+
+    def snapshot(self):
+        report = {}
+        for rule, lane in self._lanes.items():
+            if rule in self.priority_routes:
+                continue
+            report[rule] = lane.snapshot()
+        if self.priority_routes:
+            report['priority_lane'] = {
+                'routes': self.priority_routes,
+                **self._lanes[self.priority_routes[0]].snapshot()
+            }
+        return report
@@ -3,26 +3,173 @@ AI Service API - Flask Server
 Menyediakan endpoint untuk AI Assignment System
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import sys
 import os
+import hmac
+import threading
 
 # Import AI Assignment System dari file yang sudah ada
 # Pastikan file integrated_assignment.py ada di folder yang sama
 from integrated_assignment import AIAssignmentSystem, CONFIG
+from job_queue import JobQueue
+from singleflight import SingleFlight
+from model_registry import ModelRegistry
+from csv_cache import cache_stats as csv_cache_stats
+from profiler import LiveProfiler
+from admission import AdmissionController, Rejected
+from roster_cache import RosterCache, parse_workload
+from shared_cache import make_cache
+from shadow import make_shadow
+from pending_rerank import PendingTicketBoard
+from dispatch import make_scheduler, score_tickets
+from serialization import (COMPACT_FIELDS, SerializationStats, dumps_json, encode,
+                           parse_fields, select_fields, to_builtin, wants_msgpack)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS untuk komunikasi dengan Node.js
 
-# Initialize AI System sekali saat startup
+# Cache stem / vector / CRI / roster; backend shm atau kv dipakai bersama replica lain
+shared_cache = make_cache(CONFIG['shared_cache'])
+
+# Initialize AI System sekali saat startup; reload berikutnya lewat registry
 print("Initializing AI Assignment System...")
-ai_system = AIAssignmentSystem(
-    data_olah_path=CONFIG['data_olah'],
-    data_cri_path=CONFIG['data_cri']
+registry = ModelRegistry(
+    factory=lambda: AIAssignmentSystem(
+        data_olah_path=CONFIG['data_olah'],
+        data_cri_path=CONFIG['data_cri'],
+        cache=shared_cache
+    ),
+    watch_paths=CONFIG['model_artifacts'].values()
 )
+if CONFIG['hot_reload']['watch']:
+    registry.start_watching(CONFIG['hot_reload']['interval_seconds'])
 print("✓ AI System ready!")
 
+# Deduplikasi request identik yang sedang diproses bersamaan
+inflight = SingleFlight()
+
+# Scorer alternatif di lane background (None jika CONFIG['shadow'] tidak aktif)
+shadow = make_shadow(CONFIG['shadow'], CONFIG['tsm_weights'],
+                     CONFIG['selection_weights'], CONFIG['top_k_candidates'])
+
+# Ukuran payload dan waktu serialisasi per route
+serialization_stats = SerializationStats()
+
+def _respond(payload, status=200):
+    """
+    Response sukses lewat encoder cepat (JSON, atau MessagePack jika diminta
+    lewat header Accept); ukuran dan waktu serialisasi dicatat per route
+    """
+    body, mimetype, fmt, elapsed = encode(payload, wants_msgpack(request.headers.get('Accept')))
+    serialization_stats.record(request.url_rule.rule, fmt, len(body), elapsed)
+    
+    resp = Response(body, status=status, mimetype=mimetype)
+    resp.headers['X-Payload-Bytes'] = str(len(body))
+    resp.headers['X-Serialize-Ms'] = f"{elapsed * 1000:.3f}"
+    return resp
+
+def _requested_fields(data, default=None):
+    """Field yang diminta caller ("fields" di body/query); "compact": true memakai default"""
+    fields = parse_fields(data.get('fields') or request.args.get('fields'))
+    if fields is None and (data.get('compact') is True or request.args.get('compact') == '1'):
+        fields = default
+    return fields
+
+# Admission control: request yang tidak bisa mulai dalam max wait ditolak cepat
+admission = AdmissionController(
+    CONFIG['admission']['routes'],
+    CONFIG['admission']['priority_routes'],
+    CONFIG['admission']['priority_concurrency']
+)
+
+@app.before_request
+def _admit_request():
+    if request.url_rule is None:
+        return None
+    try:
+        request.environ['ai.admission'] = admission.acquire(request.url_rule.rule, request.method)
+    except Rejected as e:
+        resp = jsonify({
+            'success': False,
+            'error': f'Service overloaded ({e.reason}), retry later',
+            'retry_after': e.retry_after
+        })
+        resp.status_code = e.status
+        resp.headers['Retry-After'] = str(e.retry_after)
+        return resp
+    return None
+
+@app.teardown_request
+def _release_request(exc=None):
+    admission.release(request.environ.pop('ai.admission', None))
+
+# Profiler on-demand (/debug/profile); hook request hanya aktif saat ada sesi
+live_profiler = LiveProfiler()
+
+@app.before_request
+def _profile_request_start():
+    if live_profiler.busy and not request.path.startswith('/debug/'):
+        request.environ['ai.profiled'] = True
+        live_profiler.request_started()
+
+@app.teardown_request
+def _profile_request_end(exc=None):
+    if request.environ.get('ai.profiled'):
+        live_profiler.request_finished()
+
+# Roster inline per roster_version: jalur request tidak memanggil balik Node
+roster_cache = RosterCache(**CONFIG['roster_cache'], shared=shared_cache)
+
+class RosterError(Exception):
+    def __init__(self, message, status=400, code=None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+def _resolve_roster(data):
+    """
+    Roster dan workload inline dari body request
+    
+    - "roster": [...] disimpan (versi dari "roster_version" atau hash isi)
+    - "roster_version" saja: pakai snapshot yang sudah di-cache; 409 jika
+      tidak dikenal (caller mengirim ulang dengan roster lengkap)
+    - "workload": {engineer: tiket In Progress} opsional
+    Tanpa keduanya, roster diambil dari API employees seperti biasa.
+    
+    Returns:
+        (RosterSnapshot atau None, open_counts atau None)
+    """
+    records = data.get('roster')
+    version = data.get('roster_version')
+    snapshot = None
+    try:
+        if records is not None:
+            snapshot = roster_cache.put(records, version)
+        elif version is not None:
+            snapshot = roster_cache.get(version)
+            if snapshot is None:
+                raise RosterError(f'unknown roster_version {version}, resend with roster',
+                                  409, 'roster_version_unknown')
+        
+        workload = data.get('workload')
+        open_counts = parse_workload(workload) if workload is not None else None
+    except ValueError as e:
+        raise RosterError(str(e))
+    return snapshot, open_counts
+
+def _roster_error_response(e):
+    body = {'success': False, 'error': str(e)}
+    if e.code:
+        body['code'] = e.code
+    return jsonify(body), e.status
+
+def _request_key(route, version, ticket_text, request_type, urgency, *extra):
+    """Key normalisasi request untuk single-flight"""
+    return (route, version, ' '.join(ticket_text.split()).lower(),
+            request_type.strip().lower(), urgency, *extra)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -32,6 +179,122 @@ def health_check():
         'version': '1.0'
     })
 
+def _sharding_info():
+    shards = registry.current.system.tsm_calculator.shards
+    return shards.info() if shards is not None else None
+
+@app.route('/ai/metrics', methods=['GET'])
+def metrics():
+    """Metrics runtime service"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'singleflight': inflight.snapshot(),
+            'tag_index': registry.current.system.tsm_calculator.tag_index_info(),
+            'sharding': _sharding_info(),
+            'roster_cache': roster_cache.info(),
+            'shared_cache': shared_cache.info() if shared_cache is not None else None,
+            'csv_cache': csv_cache_stats(),
+            'serialization': serialization_stats.snapshot(),
+            'admission': admission.snapshot()
+        }
+    })
+
+@app.route('/ai/shadow', methods=['GET'])
+def shadow_summary():
+    """Agreement dan latency scorer shadow terhadap keputusan primary"""
+    return jsonify({
+        'success': True,
+        'data': shadow.summary() if shadow is not None else {'enabled': False}
+    })
+
+@app.route('/ai/tag-index/recall', methods=['POST'])
+def tag_index_recall():
+    """
+    Recall@k kandidat tag index terhadap full scan
+    
+    Dihitung juga saat pruning belum aktif; dasar untuk menyalakan
+    CONFIG['tag_index']['enabled'].
+    
+    Request body:
+    {
+        "ticket_texts": ["...", "..."],
+        "k": 5  // opsional, default top_k_candidates
+    }
+    """
+    data = request.get_json() or {}
+    ticket_texts = data.get('ticket_texts')
+    
+    if not isinstance(ticket_texts, list) or len(ticket_texts) == 0:
+        return jsonify({
+            'success': False,
+            'error': 'ticket_texts must be a non-empty array'
+        }), 400
+    
+    report = registry.current.system.tsm_calculator.tag_index_recall(
+        ticket_texts, data.get('k')
+    )
+    return jsonify({
+        'success': True,
+        'data': report
+    })
+
+def _process_rss_bytes():
+    """RSS proses saat ini (Linux /proc), fallback ke peak RSS dari getrusage"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return None
+
+@app.route('/ai/memory', methods=['GET'])
+def memory_report():
+    """RSS proses dan perkiraan bytes per komponen model yang aktif"""
+    components = registry.current.system.memory_report()
+    return jsonify({
+        'success': True,
+        'data': {
+            'rss_bytes': _process_rss_bytes(),
+            'components': components,
+            'components_total_bytes': sum(
+                sum(parts.values()) for parts in components.values()
+            )
+        }
+    })
+
+@app.route('/ai/model', methods=['GET'])
+def model_info():
+    """Versi snapshot model yang aktif"""
+    return jsonify({
+        'success': True,
+        'data': registry.info()
+    })
+
+@app.route('/ai/reload', methods=['POST'])
+def reload_models():
+    """
+    Reload artifact model di background lalu swap snapshot secara atomik.
+    Request yang sedang berjalan selesai dengan snapshot lama.
+    """
+    if not registry.reload_async():
+        return jsonify({
+            'success': False,
+            'error': 'reload already in progress'
+        }), 409
+    
+    return jsonify({
+        'success': True,
+        'message': 'reload started',
+        'current_version': registry.current.version
+    }), 202
+
 @app.route('/ai/assign', methods=['POST'])
 def assign_engineer():
     """
@@ -41,7 +304,13 @@ def assign_engineer():
     {
         "ticket_text": "Instalasi server database",
         "request_type": "Server & Database Request",
-        "urgency": "High"
+        "urgency": "High",
+        "budget_ms": 800,  // opsional (atau header X-Latency-Budget-Ms): degraded scoring
+        "roster": [{"name": "...", "years_of_service": 3, "on_leave": false}],  // opsional
+        "roster_version": "v42",  // opsional: versi roster inline / yang sudah di-cache
+        "workload": {"Engineer Name": 2},  // opsional: tiket In Progress per engineer
+        "fields": ["selected_engineer", "cri_analysis.risk_level"],  // opsional
+        "compact": true  // opsional: hanya field yang dipakai Node
     }
     
     Response:
@@ -55,6 +324,20 @@ def assign_engineer():
             "recommendation_reason": "..."
         }
     }
+    
+    Dengan header Accept: application/msgpack response di-encode MessagePack.
+    
+    Dengan budget_ms, data berisi "degradation" (stage yang di-degrade, urut
+    biaya terukur); jika budget tidak cukup untuk roster, selected_engineer null
+    (CRI-only).
+    
+    tsm_analysis dan setiap top_candidates berisi "top_terms": term tiket yang
+    paling menyumbang skill score ({term, contribution, share}); kosong jika
+    skill scoring di-degrade.
+    
+    Dengan roster / roster_version tidak ada panggilan balik ke /api/employees;
+    response menyertakan "roster_version" untuk dipakai di request berikutnya.
+    roster_version yang tidak dikenal -> 409 (code roster_version_unknown).
     """
     try:
         data = request.get_json()
@@ -81,6 +364,23 @@ def assign_engineer():
         if urgency not in ['Low', 'Medium', 'High']:
             urgency = 'Medium'
         
+        budget_ms = data.get('budget_ms', request.headers.get('X-Latency-Budget-Ms'))
+        if budget_ms is not None:
+            try:
+                budget_ms = float(budget_ms)
+            except (TypeError, ValueError):
+                budget_ms = -1
+            if budget_ms <= 0:
+                return jsonify({
+                    'success': False,
+                    'error': 'budget_ms must be a positive number'
+                }), 400
+        
+        try:
+            roster, open_counts = _resolve_roster(data)
+        except RosterError as e:
+            return _roster_error_response(e)
+        
         print(f"\n{'='*60}")
         print(f"API Request Received:")
         print(f"  Ticket: {ticket_text[:80]}...")
@@ -88,12 +388,24 @@ def assign_engineer():
         print(f"  Urgency: {urgency}")
         print(f"{'='*60}")
         
-        # Call AI Assignment System
-        result = ai_system.assign_engineer(
-            ticket_text=ticket_text,
-            request_type=request_type,
-            urgency=urgency
+        # Call AI Assignment System (request identik yang in-flight ikut menunggu)
+        snapshot = registry.current
+        ai_system = snapshot.system
+        result, shared = inflight.do(
+            _request_key('assign', snapshot.version, ticket_text, request_type, urgency, budget_ms,
+                         roster.version if roster is not None else None,
+                         tuple(sorted(open_counts.items())) if open_counts is not None else None),
+            lambda: ai_system.assign_engineer(
+                ticket_text=ticket_text,
+                request_type=request_type,
+                urgency=urgency,
+                budget_ms=budget_ms,
+                roster=roster.employees if roster is not None else None,
+                open_counts=open_counts
+            )
         )
+        if shared:
+            print("  ↪ Coalesced with identical in-flight request")
         
         if result is None:
             return jsonify({
@@ -101,10 +413,18 @@ def assign_engineer():
                 'error': 'No available engineers found or API connection failed'
             }), 500
         
-        return jsonify({
+        # Shadow evaluation setelah hasil primary siap; tidak menunggu
+        if shadow is not None and not shared:
+            shadow.submit(ai_system, ticket_text, result,
+                          roster.employees if roster is not None else None, open_counts)
+        
+        payload = {
             'success': True,
-            'data': result
-        })
+            'data': select_fields(result, _requested_fields(data, COMPACT_FIELDS))
+        }
+        if roster is not None:
+            payload['roster_version'] = roster.version
+        return _respond(payload)
         
     except Exception as e:
         print(f"ERROR in /ai/assign: {str(e)}")
@@ -116,6 +436,131 @@ def assign_engineer():
             'error': str(e)
         }), 500
 
+def _parse_batch_request(req):
+    """Normalisasi satu item batch, None jika ticket_text tidak valid"""
+    req_id = req.get('id', '')
+    ticket_text = req.get('ticket_text') or req.get('description', '')
+    request_type = req.get('request_type') or req.get('serviceTitle', 'General Request')
+    urgency = req.get('urgency', 'Medium')
+    
+    if not ticket_text or len(ticket_text.strip()) < 3:
+        print(f"  ⚠️ Skipping request {req_id}: invalid ticket_text")
+        return None
+    
+    # Normalize urgency
+    urgency = urgency.lower().capitalize()
+    if urgency not in ['Low', 'Medium', 'High']:
+        urgency = 'Medium'
+    
+    return {
+        'id': req_id,
+        'ticket_text': ticket_text,
+        'request_type': request_type,
+        'urgency': urgency
+    }
+
+def _iter_batch_results(requests_list, solver, roster=None, open_counts=None):
+    """
+    Yield (request_id, result) untuk setiap item sesuai urutan input.
+    result None jika request di-skip atau tidak mendapat engineer.
+    roster (DataFrame) / open_counts inline dipakai untuk seluruh batch.
+    """
+    # Satu batch memakai satu snapshot model dari awal sampai akhir
+    ai_system = registry.current.system
+    
+    if solver == 'global':
+        # Global assignment dengan kapasitas per engineer (butuh seluruh batch)
+        parsed = [_parse_batch_request(req) for req in requests_list]
+        valid = [req for req in parsed if req is not None]
+        results = ai_system.assign_batch(valid, roster, open_counts) if valid else []
+        if results is None:
+            results = [None] * len(valid)
+        
+        results_iter = iter(results)
+        for raw, req in zip(requests_list, parsed):
+            if req is None:
+                yield raw.get('id', ''), None
+            else:
+                yield req['id'], next(results_iter)
+        return
+    
+    # Greedy: setiap tiket di-assign sendiri-sendiri
+    for raw in requests_list:
+        req = _parse_batch_request(raw)
+        if req is None:
+            yield raw.get('id', ''), None
+            continue
+        try:
+            yield req['id'], ai_system.assign_engineer(
+                ticket_text=req['ticket_text'],
+                request_type=req['request_type'],
+                urgency=req['urgency'],
+                roster=roster,
+                open_counts=open_counts
+            )
+        except Exception as e:
+            print(f"  ✗ {req['id']}: Error - {str(e)}")
+            yield req['id'], None
+
+def _to_assignment(req_id, result):
+    """Ringkas hasil assign_engineer menjadi record assignment batch"""
+    return {
+        'requestId': req_id,
+        'engineerId': result['selected_engineer'],
+        'score': result['assignment_score'],
+        'cri': result['cri_analysis']['cri_normalized'],
+        'risk_level': result['cri_analysis']['risk_level'],
+        'tsm_score': result['tsm_analysis']['tsm_score'],
+        'reason': result['recommendation_reason']
+    }
+
+def _ndjson(record):
+    return dumps_json(record) + b'\n'
+
+def _iter_batch_records(requests_list, solver, roster=None, open_counts=None):
+    """Yield satu record JSON (assignment/unassigned) per item batch"""
+    for req_id, result in _iter_batch_results(requests_list, solver, roster, open_counts):
+        if result:
+            print(f"  ✓ {req_id} → {result['selected_engineer']}")
+            yield {'type': 'assignment', **_to_assignment(req_id, result)}
+        else:
+            print(f"  ✗ {req_id}: No result")
+            yield {'type': 'unassigned', 'requestId': req_id}
+
+def _stream_batch(requests_list, solver, roster=None, open_counts=None):
+    """Generator NDJSON: satu baris per request lalu satu baris summary"""
+    total_processed = 0
+    try:
+        for record in _iter_batch_records(requests_list, solver, roster, open_counts):
+            if record['type'] == 'assignment':
+                total_processed += 1
+            yield _ndjson(record)
+    except Exception as e:
+        print(f"ERROR in /ai/recommend-batch (stream): {str(e)}")
+        yield _ndjson({'type': 'error', 'error': str(e)})
+        return
+    
+    print(f"\n✓ Completed: {total_processed}/{len(requests_list)} assignments")
+    yield _ndjson({
+        'type': 'summary',
+        'success': True,
+        'total_processed': total_processed,
+        'total_requests': len(requests_list)
+    })
+
+# Job queue untuk batch besar (hasil dipersist ke SQLite lokal).
+# Process induk reloader werkzeug (app.run debug=True) juga meng-import modul
+# ini tapi tidak melayani request: job hanya dilanjutkan di process server.
+_reloader_parent = __name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+job_queue = JobQueue(
+    db_path=CONFIG['job_queue']['db_path'],
+    run_batch=_iter_batch_records,
+    max_workers=CONFIG['job_queue']['max_workers'],
+    json_default=to_builtin,
+    resume=not _reloader_parent,
+    stale_seconds=CONFIG['job_queue']['stale_seconds']
+)
+
 @app.route('/ai/recommend-batch', methods=['POST'])
 def recommend_batch():
     """
@@ -131,7 +576,11 @@ def recommend_batch():
                 "urgency": "..."
             },
             ...
-        ]
+        ],
+        "solver": "greedy",  // opsional: "global" untuk assignment dengan kapasitas engineer
+        "stream": false,     // opsional: true (atau Accept: application/x-ndjson) untuk NDJSON
+        "fields": ["engineerId", "score"],  // opsional: field per assignment (requestId selalu ada)
+        "roster": [...], "roster_version": "...", "workload": {...}  // opsional, seperti /ai/assign
     }
     
     Response:
@@ -147,6 +596,11 @@ def recommend_batch():
             ...
         ]
     }
+    
+    Response (stream, application/x-ndjson), satu JSON per baris:
+    {"type": "assignment", "requestId": "req_1", "engineerId": "...", ...}
+    {"type": "unassigned", "requestId": "req_2"}
+    {"type": "summary", "success": true, "total_processed": 1, "total_requests": 2}
     """
     try:
         data = request.get_json()
@@ -165,60 +619,54 @@ def recommend_batch():
                 'error': 'requests must be a non-empty array'
             }), 400
         
+        solver = data.get('solver', 'greedy')
+        if solver not in ('greedy', 'global'):
+            return jsonify({
+                'success': False,
+                'error': "solver must be 'greedy' or 'global'"
+            }), 400
+        
+        try:
+            roster, open_counts = _resolve_roster(data)
+        except RosterError as e:
+            return _roster_error_response(e)
+        employees = roster.employees if roster is not None else None
+        
         print(f"\n{'='*60}")
         print(f"Batch Recommendation Request: {len(requests_list)} requests")
         print(f"{'='*60}")
         
+        stream = data.get('stream') is True or \
+            'application/x-ndjson' in request.headers.get('Accept', '')
+        if stream:
+            return Response(
+                stream_with_context(_stream_batch(requests_list, solver, employees, open_counts)),
+                mimetype='application/x-ndjson'
+            )
+        
         assignments = []
+        fields = _requested_fields(data)
+        if fields:
+            fields = ['requestId'] + fields
         
-        for req in requests_list:
-            req_id = req.get('id', '')
-            ticket_text = req.get('ticket_text') or req.get('description', '')
-            request_type = req.get('request_type') or req.get('serviceTitle', 'General Request')
-            urgency = req.get('urgency', 'Medium')
-            
-            if not ticket_text or len(ticket_text.strip()) < 3:
-                print(f"  ⚠️ Skipping request {req_id}: invalid ticket_text")
-                continue
-            
-            # Normalize urgency
-            urgency = urgency.lower().capitalize()
-            if urgency not in ['Low', 'Medium', 'High']:
-                urgency = 'Medium'
-            
-            try:
-                result = ai_system.assign_engineer(
-                    ticket_text=ticket_text,
-                    request_type=request_type,
-                    urgency=urgency
-                )
-                
-                if result:
-                    assignments.append({
-                        'requestId': req_id,
-                        'engineerId': result['selected_engineer'],
-                        'score': result['assignment_score'],
-                        'cri': result['cri_analysis']['cri_normalized'],
-                        'risk_level': result['cri_analysis']['risk_level'],
-                        'tsm_score': result['tsm_analysis']['tsm_score'],
-                        'reason': result['recommendation_reason']
-                    })
-                    print(f"  ✓ {req_id} → {result['selected_engineer']}")
-                else:
-                    print(f"  ✗ {req_id}: No result")
-                    
-            except Exception as e:
-                print(f"  ✗ {req_id}: Error - {str(e)}")
-                continue
+        for req_id, result in _iter_batch_results(requests_list, solver, employees, open_counts):
+            if result:
+                assignments.append(select_fields(_to_assignment(req_id, result), fields))
+                print(f"  ✓ {req_id} → {result['selected_engineer']}")
+            else:
+                print(f"  ✗ {req_id}: No result")
         
         print(f"\n✓ Completed: {len(assignments)}/{len(requests_list)} assignments")
         
-        return jsonify({
+        payload = {
             'success': True,
             'assignments': assignments,
             'total_processed': len(assignments),
             'total_requests': len(requests_list)
-        })
+        }
+        if roster is not None:
+            payload['roster_version'] = roster.version
+        return _respond(payload)
         
     except Exception as e:
         print(f"ERROR in /ai/recommend-batch: {str(e)}")
@@ -230,6 +678,475 @@ def recommend_batch():
             'error': str(e)
         }), 500
 
+@app.route('/ai/jobs', methods=['POST'])
+def submit_batch_job():
+    """
+    Submit batch recommendation sebagai job asynchronous
+    
+    Request body sama dengan /ai/recommend-batch ("requests", "solver").
+    
+    Response (202):
+    {
+        "success": true,
+        "job_id": "...",
+        "status": "queued"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'requests' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'requests array is required'
+            }), 400
+        
+        requests_list = data['requests']
+        
+        if not isinstance(requests_list, list) or len(requests_list) == 0:
+            return jsonify({
+                'success': False,
+                'error': 'requests must be a non-empty array'
+            }), 400
+        
+        solver = data.get('solver', 'greedy')
+        if solver not in ('greedy', 'global'):
+            return jsonify({
+                'success': False,
+                'error': "solver must be 'greedy' or 'global'"
+            }), 400
+        
+        job_id = job_queue.submit(requests_list, solver)
+        print(f"✓ Batch job {job_id} queued: {len(requests_list)} requests")
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued'
+        }), 202
+        
+    except Exception as e:
+        print(f"ERROR in /ai/jobs: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/ai/jobs/<job_id>', methods=['GET'])
+def get_batch_job(job_id):
+    """Status dan progress batch job"""
+    job = job_queue.status(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': job
+    })
+
+@app.route('/ai/jobs/<job_id>/results', methods=['GET'])
+def get_batch_job_results(job_id):
+    """
+    Hasil batch job (paged), query: ?offset=0&limit=100
+    
+    Hasil yang sudah selesai bisa diambil walaupun job masih berjalan.
+    """
+    job = job_queue.status(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'job not found'
+        }), 404
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    
+    return jsonify({
+        'success': True,
+        'status': job['status'],
+        'offset': offset,
+        'limit': limit,
+        'total': job['total'],
+        'processed': job['processed'],
+        'results': job_queue.results(job_id, offset, limit)
+    })
+
+# Score matrix tiket open untuk re-rank saat availability engineer berubah
+pending_board = None
+
+def _pending_board_or_404():
+    if pending_board is None:
+        return None, (jsonify({
+            'success': False,
+            'error': 'no pending tickets loaded, POST /ai/pending first'
+        }), 404)
+    return pending_board, None
+
+@app.route('/ai/pending', methods=['POST'])
+def load_pending():
+    """
+    Muat tiket open (mengganti board sebelumnya)
+    
+    Request body:
+    {
+        "tickets": [
+            {"id": "req_1", "ticket_text": "...", "request_type": "...",
+             "urgency": "High", "assigned_to": "Engineer Name"},  // assigned_to opsional
+            ...
+        ],
+        "roster": [...], "roster_version": "...", "workload": {...}  // opsional, seperti /ai/assign
+    }
+    
+    Tiket tanpa assignee (atau assignee sedang tidak available) langsung
+    di-assign; response berisi perubahan tersebut dan info board.
+    """
+    global pending_board
+    try:
+        data = request.get_json() or {}
+        tickets = data.get('tickets')
+        if not isinstance(tickets, list) or len(tickets) == 0:
+            return jsonify({
+                'success': False,
+                'error': 'tickets must be a non-empty array'
+            }), 400
+        
+        parsed = []
+        for t in tickets:
+            item = _parse_batch_request(t) if isinstance(t, dict) else None
+            if item is None or item['id'] in ('', None):
+                return jsonify({
+                    'success': False,
+                    'error': 'every ticket needs an id and a ticket_text of at least 3 characters'
+                }), 400
+            item['assigned_to'] = t.get('assigned_to')
+            parsed.append(item)
+        
+        try:
+            roster, open_counts = _resolve_roster(data)
+        except RosterError as e:
+            return _roster_error_response(e)
+        
+        snapshot = registry.current
+        tsm = snapshot.system.tsm_calculator
+        employees = roster.employees if roster is not None else tsm.get_employees_from_api()
+        if employees.empty:
+            return jsonify({
+                'success': False,
+                'error': 'No engineers found or API connection failed'
+            }), 500
+        if open_counts is None:
+            open_counts = tsm.get_open_ticket_counts()
+        
+        board = PendingTicketBoard(snapshot.system, parsed, employees, open_counts,
+                                   CONFIG, model_version=snapshot.version)
+        pending_board = board
+        return _respond({
+            'success': True,
+            'data': {'changes': board.initial_changes, **board.info()}
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"ERROR in /ai/pending: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/ai/pending', methods=['GET'])
+def get_pending():
+    """Assignment tiket open saat ini dan statistik re-rank"""
+    board, error = _pending_board_or_404()
+    if error:
+        return error
+    return _respond({
+        'success': True,
+        'data': {**board.info(), 'assignments': board.assignments()}
+    })
+
+@app.route('/ai/pending/availability', methods=['POST'])
+def pending_availability():
+    """
+    Engineer cuti / kembali: re-rank hanya tiket open yang terdampak
+    
+    Request body:
+    {
+        "engineer": "Engineer Name",
+        "available": false
+    }
+    
+    Response data: {"changes": [{"id", "from", "to", "risk_level", "assignment_score"}], "elapsed_ms"}
+    (to null jika tidak ada engineer dengan kapasitas tersisa)
+    """
+    board, error = _pending_board_or_404()
+    if error:
+        return error
+    data = request.get_json() or {}
+    engineer = data.get('engineer')
+    available = data.get('available')
+    if not isinstance(engineer, str) or not isinstance(available, bool):
+        return jsonify({
+            'success': False,
+            'error': 'engineer (string) and available (boolean) are required'
+        }), 400
+    try:
+        result = board.set_availability(engineer, available)
+    except KeyError:
+        return jsonify({
+            'success': False,
+            'error': f'engineer {engineer} is not in the pending roster'
+        }), 404
+    print(f"✓ Re-ranked {len(result['changes'])} pending tickets for {engineer} "
+          f"({'available' if available else 'unavailable'}) in {result['elapsed_ms']}ms")
+    return _respond({'success': True, 'data': result})
+
+@app.route('/ai/pending/close', methods=['POST'])
+def close_pending():
+    """Keluarkan tiket yang sudah selesai: {"ids": ["req_1", ...]}"""
+    board, error = _pending_board_or_404()
+    if error:
+        return error
+    ids = (request.get_json() or {}).get('ids')
+    if not isinstance(ids, list):
+        return jsonify({'success': False, 'error': 'ids must be an array'}), 400
+    return jsonify({'success': True, 'data': {'closed': board.close(ids)}})
+
+# Dispatch mode (CONFIG['dispatch']): scheduler dibuat saat enqueue pertama
+dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def _dispatcher_or_error(create_from=None):
+    """Scheduler aktif; create_from=(system, roster, open_counts) membuatnya jika belum ada"""
+    global dispatcher
+    if not CONFIG['dispatch']['enabled']:
+        return None, (jsonify({'success': False, 'error': 'dispatch mode is disabled'}), 404)
+    with _dispatcher_lock:
+        if dispatcher is None and create_from is not None:
+            dispatcher = make_scheduler(*create_from, CONFIG)
+    if dispatcher is None:
+        return None, (jsonify({
+            'success': False,
+            'error': 'dispatch queue is empty, POST /ai/dispatch/enqueue first'
+        }), 404)
+    return dispatcher, None
+
+@app.route('/ai/dispatch/enqueue', methods=['POST'])
+def dispatch_enqueue():
+    """
+    Masukkan tiket ke priority queue dispatch
+    
+    Request body:
+    {
+        "tickets": [{"id": "req_1", "ticket_text": "...", "request_type": "...", "urgency": "High"}],
+        "roster": [...], "roster_version": "...", "workload": {...}  // opsional; dipakai saat
+                                                                    // scheduler pertama dibuat
+    }
+    
+    Response data: {"queued": n, "rejected": [...], "dispatched": [assignment yang dilepas], ...}
+    """
+    if not CONFIG['dispatch']['enabled']:
+        return _dispatcher_or_error()[1]
+    try:
+        data = request.get_json() or {}
+        tickets = data.get('tickets')
+        if not isinstance(tickets, list) or len(tickets) == 0:
+            return jsonify({
+                'success': False,
+                'error': 'tickets must be a non-empty array'
+            }), 400
+        
+        parsed, rejected = [], []
+        for t in tickets:
+            item = _parse_batch_request(t) if isinstance(t, dict) else None
+            if item is None or item['id'] in ('', None):
+                rejected.append({'id': t.get('id') if isinstance(t, dict) else None,
+                                 'error': 'id and ticket_text of at least 3 characters required'})
+            else:
+                parsed.append(item)
+        
+        system = registry.current.system
+        create_from = None
+        if dispatcher is None:
+            try:
+                roster, open_counts = _resolve_roster(data)
+            except RosterError as e:
+                return _roster_error_response(e)
+            tsm = system.tsm_calculator
+            employees = roster.employees if roster is not None else tsm.get_employees_from_api()
+            if employees.empty:
+                return jsonify({
+                    'success': False,
+                    'error': 'No engineers found or API connection failed'
+                }), 500
+            create_from = (system, employees,
+                           open_counts if open_counts is not None else tsm.get_open_ticket_counts())
+        scheduler, error = _dispatcher_or_error(create_from)
+        if error:
+            return error
+        
+        dispatched = []
+        queued = 0
+        for ticket_id, level, cri, urgency, skill in score_tickets(system, scheduler, parsed):
+            try:
+                dispatched.extend(scheduler.enqueue(ticket_id, level, cri, urgency, skill))
+                queued += 1
+            except ValueError as e:
+                rejected.append({'id': ticket_id, 'error': str(e)})
+        
+        return _respond({
+            'success': True,
+            'data': {
+                'queued': queued,
+                'rejected': rejected,
+                'dispatched': dispatched,
+                'queue_depth': scheduler.info()['queue_depth']
+            }
+        })
+    except Exception as e:
+        print(f"ERROR in /ai/dispatch/enqueue: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _dispatch_ids_request(action):
+    scheduler, error = _dispatcher_or_error()
+    if error:
+        return error
+    ids = (request.get_json() or {}).get('ids')
+    if not isinstance(ids, list):
+        return jsonify({'success': False, 'error': 'ids must be an array'}), 400
+    return _respond({'success': True, 'data': action(scheduler, ids)})
+
+@app.route('/ai/dispatch/complete', methods=['POST'])
+def dispatch_complete():
+    """Tiket selesai {"ids": [...]}: kapasitas kembali, assignment berikutnya dilepas"""
+    return _dispatch_ids_request(lambda s, ids: {'dispatched': s.complete(ids)})
+
+@app.route('/ai/dispatch/cancel', methods=['POST'])
+def dispatch_cancel():
+    """Keluarkan tiket yang belum di-dispatch dari antrian {"ids": [...]}"""
+    return _dispatch_ids_request(lambda s, ids: {'cancelled': s.cancel(ids)})
+
+@app.route('/ai/dispatch/availability', methods=['POST'])
+def dispatch_availability():
+    """
+    Engineer cuti / kembali untuk dispatch berikutnya
+    
+    Request body: {"engineer": "Engineer Name", "available": false}
+    Response data: {"dispatched": [assignment yang dilepas]} (kembali available
+    bisa melepas tiket yang sedang antri)
+    """
+    scheduler, error = _dispatcher_or_error()
+    if error:
+        return error
+    data = request.get_json() or {}
+    engineer = data.get('engineer')
+    available = data.get('available')
+    if not isinstance(engineer, str) or not isinstance(available, bool):
+        return jsonify({
+            'success': False,
+            'error': 'engineer (string) and available (boolean) are required'
+        }), 400
+    try:
+        dispatched = scheduler.set_available(engineer, available)
+    except KeyError:
+        return jsonify({
+            'success': False,
+            'error': f'engineer {engineer} is not in the dispatch roster'
+        }), 404
+    return _respond({'success': True, 'data': {'dispatched': dispatched}})
+
+@app.route('/ai/dispatch', methods=['GET'])
+def dispatch_status():
+    """
+    Inspect antrian dispatch
+    
+    Query: limit (default 20) jumlah tiket teratas antrian
+    Response data: statistik, queue (urut prioritas), capacity per engineer
+    """
+    scheduler, error = _dispatcher_or_error()
+    if error:
+        return error
+    limit = request.args.get('limit', 20, type=int)
+    return _respond({
+        'success': True,
+        'data': {
+            **scheduler.info(),
+            'queue': scheduler.queue_head(max(limit, 0)),
+            'capacity': scheduler.capacity_report()
+        }
+    })
+
+@app.route('/ai/dispatch/assignments', methods=['GET'])
+def dispatch_assignments():
+    """Assignment yang dilepas setelah seq tertentu (?since=seq) untuk polling"""
+    scheduler, error = _dispatcher_or_error()
+    if error:
+        return error
+    return _respond({
+        'success': True,
+        'data': scheduler.dispatched_since(request.args.get('since', 0, type=int))
+    })
+
+@app.route('/debug/profile', methods=['POST'])
+def debug_profile():
+    """
+    Profiling proses yang sedang berjalan (diblok sampai sesi selesai)
+    
+    Aktif hanya jika env var CONFIG['profiling']['token_env'] di-set; token
+    dikirim lewat header X-Profile-Token.
+    
+    Request body:
+    {
+        "mode": "sampling",     // atau "cprofile" (deterministik)
+        "seconds": 10,          // profiling selama N detik, atau
+        "requests": 50,         // sampai N request berikutnya selesai
+        "tracemalloc": false,   // opsional: top allocation site
+        "all_threads": false,   // sampling: semua thread, bukan hanya thread request
+        "top": 30
+    }
+    
+    Query ?format=collapsed mengembalikan collapsed stacks sebagai text/plain
+    (langsung untuk flamegraph.pl / speedscope).
+    """
+    cfg = CONFIG['profiling']
+    token = os.environ.get(cfg['token_env'])
+    if not token:
+        return jsonify({'success': False, 'error': 'not found'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Profile-Token', ''), token):
+        return jsonify({'success': False, 'error': 'invalid profiling token'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    seconds = data.get('seconds')
+    max_requests = data.get('requests')
+    if not seconds and not max_requests:
+        return jsonify({
+            'success': False,
+            'error': 'seconds or requests is required'
+        }), 400
+    
+    try:
+        result = live_profiler.run(
+            mode=data.get('mode', 'sampling'),
+            seconds=min(float(seconds), cfg['max_seconds']) if seconds else None,
+            max_requests=int(max_requests) if max_requests else None,
+            trace_malloc=data.get('tracemalloc') is True,
+            top=int(data.get('top', cfg['top'])),
+            interval=cfg['sample_interval_ms'] / 1000,
+            all_threads=data.get('all_threads') is True,
+            timeout=cfg['max_seconds']
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    
+    if request.args.get('format') == 'collapsed':
+        return Response(result['collapsed'] + '\n', mimetype='text/plain')
+    
+    return _respond({
+        'success': True,
+        'data': result
+    })
+
 @app.route('/ai/cri-only', methods=['POST'])
 def calculate_cri_only():
     """
@@ -260,15 +1177,20 @@ def calculate_cri_only():
         if urgency not in ['Low', 'Medium', 'High']:
             urgency = 'Medium'
         
-        cri_result = ai_system.cri_calculator.calculate_cri(
-            ticket_text=ticket_text,
-            request_type=request_type,
-            urgency=urgency
+        snapshot = registry.current
+        ai_system = snapshot.system
+        cri_result, _ = inflight.do(
+            _request_key('cri-only', snapshot.version, ticket_text, request_type, urgency),
+            lambda: ai_system.cri_calculator.calculate_cri(
+                ticket_text=ticket_text,
+                request_type=request_type,
+                urgency=urgency
+            )
         )
         
-        return jsonify({
+        return _respond({
             'success': True,
-            'data': cri_result
+            'data': select_fields(cri_result.to_dict(), _requested_fields(data))
         })
         
     except Exception as e:
@@ -294,4 +1216,4 @@ if __name__ == '__main__':
         port=5000,
         debug=True,
         threaded=True
-    )
\ No newline at end of file
+    )
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+BATCH SOLVER
+Global assignment untuk batch tiket dengan batas kapasitas per engineer.
+Setiap engineer dipecah menjadi slot sebanyak sisa kapasitasnya, lalu semua
+tiket diselesaikan sekaligus sebagai rectangular linear assignment pada graf
+sparse (hanya kandidat top-k per tiket).
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+
+def top_k_candidates(matrix, k):
+    """Indeks kolom top-k per baris (urutan di dalam top-k tidak dijamin)"""
+    n_rows, n_cols = matrix.shape
+    if k >= n_cols:
+        return np.tile(np.arange(n_cols), (n_rows, 1))
+    return np.argpartition(-matrix, k - 1, axis=1)[:, :k]
+
+
+def solve_capacitated_assignment(scores, capacities, candidates):
+    """
+    Selesaikan assignment global tiket -> engineer
+
+    Args:
+        scores: ndarray (tickets x engineers), makin besar makin baik
+        capacities: ndarray (engineers,) jumlah tiket yang masih bisa diterima
+        candidates: ndarray (tickets x k) indeks engineer kandidat per tiket
+
+    Returns:
+        ndarray (tickets,) indeks engineer terpilih, -1 jika tidak kebagian kapasitas
+    """
+    n_tickets = scores.shape[0]
+    assignment = np.full(n_tickets, -1, dtype=np.int64)
+    if n_tickets == 0:
+        return assignment
+
+    capacities = np.maximum(np.asarray(capacities, dtype=np.int64), 0)
+    k = candidates.shape[1]
+    rows = np.repeat(np.arange(n_tickets), k)
+    engs = candidates.ravel()
+    keep = capacities[engs] > 0
+    rows, engs = rows[keep], engs[keep]
+    if len(rows) == 0:
+        return assignment
+
+    # Slot per engineer tidak perlu melebihi jumlah tiket yang menjadikannya kandidat
+    demand = np.bincount(engs, minlength=len(capacities))
+    slots = np.minimum(capacities, demand)
+    slot_start = np.concatenate([[0], np.cumsum(slots)])
+    n_slots = int(slot_start[-1])
+    slot_owner = np.repeat(np.arange(len(slots)), slots)
+
+    # Cost positif (entry nol di matrix sparse dianggap tidak ada edge)
+    edge_scores = scores[rows, engs].astype(np.float64)
+    cost = (edge_scores.max() - edge_scores) + 1.0
+
+    # Setiap kandidat terhubung ke semua slot milik engineer tersebut
+    rep = slots[engs]
+    edge_rows = np.repeat(rows, rep)
+    offsets = np.arange(rep.sum()) - np.repeat(np.cumsum(rep) - rep, rep)
+    edge_cols = np.repeat(slot_start[engs], rep) + offsets
+    edge_cost = np.repeat(cost, rep)
+
+    # Kolom dummy per tiket agar matching selalu feasible; cost-nya cukup besar
+    # sehingga jumlah tiket yang ter-assign selalu dimaksimalkan lebih dulu
+    dummy_cost = (cost.max() + 1.0) * (n_tickets + 1)
+    edge_rows = np.concatenate([edge_rows, np.arange(n_tickets)])
+    edge_cols = np.concatenate([edge_cols, n_slots + np.arange(n_tickets)])
+    edge_cost = np.concatenate([edge_cost, np.full(n_tickets, dummy_cost)])
+
+    graph = csr_matrix(
+        (edge_cost, (edge_rows, edge_cols)),
+        shape=(n_tickets, n_slots + n_tickets)
+    )
+    row_ind, col_ind = min_weight_full_bipartite_matching(graph)
+
+    real = col_ind < n_slots
+    assignment[row_ind[real]] = slot_owner[col_ind[real]]
+    return assignment
@@ -0,0 +1,215 @@
+"""
+OFFLINE MODEL BUILD
+Build artifact model (TF-IDF, engineer profiles, centroids, vocabulary
+compact, CRI scalers) di luar proses serving. Preprocessing teks dijalankan
+paralel di process pool, artifact ditulis secara atomik, dan output
+deterministik untuk input yang sama.
+
+Usage:
+    python build_models.py [--data-olah PATH] [--data-cri PATH] [--workers N]
+"""
+
+import argparse
+import os
+import time
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import RobustScaler, MinMaxScaler
+from tqdm.auto import tqdm
+
+from csv_cache import load_csv
+from integrated_assignment import CONFIG, CRI_COLUMNS, preprocess_text
+from vectorizer import build_compact_vocabulary
+
+CRI_FEATURE_COLS = ["complexity_score", "Urgency_Category", "dependency_count", "likelihood"]
+
+
+class _Timer:
+    """Catat durasi setiap tahap build"""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        print(f"→ {name}...")
+        started = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - started
+        print(f"✓ {name} ({self.timings[name]:.2f}s)")
+
+
+def preprocess_parallel(texts, workers):
+    """preprocess_text untuk semua teks di process pool, urutan output tetap"""
+    if workers <= 1:
+        return [preprocess_text(t) for t in tqdm(texts, desc="Preprocessing")]
+
+    chunksize = max(1, len(texts) // (workers * 16))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(tqdm(pool.map(preprocess_text, texts, chunksize=chunksize),
+                         total=len(texts), desc="Preprocessing"))
+
+
+TICKET_COLUMNS = {
+    'summary': {'aliases': ['Summary','summary','Summary_x'], 'dtype': 'text'},
+    'judul': {'aliases': ['Judul Request_x','Judul_Request_x','Judul Request x','judul request_x','judul'], 'dtype': 'text'},
+    'description': {'aliases': ['Description','Deskripsi','description','deskripsi'], 'dtype': 'text'},
+    'engineer': {'aliases': ['Engineer','engineer','Assignee','assignee','petugas','pegawai'], 'dtype': 'category', 'required': True},
+}
+
+
+def load_ticket_history(data_olah_path, columns=TICKET_COLUMNS):
+    """Baca Data Olah dan gabungkan field teks tiket"""
+    df = load_csv(data_olah_path, columns, CONFIG['csv_cache_dir'])
+
+    # Gabungkan text fields
+    df['text_raw'] = ""
+    for name in ('summary', 'judul', 'description'):
+        if name in df:
+            df['text_raw'] += df[name].astype(object).fillna("").astype(str) + " "
+
+    return df, 'engineer'
+
+
+def build_skill_models(df, eng_col):
+    """
+    Fit TF-IDF lalu build tag profiles dan centroid per engineer
+
+    df harus sudah memiliki kolom text_processed.
+    """
+    # Filter completed tasks
+    mask = (df[eng_col].notna()) & (df['text_processed'].str.strip() != '')
+    df_skill = df[mask].copy().reset_index(drop=True)
+
+    # TF-IDF
+    tfidf = TfidfVectorizer(min_df=CONFIG['min_df'], max_df=CONFIG['max_df'])
+    X_tfidf = tfidf.fit_transform(df_skill['text_processed'].fillna("").tolist())
+    terms = tfidf.get_feature_names_out()
+    # id() dari stop_words berbeda tiap proses; buang agar artifact byte-identical
+    tfidf.__dict__.pop('_stop_words_id', None)
+
+    # Extract tags per engineer
+    eng_tag_counts = defaultdict(Counter)
+    for idx, eng in enumerate(df_skill[eng_col]):
+        arr = X_tfidf[idx].toarray().ravel()
+        if arr.sum() == 0:
+            continue
+
+        top_idx = np.argsort(arr)[-CONFIG['top_n_tags']:][::-1]
+        top_tags = [terms[i] for i in top_idx if arr[i] > 0]
+        eng_tag_counts[eng].update(top_tags)
+
+    # Build profiles (urut nama engineer agar artifact deterministik)
+    profiles = {}
+    for eng in sorted(eng_tag_counts):
+        ctr = eng_tag_counts[eng]
+        total_tickets = sum(ctr.values())
+        max_count = max(ctr.values()) if ctr else 1
+
+        tag_scores = {}
+        for tag, cnt in ctr.items():
+            frequency_score = cnt / max_count
+            relative_score = cnt / total_tickets
+            combined_score = (frequency_score * CONFIG['frequency_weight']) + \
+                           (relative_score * CONFIG['relative_weight'])
+            tag_scores[tag] = combined_score
+
+        profiles[eng] = tag_scores
+
+    # Build centroids
+    engineer_centroids = {}
+    for eng, idxs in df_skill.groupby(eng_col, observed=True).indices.items():
+        centroid = X_tfidf[list(idxs)].mean(axis=0)
+        engineer_centroids[eng] = csr_matrix(np.asarray(centroid).reshape(1, -1))
+
+    return profiles, engineer_centroids, tfidf
+
+
+def build_cri_scalers(data_cri_path):
+    """Fit RobustScaler lalu MinMaxScaler dari Data CRI"""
+    df_cri = load_csv(data_cri_path, CRI_COLUMNS, CONFIG['csv_cache_dir'])
+    robust_features = df_cri[CRI_FEATURE_COLS].copy()
+
+    robust_scaler = RobustScaler()
+    robust_scaler.fit(robust_features)
+
+    minmax_scaler = MinMaxScaler()
+    minmax_scaler.fit(robust_scaler.transform(robust_features))
+
+    return {'robust': robust_scaler, 'minmax': minmax_scaler}
+
+
+def atomic_dump(obj, path):
+    """joblib.dump ke file sementara lalu os.replace (atomik di filesystem yang sama)"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_all(data_olah_path, data_cri_path, workers, out_dir='.'):
+    """Build semua artifact; return dict durasi per tahap"""
+    timer = _Timer()
+
+    with timer.stage("Load ticket history"):
+        df, eng_col = load_ticket_history(data_olah_path)
+        print(f"  {len(df)} tickets")
+
+    with timer.stage(f"Preprocess text ({workers} workers)"):
+        df['text_processed'] = preprocess_parallel(df['text_raw'].tolist(), workers)
+
+    with timer.stage("Fit TF-IDF, profiles and centroids"):
+        profiles, centroids, tfidf = build_skill_models(df, eng_col)
+        print(f"  {len(profiles)} engineers, {len(tfidf.vocabulary_)} terms")
+
+    with timer.stage("Export compact vocabulary"):
+        vocabulary = build_compact_vocabulary(tfidf, vstack(list(centroids.values())))
+        print(f"  {len(vocabulary['columns'])} terms with centroid mass")
+
+    with timer.stage("Fit CRI scalers"):
+        scalers = build_cri_scalers(data_cri_path)
+
+    with timer.stage("Write artifacts"):
+        artifacts = CONFIG['model_artifacts']
+        atomic_dump({'tfidf_tag': tfidf, 'profiles': profiles},
+                    os.path.join(out_dir, artifacts['profiles']))
+        atomic_dump({'tfidf_tag': tfidf, 'centroids': centroids},
+                    os.path.join(out_dir, artifacts['centroids']))
+        atomic_dump(vocabulary, os.path.join(out_dir, artifacts['vocabulary']))
+        atomic_dump(scalers, os.path.join(out_dir, artifacts['cri_scalers']))
+
+    return timer.timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build AI assignment model artifacts")
+    parser.add_argument('--data-olah', default=CONFIG['data_olah'])
+    parser.add_argument('--data-cri', default=CONFIG['data_cri'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--out-dir', default='.')
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("BUILDING MODEL ARTIFACTS")
+    print("="*80)
+
+    timings = build_all(args.data_olah, args.data_cri, args.workers, args.out_dir)
+
+    print(f"\n{'─'*80}")
+    for name, elapsed in timings.items():
+        print(f"{name:<45} {elapsed:8.2f}s")
+    print(f"{'Total':<45} {sum(timings.values()):8.2f}s")
+    print(f"{'─'*80}")
+
+
+if __name__ == "__main__":
+    main()
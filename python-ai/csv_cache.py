@@ -0,0 +1,280 @@
+"""
+CSV CACHE
+Loader kolom-spesifik untuk Data Olah / Data CRI dengan cache biner kolumnar.
+Alias kolom di-resolve sekali, hanya kolom yang dibutuhkan yang dibaca dengan
+dtype eksplisit, lalu disimpan sebagai file .npy per kolom (dibaca ulang via
+memory-map). Cache otomatis invalid saat ukuran, mtime, dan hash CSV berubah.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CACHE_FORMAT_VERSION = 1
+
+
+def find_col(df, candidates):
+    """Deteksi kolom berdasarkan kandidat nama"""
+    for cand in candidates:
+        for c in df.columns:
+            if cand.lower() == c.lower().strip():
+                return c
+    for cand in candidates:
+        for c in df.columns:
+            if cand.lower() in c.lower():
+                return c
+    return None
+
+
+def _file_sha1(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def _file_lock(lock_path):
+    """Lock eksklusif antar process (worker lain yang memakai cache_dir sama)"""
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _spec_key(spec):
+    raw = json.dumps(spec, sort_keys=True).encode()
+    return hashlib.sha1(raw).hexdigest()[:10]
+
+
+def resolve_columns(path, spec):
+    """Resolve alias setiap kolom logis ke nama kolom CSV (cukup baca header)"""
+    header = pd.read_csv(path, nrows=0)
+    resolved = {}
+    for name, col_spec in spec.items():
+        col = find_col(header, col_spec['aliases'])
+        if col is None and col_spec.get('required', False):
+            raise ValueError(f"Column {name!r} not found in {path}")
+        if col is not None:
+            resolved[name] = col
+    return resolved
+
+
+def read_columns(path, spec, resolved):
+    """Baca kolom yang dibutuhkan saja dengan dtype eksplisit, rename ke nama logis"""
+    usecols = sorted(set(resolved.values()))
+    dtypes = {
+        col: 'float64' if spec[name]['dtype'] == 'float64' else 'category'
+        for name, col in resolved.items()
+    }
+
+    df = pd.read_csv(path, usecols=usecols, dtype=dtypes)
+    return pd.DataFrame({name: df[col] for name, col in resolved.items()})
+
+
+class CSVCache:
+    """
+    Cache kolumnar per (file CSV, spec kolom)
+
+    Layout: <cache_dir>/<stem>-<spec>.json menunjuk ke direktori data
+    <cache_dir>/<stem>-<spec>-<sha1>/ berisi satu .npy per kolom (categorical
+    disimpan sebagai codes .npy + categories .json). Pointer diganti atomik.
+
+    Rebuild per base diserialisasi (lock thread + file lock <base>.lock antar
+    process); direktori data generasi sebelumnya baru dihapus satu rebuild
+    kemudian agar reader yang masih memegang manifest lama tidak gagal.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.stats = {'hits': 0, 'rebuilds': 0}
+        self._lock = threading.Lock()
+        self._base_locks = {}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _base_lock(self, base):
+        with self._lock:
+            return self._base_locks.setdefault(base, threading.Lock())
+
+    def _paths(self, path, spec):
+        stem = os.path.splitext(os.path.basename(path))[0].replace(' ', '_')
+        base = f"{stem}-{_spec_key(spec)}"
+        return os.path.join(self.cache_dir, base + '.json'), base
+
+    def load(self, path, spec):
+        """DataFrame berisi kolom logis dari spec; baca dari cache jika masih valid"""
+        pointer_path, base = self._paths(path, spec)
+        st = os.stat(path)
+        manifest = self._read_manifest(pointer_path)
+
+        if manifest is not None:
+            if (manifest['size'], manifest['mtime_ns']) != (st.st_size, st.st_mtime_ns):
+                # mtime/size berubah: cek hash sebelum rebuild (mis. file hanya di-touch)
+                if manifest['size'] == st.st_size and manifest['sha1'] == _file_sha1(path):
+                    manifest['mtime_ns'] = st.st_mtime_ns
+                    self._write_json(pointer_path, manifest)
+                else:
+                    manifest = None
+
+        if manifest is not None:
+            try:
+                df = self._read_data(manifest)
+                self._count('hits')
+                return df
+            except (OSError, ValueError, KeyError):
+                manifest = None
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._base_lock(base), _file_lock(os.path.join(self.cache_dir, base + '.lock')):
+            # Thread / process lain mungkin sudah rebuild selama menunggu lock
+            st = os.stat(path)
+            manifest = self._read_manifest(pointer_path)
+            if manifest is not None and (manifest['size'], manifest['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+                try:
+                    df = self._read_data(manifest)
+                    self._count('hits')
+                    return df
+                except (OSError, ValueError, KeyError):
+                    pass
+            return self._rebuild(path, spec, pointer_path, base, st, manifest)
+
+    def _read_manifest(self, pointer_path):
+        try:
+            with open(pointer_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('format') != CACHE_FORMAT_VERSION:
+            return None
+        return manifest
+
+    def _read_data(self, manifest):
+        data_dir = manifest['data_dir']
+        columns = {}
+        for name, meta in manifest['columns'].items():
+            arr = np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode='r')
+            if meta['kind'] in ('category', 'text'):
+                with open(os.path.join(data_dir, f"{name}.categories.json")) as f:
+                    categories = json.load(f)
+                columns[name] = pd.Categorical.from_codes(arr, categories)
+            else:
+                columns[name] = arr
+        return pd.DataFrame(columns)
+
+    def _rebuild(self, path, spec, pointer_path, base, st, previous):
+        """Tulis ulang data + pointer; dipanggil dengan lock base dipegang"""
+        self._count('rebuilds')
+        sha1 = _file_sha1(path)
+        resolved = resolve_columns(path, spec)
+        df = read_columns(path, spec, resolved)
+
+        data_dir = os.path.join(self.cache_dir, f"{base}-{sha1[:12]}")
+        columns = {name: {'source_col': resolved[name], 'kind': spec[name]['dtype']}
+                   for name in resolved}
+        manifest = {
+            'format': CACHE_FORMAT_VERSION,
+            'source': os.path.abspath(path),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha1': sha1,
+            'rows': len(df),
+            'columns': columns,
+            'data_dir': data_dir,
+            'previous_data_dir': None
+        }
+        if previous is not None and previous.get('data_dir') != data_dir:
+            manifest['previous_data_dir'] = previous['data_dir']
+
+        # Direktori data dengan sha sama sudah ada (isi identik): cukup tulis pointer
+        try:
+            self._read_data(manifest)
+        except (OSError, ValueError, KeyError):
+            self._write_data(data_dir, df, spec, resolved)
+
+        self._write_json(pointer_path, manifest)
+        # Hanya generasi sebelum previous yang dihapus; previous mungkin masih dibaca
+        stale = previous.get('previous_data_dir') if previous else None
+        if stale and stale not in (data_dir, manifest['previous_data_dir']):
+            shutil.rmtree(stale, ignore_errors=True)
+
+        print(f"✓ CSV cache rebuilt: {os.path.basename(path)} ({len(df)} rows, {len(columns)} columns)")
+        return df
+
+    def _write_data(self, data_dir, df, spec, resolved):
+        tmp_dir = f"{data_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for name in resolved:
+            kind = spec[name]['dtype']
+            series = df[name]
+            if kind in ('category', 'text'):
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), series.cat.codes.to_numpy())
+                self._write_json(os.path.join(tmp_dir, f"{name}.categories.json"),
+                                 [str(c) for c in series.cat.categories])
+            else:
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), series.to_numpy(dtype=kind))
+
+        # Data lama rusak / tidak lengkap (lock dipegang, tidak ada writer lain)
+        shutil.rmtree(data_dir, ignore_errors=True)
+        os.replace(tmp_dir, data_dir)
+
+    @staticmethod
+    def _write_json(path, obj):
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(obj, f)
+        os.replace(tmp_path, path)
+
+
+_default_cache = None
+
+
+def load_csv(path, spec, cache_dir=None):
+    """
+    Load kolom CSV sesuai spec
+
+    spec: {nama_logis: {'aliases': [...], 'dtype': 'float64'|'category'|'text',
+                        'required': bool}}
+    Tanpa cache_dir, CSV dibaca langsung (tetap hanya kolom yang dibutuhkan).
+    """
+    global _default_cache
+    if cache_dir is None:
+        return read_columns(path, spec, resolve_columns(path, spec))
+    if _default_cache is None or _default_cache.cache_dir != cache_dir:
+        _default_cache = CSVCache(cache_dir)
+    return _default_cache.load(path, spec)
+
+
+def cache_stats():
+    """Hit/rebuild counter cache default (kosong jika cache belum dipakai)"""
+    if _default_cache is None:
+        return {}
+    with _default_cache._lock:
+        return dict(_default_cache.stats)
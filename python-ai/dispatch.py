@@ -0,0 +1,522 @@
+"""
+PRIORITY DISPATCH SCHEDULER
+Mode dispatch opsional: tiket tidak langsung di-assign saat datang, tetapi
+masuk priority queue (heap) berurut risk level, CRI lalu urgency. Setiap
+engineer punya counter kapasitas (max tiket open); dispatch loop melepas
+assignment selama masih ada kapasitas yang boleh dipakai tiket teratas, dan
+berjalan lagi setiap kali tiket selesai.
+
+Slot engineer senior dicadangkan untuk tiket HIGH sesuai permintaan HIGH:
+jumlah slot cadangan = reserve_factor x (laju kedatangan HIGH / laju slot
+senior kosong), maksimal reserve_slots per engineer senior. Laju dihitung
+dari event dalam rate_horizon detik terakhir; tanpa kedatangan HIGH selama
+rate_horizon cadangan nol dan semua slot senior bisa dipakai tiket LOW / MEDIUM.
+
+Enqueue dan dispatch O(log n) terhadap panjang antrian (ditambah O(engineer)
+untuk scoring tiket teratas).
+
+Usage (simulasi stream tiket):
+    python dispatch.py --simulate 100000 [--engineers 50] [--load 0.85] [--seed 0]
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+RISK_RANK = {'HIGH': 2, 'MEDIUM': 1, 'LOW': 0}
+
+
+class _Pending:
+    __slots__ = ('ticket_id', 'risk_level', 'cri', 'urgency', 'skill', 'enqueued_at', 'cancelled')
+
+    def __init__(self, ticket_id, risk_level, cri, urgency, skill, enqueued_at):
+        self.ticket_id = ticket_id
+        self.risk_level = risk_level
+        self.cri = cri
+        self.urgency = urgency
+        self.skill = skill
+        self.enqueued_at = enqueued_at
+        self.cancelled = False
+
+
+class DispatchScheduler:
+    """
+    Priority queue tiket + kapasitas engineer
+
+    Args:
+        engineers: nama engineer (urutan kolom skill)
+        seniority: ndarray seniority weight per engineer
+        open_counts: ndarray tiket open saat ini per engineer
+        capacity: maksimal tiket open per engineer
+        tsm_weights, selection_weights, top_k: aturan pemilihan seperti
+            assign_engineer (top-k TSM lalu selection weights per risk level)
+        reserve_slots: maksimal slot cadangan per engineer senior (0 = tanpa cadangan)
+        reserve_min_seniority: batas seniority engineer yang slotnya dicadangkan
+        reserve_for: risk level yang boleh memakai slot cadangan
+        reserve_factor: pengali rasio laju HIGH / laju slot senior kosong
+        rate_window: maksimal event terakhir untuk estimasi kedua laju tersebut
+        rate_horizon: event lebih lama dari ini (detik) tidak dihitung
+        available: mask engineer available (default semua)
+        clock: fungsi waktu (detik) untuk wait time; simulasi memakai waktu virtual
+    """
+
+    def __init__(self, engineers, seniority, open_counts, capacity, tsm_weights,
+                 selection_weights, top_k, reserve_slots=1, reserve_min_seniority=0.75,
+                 reserve_for=('HIGH',), reserve_factor=2.0, rate_window=50, rate_horizon=3600,
+                 available=None, clock=time.monotonic, recent=1000):
+        self.engineers = list(engineers)
+        self.column = {e: j for j, e in enumerate(self.engineers)}
+        self.seniority = np.asarray(seniority, dtype=np.float64)
+        self.open = np.asarray(open_counts, dtype=np.int64).copy()
+        self.capacity = capacity
+        self.available = np.ones(len(self.engineers), dtype=bool) if available is None \
+            else np.asarray(available, dtype=bool).copy()
+        self.tsm_weights = tsm_weights
+        self.selection_weights = selection_weights
+        self.top_k = top_k
+        self.reserve_for = set(reserve_for)
+        self.reserve_slots = reserve_slots
+        self.reserve_factor = reserve_factor
+        self.senior = self.seniority >= reserve_min_seniority
+        self._reserved_arrivals = deque(maxlen=rate_window)
+        self._senior_releases = deque(maxlen=rate_window)
+        self.rate_horizon = rate_horizon
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._heap = []
+        self._pending = {}
+        self._seq = itertools.count()
+        self.assigned = {}
+        self.recent = deque(maxlen=recent)
+        self._dispatch_seq = itertools.count(1)
+        self.stats = {'enqueued': 0, 'dispatched': 0, 'completed': 0, 'cancelled': 0,
+                      'wait_seconds_total': {level: 0.0 for level in RISK_RANK},
+                      'dispatched_by_level': {level: 0 for level in RISK_RANK}}
+
+    # ----- queue -----
+    def enqueue(self, ticket_id, risk_level, cri, urgency, skill):
+        """
+        Masukkan tiket ke antrian lalu jalankan dispatch
+
+        Args:
+            skill: ndarray skill per engineer (urutan self.engineers), sudah
+                dinormalisasi seperti match_ticket
+        Returns:
+            list assignment yang dilepas
+        """
+        ticket_id = str(ticket_id)
+        with self._lock:
+            if ticket_id in self._pending or ticket_id in self.assigned:
+                raise ValueError(f'ticket {ticket_id} is already queued or assigned')
+            item = _Pending(ticket_id, risk_level, float(cri), float(urgency),
+                            np.asarray(skill, dtype=np.float64), self.clock())
+            self._pending[ticket_id] = item
+            heapq.heappush(self._heap, (-RISK_RANK[risk_level], -item.cri, -item.urgency,
+                                        next(self._seq), item))
+            if risk_level in self.reserve_for:
+                self._reserved_arrivals.append(item.enqueued_at)
+            self.stats['enqueued'] += 1
+            return self._dispatch()
+
+    def cancel(self, ticket_ids):
+        """
+        Hapus tiket dari antrian
+
+        Lazy: entry heap hanya ditandai dan dilewati saat di-pop; heap
+        dibangun ulang jika entry batal lebih banyak dari entry aktif.
+        """
+        removed = 0
+        with self._lock:
+            for tid in ticket_ids:
+                item = self._pending.pop(str(tid), None)
+                if item is not None:
+                    item.cancelled = True
+                    removed += 1
+            self.stats['cancelled'] += removed
+            if len(self._heap) > 2 * len(self._pending) + 64:
+                self._heap = [e for e in self._heap if not e[-1].cancelled]
+                heapq.heapify(self._heap)
+        return removed
+
+    def complete(self, ticket_ids):
+        """Tiket selesai: kapasitas engineer kembali, lalu dispatch"""
+        with self._lock:
+            for tid in ticket_ids:
+                j = self.assigned.pop(str(tid), None)
+                if j is not None:
+                    self.open[j] = max(self.open[j] - 1, 0)
+                    self.stats['completed'] += 1
+                    if self.senior[j]:
+                        self._senior_releases.append(self.clock())
+            return self._dispatch()
+
+    def set_available(self, engineer, available):
+        """
+        Engineer cuti / kembali (POST /ai/dispatch/availability)
+
+        Tiket yang sudah di-dispatch ke engineer tetap miliknya; yang berubah
+        hanya kapasitas untuk tiket berikutnya.
+
+        Raises:
+            KeyError: engineer tidak ada di roster scheduler
+        """
+        with self._lock:
+            self.available[self.column[engineer]] = bool(available)
+            return self._dispatch()
+
+    # ----- dispatch -----
+    def _rate(self, events, now):
+        """
+        Event per detik dalam rate_horizon terakhir (event lama dibuang)
+
+        Jika deque penuh sebelum horizon, laju dihitung dari rentang event
+        yang tersimpan; nol setelah rate_horizon tanpa event.
+        """
+        while events and events[0] < now - self.rate_horizon:
+            events.popleft()
+        if not events:
+            return 0.0
+        if len(events) == events.maxlen and now > events[0]:
+            return len(events) / (now - events[0])
+        return len(events) / self.rate_horizon
+
+    def reserve_target(self):
+        """
+        Slot senior kosong yang ditahan untuk reserve_for saat ini
+
+        Rasio laju kedatangan HIGH terhadap laju slot senior kosong = perkiraan
+        tiket HIGH yang datang sebelum slot senior berikutnya kosong.
+        """
+        cap = self.reserve_slots * int((self.senior & self.available).sum())
+        if cap == 0:
+            return 0
+        now = self.clock()
+        arrivals = self._rate(self._reserved_arrivals, now)
+        if arrivals == 0:
+            return 0
+        releases = self._rate(self._senior_releases, now)
+        if releases == 0:
+            return cap
+        return min(cap, math.ceil(self.reserve_factor * arrivals / releases))
+
+    def _eligible(self, risk_level):
+        free = self.capacity - self.open
+        eligible = self.available & (free > 0)
+        if risk_level in self.reserve_for:
+            return eligible
+        # Slot senior hanya boleh dipakai selama sisa slot senior kosong > cadangan
+        senior_free = int(free[eligible & self.senior].sum())
+        if senior_free > self.reserve_target():
+            return eligible
+        return eligible & ~self.senior
+
+    def _workload(self):
+        lo, hi = self.open.min(), self.open.max()
+        if hi == lo:
+            return np.full(len(self.open), 0.5)
+        return 1 - (self.open - lo) / (hi - lo)
+
+    def _choose(self, item, eligible):
+        """Engineer untuk satu tiket: top-k TSM di antara yang eligible, lalu selection score"""
+        workload = self._workload()
+        tw = self.tsm_weights
+        tsm = tw['skill'] * item.skill + tw['seniority'] * self.seniority + tw['workload'] * workload
+        cols = np.flatnonzero(eligible)
+        k = min(self.top_k, len(cols))
+        top = cols[np.argpartition(-tsm[cols], k - 1)[:k]] if k < len(cols) else cols
+        w = self.selection_weights[item.risk_level]
+        selection = (w['skill'] * item.skill[top] + w['seniority'] * self.seniority[top]
+                     + w['workload'] * workload[top])
+        best = int(np.argmax(selection))
+        return int(top[best]), float(selection[best])
+
+    def _dispatch(self):
+        """
+        Lepas assignment dari kepala antrian selama tiket teratas punya kapasitas
+
+        Urutan heap menjamin tiket di belakang kepala tidak pernah punya
+        kapasitas eligible lebih banyak (risk level turun), jadi loop berhenti
+        di tiket pertama yang tidak bisa di-assign.
+        """
+        released = []
+        now = self.clock()
+        while self._heap:
+            item = self._heap[0][-1]
+            if item.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            eligible = self._eligible(item.risk_level)
+            if not eligible.any():
+                break
+            heapq.heappop(self._heap)
+            del self._pending[item.ticket_id]
+
+            j, score = self._choose(item, eligible)
+            self.open[j] += 1
+            self.assigned[item.ticket_id] = j
+            wait = now - item.enqueued_at
+            self.stats['dispatched'] += 1
+            self.stats['dispatched_by_level'][item.risk_level] += 1
+            self.stats['wait_seconds_total'][item.risk_level] += wait
+            record = {
+                'seq': next(self._dispatch_seq),
+                'id': item.ticket_id,
+                'engineer': self.engineers[j],
+                'risk_level': item.risk_level,
+                'cri': item.cri,
+                'assignment_score': round(score, 4),
+                'wait_seconds': round(wait, 3)
+            }
+            self.recent.append(record)
+            released.append(record)
+        return released
+
+    # ----- inspect -----
+    def queue_head(self, limit=20):
+        """
+        Tiket teratas antrian (urut prioritas)
+
+        nsmallest mengambil limit + jumlah entry batal yang masih di heap;
+        cancel() menjaga jumlah itu paling banyak ~2x antrian aktif.
+        """
+        with self._lock:
+            head = heapq.nsmallest(limit + len(self._heap) - len(self._pending), self._heap)
+            now = self.clock()
+            return [
+                {'id': e[-1].ticket_id, 'risk_level': e[-1].risk_level, 'cri': e[-1].cri,
+                 'urgency': e[-1].urgency, 'waiting_seconds': round(now - e[-1].enqueued_at, 3)}
+                for e in head if not e[-1].cancelled
+            ][:limit]
+
+    def dispatched_since(self, seq=0):
+        with self._lock:
+            return [r for r in self.recent if r['seq'] > seq]
+
+    def capacity_report(self):
+        with self._lock:
+            return [
+                {'engineer': e, 'open': int(self.open[j]), 'capacity': self.capacity,
+                 'senior': bool(self.senior[j]), 'available': bool(self.available[j])}
+                for j, e in enumerate(self.engineers)
+            ]
+
+    def info(self):
+        with self._lock:
+            by_level = self.stats['dispatched_by_level']
+            depth = {level: 0 for level in RISK_RANK}
+            for item in self._pending.values():
+                depth[item.risk_level] += 1
+            now = self.clock()
+            return {
+                'queue_depth': len(self._pending),
+                'queue_depth_by_level': depth,
+                'free_slots': int(np.maximum(self.capacity - self.open, 0)[self.available].sum()),
+                'reserve': {
+                    'target_slots': self.reserve_target(),
+                    'reserved_arrivals_per_second': round(self._rate(self._reserved_arrivals, now), 4),
+                    'senior_releases_per_second': round(self._rate(self._senior_releases, now), 4)
+                },
+                'enqueued': self.stats['enqueued'],
+                'dispatched': self.stats['dispatched'],
+                'completed': self.stats['completed'],
+                'cancelled': self.stats['cancelled'],
+                'dispatched_by_level': dict(by_level),
+                'mean_wait_seconds': {
+                    level: round(self.stats['wait_seconds_total'][level] / n, 3) if n else None
+                    for level, n in by_level.items()
+                }
+            }
+
+
+def make_scheduler(system, roster, open_counts, config, clock=time.monotonic):
+    """DispatchScheduler dari roster (DataFrame) dan open count, aturan dari CONFIG"""
+    tsm = system.tsm_calculator
+    availability = tsm.get_availability(roster)
+    seniority = tsm.calculate_seniority(roster)
+    engineers = sorted(availability)
+    cfg = config['dispatch']
+    return DispatchScheduler(
+        engineers,
+        [seniority.get(e, 0.25) for e in engineers],
+        [open_counts.get(e, 0) for e in engineers],
+        config['batch_solver']['max_open_tickets'],
+        config['tsm_weights'], config['selection_weights'], config['top_k_candidates'],
+        reserve_slots=cfg['reserve_slots'], reserve_min_seniority=cfg['reserve_min_seniority'],
+        reserve_for=cfg['reserve_for'], reserve_factor=cfg['reserve_factor'],
+        rate_window=cfg['rate_window'], rate_horizon=cfg['rate_horizon_seconds'], available=[availability[e] == 1 for e in engineers],
+        clock=clock, recent=cfg['recent']
+    )
+
+
+def score_tickets(system, scheduler, tickets):
+    """
+    CRI dan skill per engineer untuk tiket yang akan di-enqueue
+
+    Returns:
+        list (id, risk_level, cri_normalized, urgency_score, skill row)
+    """
+    cri = [system.cri_calculator.calculate_cri(t['ticket_text'], t['request_type'], t['urgency'])
+           for t in tickets]
+    skill = system.tsm_calculator.skill_matrix_for([t['ticket_text'] for t in tickets],
+                                                   scheduler.engineers)
+    return [(t['id'], c['risk_level'], c['cri_normalized'], c['urgency_category'], skill[i])
+            for i, (t, c) in enumerate(zip(tickets, cri))]
+
+
+# =============================================================================
+# SIMULATION
+# =============================================================================
+def _risk_level(cri):
+    return 'LOW' if cri < 0.3 else 'MEDIUM' if cri < 0.7 else 'HIGH'
+
+
+def simulate(n_tickets=100000, n_engineers=50, capacity=3, load=0.85, reserve_slots=1, seed=0):
+    """
+    Stream tiket sintetis (kedatangan Poisson, durasi eksponensial) melalui
+    DispatchScheduler dengan waktu virtual
+
+    Returns:
+        dict metrik: waktu per operasi, wait per risk level, porsi tiket HIGH
+        yang mendapat engineer senior, dan hasil cek invariant
+    """
+    from integrated_assignment import CONFIG
+
+    rng = np.random.default_rng(seed)
+    seniority = rng.choice([0.25, 0.5, 0.75, 1.0], n_engineers)
+    senior = seniority >= 0.75
+    mean_service = 1.0
+    arrival_rate = load * n_engineers * capacity / mean_service
+
+    arrivals = np.cumsum(rng.exponential(1 / arrival_rate, n_tickets))
+    services = rng.exponential(mean_service, n_tickets)
+    cris = rng.beta(2, 3, n_tickets)
+    urgency = rng.choice([0.5, 0.75, 1.0], n_tickets)
+    skill = rng.random((n_tickets, n_engineers)) ** 3
+    skill /= skill.max(axis=1, keepdims=True)
+
+    now = [0.0]
+    sched = DispatchScheduler(
+        [f'eng_{j}' for j in range(n_engineers)], seniority, np.zeros(n_engineers), capacity,
+        CONFIG['tsm_weights'], CONFIG['selection_weights'], CONFIG['top_k_candidates'],
+        reserve_slots=reserve_slots, reserve_factor=CONFIG['dispatch']['reserve_factor'],
+        rate_window=CONFIG['dispatch']['rate_window'], rate_horizon=20 * mean_service,
+        clock=lambda: now[0], recent=1
+    )
+
+    finish = []  # heap (waktu selesai, ticket id)
+    dispatched = {}
+    enqueue_s = dispatch_s = 0.0
+    max_depth = 0
+    over_capacity = 0
+    high_slot_free = []  # Tiket HIGH: ada slot senior kosong saat datang
+    depth_samples = {}
+
+    def release(records):
+        nonlocal over_capacity
+        for r in records:
+            i = int(r['id'])
+            dispatched[i] = r
+            heapq.heappush(finish, (now[0] + services[i], r['id']))
+        if (sched.open > capacity).any():
+            over_capacity += 1
+
+    for i in range(n_tickets):
+        # Selesaikan tiket yang selesai sebelum kedatangan berikutnya
+        while finish and finish[0][0] <= arrivals[i]:
+            now[0], tid = heapq.heappop(finish)
+            started = time.perf_counter()
+            released = sched.complete([tid])
+            dispatch_s += time.perf_counter() - started
+            release(released)
+
+        now[0] = arrivals[i]
+        level = _risk_level(cris[i])
+        if level == 'HIGH':
+            high_slot_free.append(bool(((sched.open < capacity) & senior).any()))
+        started = time.perf_counter()
+        released = sched.enqueue(str(i), level, cris[i], urgency[i], skill[i])
+        elapsed = time.perf_counter() - started
+        enqueue_s += elapsed
+        release(released)
+
+        depth = len(sched._pending)
+        max_depth = max(max_depth, depth)
+        bucket = 10 ** int(np.log10(depth)) if depth else 0
+        s = depth_samples.setdefault(bucket, [0, 0.0])
+        s[0] += 1
+        s[1] += elapsed
+
+    while finish:
+        now[0], tid = heapq.heappop(finish)
+        started = time.perf_counter()
+        released = sched.complete([tid])
+        dispatch_s += time.perf_counter() - started
+        release(released)
+
+    levels = np.array([_risk_level(c) for c in cris])
+    waits = {lvl: [dispatched[i]['wait_seconds'] for i in np.flatnonzero(levels == lvl) if i in dispatched]
+             for lvl in RISK_RANK}
+    high = [i for i in np.flatnonzero(levels == 'HIGH') if i in dispatched]
+    high_senior = np.mean([senior[sched.column[dispatched[i]['engineer']]] for i in high]) if high else None
+
+    return {
+        'tickets': n_tickets,
+        'engineers': n_engineers,
+        'capacity': capacity,
+        'load': load,
+        'dispatched': len(dispatched),
+        'max_queue_depth': max_depth,
+        'enqueue_us': round(enqueue_s / n_tickets * 1e6, 2),
+        'complete_dispatch_us': round(dispatch_s / n_tickets * 1e6, 2),
+        'enqueue_us_by_depth': {b: round(t / n * 1e6, 2) for b, (n, t) in sorted(depth_samples.items())},
+        'mean_wait': {lvl: round(float(np.mean(w)), 4) if w else None for lvl, w in waits.items()},
+        'p95_wait': {lvl: round(float(np.percentile(w, 95)), 4) if w else None for lvl, w in waits.items()},
+        'high_to_senior': round(float(high_senior), 4) if high_senior is not None else None,
+        'high_senior_slot_free': round(float(np.mean(high_slot_free)), 4) if high_slot_free else None,
+        'invariants': {
+            'all_dispatched_once': len(dispatched) == n_tickets and sched.stats['dispatched'] == n_tickets,
+            'capacity_respected': over_capacity == 0,
+            'queue_drained': len(sched._pending) == 0 and not sched.assigned
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Priority dispatch scheduler simulation")
+    parser.add_argument('--simulate', type=int, default=100000, help="Jumlah tiket sintetis")
+    parser.add_argument('--engineers', type=int, default=50)
+    parser.add_argument('--capacity', type=int, default=3)
+    parser.add_argument('--load', type=float, default=0.85, help="Utilisasi target kapasitas")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"\nSimulating {args.simulate} tickets, {args.engineers} engineers x {args.capacity} slots, "
+          f"load {args.load:.0%}")
+    results = {}
+    for label, reserve in (('dispatch (demand reserve)', 1), ('dispatch (no reserve)', 0)):
+        started = time.perf_counter()
+        results[label] = simulate(args.simulate, args.engineers, args.capacity, args.load, reserve, args.seed)
+        results[label]['seconds'] = round(time.perf_counter() - started, 2)
+
+    for label, r in results.items():
+        print(f"\n{'='*70}\n{label}  ({r['seconds']}s)\n{'='*70}")
+        print(f"Dispatched: {r['dispatched']}/{r['tickets']}   Max queue depth: {r['max_queue_depth']}")
+        print(f"Enqueue: {r['enqueue_us']} µs/ticket   Complete+dispatch: {r['complete_dispatch_us']} µs/ticket")
+        print(f"Enqueue µs by queue depth: {r['enqueue_us_by_depth']}")
+        print(f"Mean wait: {r['mean_wait']}")
+        print(f"P95 wait:  {r['p95_wait']}")
+        print(f"HIGH tickets -> senior engineer: {r['high_to_senior']:.2%}   "
+              f"senior slot free on HIGH arrival: {r['high_senior_slot_free']:.2%}")
+        for name, ok in r['invariants'].items():
+            print(f"  {'✓' if ok else '✗'} {name}")
+
+
+if __name__ == "__main__":
+    main()
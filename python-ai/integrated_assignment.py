@@ -9,15 +9,28 @@ import pandas as pd
 import numpy as np
 import re
 import string
+import sys
+import os
+import io
+import csv
+import json
+import hashlib
+import argparse
+import contextlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 from datetime import datetime, time, timedelta
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import RobustScaler, MinMaxScaler
-from scipy.sparse import csr_matrix
+from scipy.sparse import csr_matrix, vstack, diags
 import joblib
 from collections import defaultdict, Counter
 from tqdm.auto import tqdm
+from batch_solver import top_k_candidates, solve_capacitated_assignment
+from csv_cache import load_csv
+from sharded_index import ShardedEngineerIndex
+from vectorizer import QueryVectorizer, build_compact_vocabulary, vocabulary_matches
+from serialization import dumps_json
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -51,9 +64,180 @@ CONFIG = {
         'urgency': 0.30,
         'dependency': 0.20,
         'likelihood': 0.10
+    },
+    # Bobot seleksi CRI-TSM matching per risk level
+    'selection_weights': {
+        'HIGH': {'skill': 0.6, 'seniority': 0.3, 'workload': 0.1},
+        'MEDIUM': {'skill': 0.4, 'seniority': 0.3, 'workload': 0.3},
+        'LOW': {'skill': 0.2, 'seniority': 0.2, 'workload': 0.6}
+    },
+    # Batch solver global (kapasitas per engineer)
+    'batch_solver': {
+        'max_open_tickets': 10,  # Maksimal tiket In Progress per engineer
+        'candidate_k': 10        # Kandidat top-k TSM per tiket
+    },
+    # Inverted tag index untuk pre-seleksi kandidat di match_ticket.
+    # Pruning lossy (engineer di luar kandidat skill 0): nyalakan setelah cek
+    # recall lewat /ai/tag-index/recall, dan hanya untuk roster besar
+    'tag_index': {
+        'enabled': False,
+        'min_engineers': 5000,  # Di bawah ini full scan lebih murah dan exact
+        'min_candidates': 5,    # Kurang dari ini: fallback full scan
+        'max_candidates': 200
+    },
+    # Scoring centroid scatter-gather di worker process (roster besar)
+    'sharding': {
+        'enabled': True,
+        'min_engineers': 5000,  # Di bawah ini scoring in-process lebih cepat dari IPC
+        'shards': None,         # None = jumlah CPU
+        'top_k': 50,            # Top-k skill per shard & hasil merge (>= top_k_candidates)
+        'channels': 4           # Request match_ticket yang boleh scatter-gather bersamaan
+    },
+    # Roster inline dari caller (ai_service), disimpan per roster_version
+    'roster_cache': {
+        'max_entries': 16,
+        'ttl_seconds': 3600
+    },
+    # Cache stem / query vector / hasil CRI / roster yang bisa dibagi antar replica
+    # backend: 'memory' (per process), 'shm' (antar worker satu host),
+    # 'kv' (server protokol Redis), None = tanpa cache
+    'shared_cache': {
+        'backend': 'memory',
+        'max_bytes': 32 << 20,
+        'prefix': 'ai:',
+        'ttl_seconds': {
+            'default': 3600,
+            'stems': 86400,     # preprocess_text tidak bergantung pada model
+            'vectors': 86400,   # key memuat fingerprint vocabulary
+            'cri': 3600,
+            'roster': 3600,
+            'explanations': 3600
+        },
+        'shm': {'name': 'ai_service_cache', 'slots': 4096, 'slot_bytes': 8192},
+        'kv': {'host': '127.0.0.1', 'port': 6379, 'timeout': 0.05, 'retry_after': 5.0}
+    },
+    # Term penyumbang cosine skill per kandidat top di hasil /ai/assign
+    'explanations': {
+        'enabled': True,
+        'top_terms': 5
+    },
+    # Dispatch mode: priority queue CRI/urgency + kapasitas engineer (dispatch.py)
+    'dispatch': {
+        'enabled': False,
+        'reserve_slots': 1,             # Maks slot cadangan per engineer senior ...
+        'reserve_min_seniority': 0.75,
+        'reserve_for': ['HIGH'],        # ... hanya untuk risk level ini
+        'reserve_factor': 2.0,          # Cadangan = factor x laju HIGH / laju slot senior kosong
+        'rate_window': 50,              # Event terakhir untuk estimasi laju ...
+        'rate_horizon_seconds': 3600,   # ... dalam horizon ini; tanpa HIGH selama ini cadangan nol
+        'recent': 1000                  # Assignment terakhir untuk polling
+    },
+    # Shadow evaluation scorer skill alternatif di executor background (shadow.py)
+    'shadow': {
+        'enabled': False,
+        'sample_rate': 1.0,
+        'max_workers': 1,
+        'max_pending': 64,      # Lebih dari ini job shadow di-drop, bukan antri
+        'budget_ms': 200,       # Per scorer; lewat budget tidak dihitung di agreement
+        'log_path': 'shadow_log.jsonl',
+        'scorers': {
+            'full_scan': {'type': 'full_scan'},
+            'tag_profile': {'type': 'tag_profile'},
+            'skill_heavy': {
+                'type': 'primary',
+                'tsm_weights': {'skill': 0.6, 'seniority': 0.2, 'workload': 0.2}
+            }
+        }
+    },
+    # Job queue untuk batch recommendation asynchronous
+    'job_queue': {
+        'db_path': 'batch_jobs.sqlite3',
+        'max_workers': 2,
+        'stale_seconds': 300    # Job 'running' tanpa heartbeat selama ini boleh diambil alih
+    },
+    # Cache kolumnar untuk CSV (None = selalu baca CSV langsung)
+    'csv_cache_dir': '.csv_cache',
+    # Artifact model hasil build offline (build_models.py)
+    'model_artifacts': {
+        'profiles': 'engineer_profiles_tags.joblib',
+        'centroids': 'engineer_centroids_tfidf.joblib',
+        'vocabulary': 'compact_vocabulary.joblib',
+        'cri_scalers': 'cri_scalers.joblib'
+    },
+    # Hot reload artifact model (snapshot swap tanpa restart)
+    'hot_reload': {
+        'watch': False,
+        'interval_seconds': 5
+    },
+    # Degraded scoring untuk /ai/assign dengan latency budget
+    'degraded_scoring': {
+        # Estimasi awal biaya stage (ms) sebelum ada pengukuran
+        'stage_cost_priors_ms': {'roster': 300, 'workload': 100, 'skill_rerank': 150},
+        'ewma_alpha': 0.3,
+        'decay_seconds': 300,       # Half-life estimasi kembali ke prior
+        'max_sample_factor': 3.0,   # Satu sampel maksimal 3x estimasi (timeout / hiccup)
+        'probe_after_skips': 20,    # Stage yang di-degrade dicoba lagi setelah sekian request ...
+        'probe_after_seconds': 60   # ... atau setelah sekian detik
+    },
+    # Admission control ai_service: concurrency + antrian tunggu per route
+    'admission': {
+        'routes': {
+            '/ai/assign': {'concurrency': 4, 'queue': 16, 'max_wait_ms': 2000},
+            '/ai/recommend-batch': {'concurrency': 2, 'queue': 4, 'max_wait_ms': 5000},
+            '/ai/tag-index/recall': {'concurrency': 1, 'queue': 2, 'max_wait_ms': 1000},
+            '/ai/dispatch/enqueue': {'concurrency': 2, 'queue': 8, 'max_wait_ms': 2000},
+            # Reload board = scoring semua tiket open; GET /ai/pending tetap bebas
+            'POST /ai/pending': {'concurrency': 1, 'queue': 2, 'max_wait_ms': 5000}
+        },
+        # Lane prioritas: tidak antri di belakang route berat
+        'priority_routes': ['/health', '/ai/cri-only'],
+        'priority_concurrency': 16
+    },
+    # Endpoint /debug/profile: aktif hanya jika env var token di-set
+    'profiling': {
+        'token_env': 'AI_PROFILING_TOKEN',
+        'max_seconds': 60,
+        'sample_interval_ms': 5,
+        'top': 30
+    },
+    # Replay historis (replay.py)
+    'replay': {
+        'batch_minutes': 60,           # Tiket yang masuk dalam window ini di-assign sekaligus
+        'default_duration_hours': 24,  # Durasi tiket jika Data Olah tidak punya waktu selesai
+        'solver': 'global'
+    },
+    # Offline weight sweep (weight_sweep.py)
+    'weight_sweep': {
+        'samples': 2000,             # Jumlah kombinasi bobot yang dievaluasi
+        'seed': 0,
+        'agreement_k': [1, 3, 5],    # Top-k agreement dengan assignee historis
+        'workload_window_days': 7,   # Tiket dalam window ini dihitung sebagai workload
+        'chunk_elements': 1 << 25    # Batas elemen tensor (settings x tickets x engineers) per chunk
     }
 }
 
+SELECTION_REASONS = {
+    'HIGH': "High complexity task requires most skilled and senior engineer",
+    'MEDIUM': "Medium complexity task requires balanced skill and capacity",
+    'LOW': "Low complexity task can be handled by engineer with more capacity"
+}
+
+URGENCY_MAP = {'Low': 0.5, 'Medium': 0.75, 'High': 1.0}
+
+# Kolom CSV yang dibaca (alias di-resolve sekali oleh csv_cache)
+CRI_COLUMNS = {
+    'complexity_score': {'aliases': ['complexity_score'], 'dtype': 'float64', 'required': True},
+    'Urgency_Category': {'aliases': ['Urgency_Category'], 'dtype': 'float64', 'required': True},
+    'dependency_count': {'aliases': ['dependency_count'], 'dtype': 'float64', 'required': True},
+    'likelihood': {'aliases': ['likelihood'], 'dtype': 'float64', 'required': True},
+    'Request Name': {'aliases': ['Request Name'], 'dtype': 'category'}
+}
+
+WORKLOAD_COLUMNS = {
+    'status': {'aliases': ['Status','status','Status_x','status_x'], 'dtype': 'category'},
+    'engineer': {'aliases': ['Engineer','engineer','Assignee','assignee'], 'dtype': 'category'}
+}
+
 # Setup NLP
 nltk_stopword = stopwords.words('indonesian')
 stopword_id_factory = StopWordRemoverFactory()
@@ -87,18 +271,6 @@ stemmer = factory.create_stemmer()
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
-def find_col(df, candidates):
-    """Deteksi kolom berdasarkan kandidat nama"""
-    for cand in candidates:
-        for c in df.columns:
-            if cand.lower() == c.lower().strip():
-                return c
-    for cand in candidates:
-        for c in df.columns:
-            if cand.lower() in c.lower():
-                return c
-    return None
-
 def cleaning_text(text):
     """Membersihkan teks"""
     if pd.isna(text):
@@ -143,6 +315,112 @@ def preprocess_text(text):
     
     return text
 
+def approx_sizeof(obj, _seen=None):
+    """Perkiraan ukuran memory (bytes) sebuah objek beserta isinya"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + sys.getsizeof(np.empty(0))
+    if hasattr(obj, 'indptr') and hasattr(obj, 'data'):  # scipy sparse
+        return obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes
+    
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_sizeof(k, _seen) + approx_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_sizeof(v, _seen) for v in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(approx_sizeof(getattr(obj, a), _seen) for a in obj.__slots__ if hasattr(obj, a))
+    return size
+
+class CRIResult:
+    """Hasil CRI satu tiket; tetap bisa diakses seperti dict (result['risk_level'])"""
+    __slots__ = ('complexity_score', 'urgency_category', 'dependency_count', 'likelihood',
+                 'cri_robust', 'cri_normalized', 'risk_level')
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+    
+    def __getitem__(self, key):
+        return getattr(self, key)
+    
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class StageCosts:
+    """
+    Estimasi biaya (ms) per stage pipeline: EWMA dari durasi terukur
+    
+    Satu sampel lambat tidak boleh mematikan stage selamanya (stage yang
+    di-degrade tidak pernah diukur ulang):
+    - sampel di-cap ke max_sample_factor x estimasi saat itu
+    - estimasi meluruh ke prior dengan half-life decay_seconds sejak sampel terakhir
+    - stage yang sudah di-degrade probe_after_skips kali atau tidak jalan
+      selama probe_after_seconds direncanakan dengan biaya prior (re-probe)
+    """
+    
+    def __init__(self, priors, alpha=0.3, decay_seconds=300, max_sample_factor=3.0,
+                 probe_after_skips=20, probe_after_seconds=60, clock=None):
+        self.alpha = alpha
+        self.priors = dict(priors)
+        self.decay_seconds = decay_seconds
+        self.max_sample_factor = max_sample_factor
+        self.probe_after_skips = probe_after_skips
+        self.probe_after_seconds = probe_after_seconds
+        self.clock = clock or (lambda: datetime.now().timestamp())
+        self._lock = threading.Lock()
+        now = self.clock()
+        self._costs = dict(priors)
+        self._updated = {stage: now for stage in priors}
+        self._skips = {stage: 0 for stage in priors}
+        self.samples = {stage: 0 for stage in priors}
+    
+    def _aged(self, stage, now):
+        prior = self.priors[stage]
+        age = max(now - self._updated[stage], 0)
+        return prior + (self._costs[stage] - prior) * 0.5 ** (age / self.decay_seconds)
+    
+    def record(self, stage, elapsed_ms):
+        with self._lock:
+            now = self.clock()
+            current = self._aged(stage, now)
+            elapsed_ms = min(elapsed_ms, self.max_sample_factor * current)
+            if self.samples[stage] == 0:
+                self._costs[stage] = elapsed_ms
+            else:
+                self._costs[stage] = current + self.alpha * (elapsed_ms - current)
+            self._updated[stage] = now
+            self._skips[stage] = 0
+            self.samples[stage] += 1
+    
+    def skipped(self, stage):
+        """Stage di-degrade oleh rencana budget (tidak diukur)"""
+        with self._lock:
+            self._skips[stage] += 1
+    
+    def estimates(self):
+        """Estimasi saat ini (sudah meluruh ke prior)"""
+        with self._lock:
+            now = self.clock()
+            return {stage: self._aged(stage, now) for stage in self._costs}
+    
+    def plan_costs(self):
+        """Biaya untuk perencanaan: estimasi, atau prior untuk stage yang waktunya re-probe"""
+        with self._lock:
+            now = self.clock()
+            costs = {}
+            for stage in self._costs:
+                due = (self._skips[stage] >= self.probe_after_skips or
+                       (self._skips[stage] and now - self._updated[stage] >= self.probe_after_seconds))
+                costs[stage] = min(self.priors[stage], self._aged(stage, now)) if due \
+                    else self._aged(stage, now)
+            return costs
+
 # =============================================================================
 # MODULE 1: CRI CALCULATOR
 # =============================================================================
@@ -152,71 +430,63 @@ class CRICalculator:
     Berdasarkan model yang sudah ditraining dari Data CRI Final.csv
     """
     
+    # SharedCache untuk hasil CRI (di-set AIAssignmentSystem); None = tanpa cache
+    cache = None
+    _fingerprint = None
+    
     def __init__(self, data_cri_path):
         print("\n" + "="*80)
         print("INITIALIZING CRI CALCULATOR")
         print("="*80)
         
-        self.df_cri = pd.read_csv(data_cri_path)
-        print(f"✓ Loaded CRI training data: {len(self.df_cri)} records")
+        df_cri = load_csv(data_cri_path, CRI_COLUMNS, CONFIG['csv_cache_dir'])
+        print(f"✓ Loaded CRI training data: {len(df_cri)} records")
         
-        # Load atau build scalers
+        # Load scalers (hasil build offline)
         self._prepare_scalers()
         
-        # Load historical stats untuk normalisasi
-        self._load_historical_stats()
+        # Load historical stats untuk normalisasi; DataFrame tidak disimpan
+        self._load_historical_stats(df_cri)
     
     def _prepare_scalers(self):
-        """Prepare RobustScaler dan MinMaxScaler dari data historis"""
-        try:
-            # Try load existing scalers
-            scaler_data = joblib.load('cri_scalers.joblib')
-            self.robust_scaler = scaler_data['robust']
-            self.minmax_scaler = scaler_data['minmax']
-            print("✓ Loaded existing CRI scalers")
-        except:
-            # Build new scalers
-            print("Building new CRI scalers...")
-            
-            cols = ["complexity_score", "Urgency_Category", "dependency_count", "likelihood"]
-            
-            # RobustScaler
-            self.robust_scaler = RobustScaler()
-            robust_features = self.df_cri[cols].copy()
-            self.robust_scaler.fit(robust_features)
-            
-            # Apply robust scaling
-            robust_scaled = self.robust_scaler.transform(robust_features)
-            
-            # MinMaxScaler
-            self.minmax_scaler = MinMaxScaler()
-            self.minmax_scaler.fit(robust_scaled)
-            
-            # Save scalers
-            joblib.dump({
-                'robust': self.robust_scaler,
-                'minmax': self.minmax_scaler
-            }, 'cri_scalers.joblib')
-            
-            print("✓ CRI scalers created and saved")
+        """
+        Load RobustScaler dan MinMaxScaler hasil build offline
+        
+        Serving tidak pernah build ulang; jalankan build_models.py jika belum ada.
+        """
+        path = CONFIG['model_artifacts']['cri_scalers']
+        if not Path(path).exists():
+            raise FileNotFoundError(
+                f"{path} not found. Run `python build_models.py` to build model artifacts."
+            )
+        
+        scaler_data = joblib.load(path)
+        self.robust_scaler = scaler_data['robust']
+        self.minmax_scaler = scaler_data['minmax']
+        print("✓ Loaded existing CRI scalers")
     
-    def _load_historical_stats(self):
-        """Load statistik historis untuk estimasi parameter"""
+    def _load_historical_stats(self, df_cri):
+        """Ringkas statistik historis yang dibutuhkan untuk estimasi parameter"""
+        def summary(col):
+            return {
+                'min': float(df_cri[col].min()),
+                'max': float(df_cri[col].max()),
+                'mean': float(df_cri[col].mean()),
+                'median': float(df_cri[col].median())
+            }
+        
         self.stats = {
-            'complexity': {
-                'min': self.df_cri['complexity_score'].min(),
-                'max': self.df_cri['complexity_score'].max(),
-                'mean': self.df_cri['complexity_score'].mean(),
-                'median': self.df_cri['complexity_score'].median()
-            },
-            'dependency': {
-                'min': self.df_cri['dependency_count'].min(),
-                'max': self.df_cri['dependency_count'].max(),
-                'mean': self.df_cri['dependency_count'].mean(),
-                'median': self.df_cri['dependency_count'].median()
-            },
-            'likelihood': self.df_cri['likelihood'].to_dict()
+            'complexity': summary('complexity_score'),
+            'dependency': summary('dependency_count')
         }
+        
+        # Distribusi request type (urut frekuensi, sama dengan value_counts)
+        self.likelihood_dist = {}
+        if 'Request Name' in df_cri.columns:
+            freq = df_cri['Request Name'].value_counts()
+            self.likelihood_dist = {
+                name: float(p) for name, p in (freq / freq.sum()).items()
+            }
     
     def estimate_complexity(self, ticket_text, urgency='Medium'):
         """
@@ -290,23 +560,34 @@ class CRICalculator:
         Menggunakan distribusi historis
         """
         # Cari request type yang mirip di data historis
-        if 'Request Name' in self.df_cri.columns:
-            freq = self.df_cri['Request Name'].value_counts()
-            likelihood_dist = freq / freq.sum()
-            
-            # Exact match
-            if request_type in likelihood_dist:
-                return likelihood_dist[request_type]
-            
-            # Fuzzy match
-            request_lower = request_type.lower()
-            for req_name, likelihood in likelihood_dist.items():
-                if request_lower in str(req_name).lower() or str(req_name).lower() in request_lower:
-                    return likelihood
+        likelihood_dist = self.likelihood_dist
+        
+        # Exact match
+        if request_type in likelihood_dist:
+            return likelihood_dist[request_type]
+        
+        # Fuzzy match
+        request_lower = request_type.lower()
+        for req_name, likelihood in likelihood_dist.items():
+            if request_lower in str(req_name).lower() or str(req_name).lower() in request_lower:
+                return likelihood
         
         # Default: median likelihood
         return 0.05  # 5% default probability
     
+    @property
+    def fingerprint(self):
+        """Hash scaler, statistik historis dan bobot CRI; bagian key cache 'cri'"""
+        if self._fingerprint is None:
+            scaler_params = {
+                name: getattr(scaler, name).tolist()
+                for scaler in (self.robust_scaler, self.minmax_scaler)
+                for name in ('center_', 'scale_', 'min_') if hasattr(scaler, name)
+            }
+            state = [scaler_params, self.stats, self.likelihood_dist, CONFIG['cri_weights'], URGENCY_MAP]
+            self._fingerprint = hashlib.sha1(dumps_json(state)).hexdigest()[:16]
+        return self._fingerprint
+    
     def calculate_cri(self, ticket_text, request_type='General Request', urgency='Medium'):
         """
         Hitung CRI untuk permintaan baru
@@ -314,6 +595,12 @@ class CRICalculator:
         Returns:
             dict dengan semua parameter dan CRI final (normalized)
         """
+        if self.cache is not None:
+            cache_key = json.dumps([self.fingerprint, ticket_text, request_type, urgency])
+            cached = self.cache.get('cri', cache_key)
+            if cached is not None:
+                return CRIResult(**cached)
+        
         print(f"\n{'='*60}")
         print("CALCULATING CRI FOR NEW REQUEST")
         print(f"{'='*60}")
@@ -327,8 +614,7 @@ class CRICalculator:
         likelihood = self.estimate_likelihood(request_type)
         
         # Urgency mapping
-        urgency_map = {'Low': 0.5, 'Medium': 0.75, 'High': 1.0}
-        urgency_score = urgency_map.get(urgency, 0.75)
+        urgency_score = URGENCY_MAP.get(urgency, 0.75)
         
         print(f"\nEstimated Parameters:")
         print(f"  - Complexity Score: {complexity:.4f}")
@@ -369,14 +655,25 @@ class CRICalculator:
         print(f"CRI Result: {cri_normalized:.4f} ({risk_level})")
         print(f"{'─'*60}")
         
+        result = CRIResult(
+            complexity_score=float(complexity),
+            urgency_category=urgency_score,
+            dependency_count=dependency,
+            likelihood=float(likelihood),
+            cri_robust=float(cri_robust),
+            cri_normalized=float(cri_normalized),
+            risk_level=risk_level
+        )
+        if self.cache is not None:
+            self.cache.set('cri', cache_key, result.to_dict())
+        return result
+    
+    def memory_report(self):
+        """Perkiraan bytes resident per komponen"""
         return {
-            'complexity_score': complexity,
-            'urgency_category': urgency_score,
-            'dependency_count': dependency,
-            'likelihood': likelihood,
-            'cri_robust': cri_robust,
-            'cri_normalized': cri_normalized,
-            'risk_level': risk_level
+            'scalers': approx_sizeof(self.robust_scaler.__dict__) + approx_sizeof(self.minmax_scaler.__dict__),
+            'stats': approx_sizeof(self.stats),
+            'likelihood_dist': approx_sizeof(self.likelihood_dist)
         }
 
 # =============================================================================
@@ -385,6 +682,17 @@ class CRICalculator:
 class TSMCalculator:
     """Talent Scoring Model untuk matching engineer dengan permintaan"""
     
+    # Hasil terakhir yang berhasil, dipakai degraded scoring
+    last_roster = None
+    last_open_counts = None
+    
+    # ShardedEngineerIndex jika roster cukup besar (lihat CONFIG['sharding'])
+    shards = None
+    
+    # SharedCache untuk stem dan query vector (di-set AIAssignmentSystem)
+    cache = None
+    _centroid_fingerprint = None
+    
     def __init__(self, data_olah_path, data_cri_path):
         print("\n" + "="*80)
         print("INITIALIZING TSM CALCULATOR")
@@ -393,120 +701,123 @@ class TSMCalculator:
         self.data_olah = data_olah_path
         self.data_cri = data_cri_path
         
-        # Load or build models
-        self._load_or_build_models()
+        # Load models (hasil build offline)
+        self._load_models()
+        self._stack_centroids()
+        self._load_vocabulary()
+        self._build_tag_index()
+        self._build_shards()
     
-    def _load_or_build_models(self):
-        """Load existing models atau build baru"""
-        try:
-            print("Loading existing TSM models...")
-            skill_data = joblib.load('engineer_profiles_tags.joblib')
-            centroid_data = joblib.load('engineer_centroids_tfidf.joblib')
-            
-            self.profiles = skill_data['profiles']
-            self.tfidf_obj = skill_data['tfidf_tag']
-            self.centroids = centroid_data['centroids']
-            print("✓ TSM models loaded successfully")
-        except:
-            print("Building new TSM models...")
-            self.profiles, self.centroids, self.tfidf_obj = self._build_skill_profiles()
-            
-            # Save models
-            joblib.dump({'tfidf_tag': self.tfidf_obj, 'profiles': self.profiles}, 
-                        'engineer_profiles_tags.joblib')
-            joblib.dump({'tfidf_tag': self.tfidf_obj, 'centroids': self.centroids}, 
-                        'engineer_centroids_tfidf.joblib')
-            print("✓ TSM models saved")
-    
-    def _build_skill_profiles(self):
-        """Build skill profiles dari data historis"""
-        df = pd.read_csv(self.data_olah)
-        
-        columns = {
-            'summary': find_col(df, ['Summary','summary','Summary_x']),
-            'judul': find_col(df, ['Judul Request_x','Judul_Request_x','Judul Request x','judul request_x','judul']),
-            'description': find_col(df, ['Description','Deskripsi','description','deskripsi']),
-            'status_x': find_col(df, ['Status_x','Status x','status_x','status']),
-            'status_y': find_col(df, ['Status_y','Status y','status_y']),
-            'engineer': find_col(df, ['Engineer','engineer','Assignee','assignee','petugas','pegawai']),
-        }
+    def _load_models(self):
+        """
+        Load model TSM hasil build offline
         
-        # Gabungkan text fields
-        df['text_raw'] = ""
-        if columns['summary']:
-            df['text_raw'] += df[columns['summary']].fillna("").astype(str) + " "
-        if columns['judul']:
-            df['text_raw'] += df[columns['judul']].fillna("").astype(str) + " "
-        if columns['description']:
-            df['text_raw'] += df[columns['description']].fillna("").astype(str) + " "
-        
-        df['text_processed'] = df['text_raw'].apply(preprocess_text)
-        
-        # Filter completed tasks
-        mask = (df[columns['engineer']].notna()) & (df['text_processed'].str.strip() != '')
-        df_skill = df[mask].copy().reset_index(drop=True)
-        
-        # TF-IDF
-        tfidf = TfidfVectorizer(min_df=CONFIG['min_df'], max_df=CONFIG['max_df'])
-        X_tfidf = tfidf.fit_transform(df_skill['text_processed'].fillna("").tolist())
-        terms = tfidf.get_feature_names_out()
-        
-        # Extract tags per engineer
-        eng_tag_counts = defaultdict(Counter)
-        for idx, row in df_skill.iterrows():
-            eng = row[columns['engineer']]
-            if pd.isna(eng):
-                continue
-            
-            vec = X_tfidf[idx]
-            arr = vec.toarray().ravel()
-            if arr.sum() == 0:
-                continue
-            
-            top_idx = np.argsort(arr)[-CONFIG['top_n_tags']:][::-1]
-            top_tags = [terms[i] for i in top_idx if arr[i] > 0]
-            eng_tag_counts[eng].update(top_tags)
-        
-        # Build profiles
-        profiles = {}
-        for eng, ctr in eng_tag_counts.items():
-            total_tickets = sum(ctr.values())
-            max_count = max(ctr.values()) if ctr else 1
-            
-            tag_scores = {}
-            for tag, cnt in ctr.items():
-                frequency_score = cnt / max_count
-                relative_score = cnt / total_tickets
-                combined_score = (frequency_score * CONFIG['frequency_weight']) + \
-                               (relative_score * CONFIG['relative_weight'])
-                tag_scores[tag] = combined_score
-            
-            profiles[eng] = tag_scores
+        Serving tidak pernah build ulang; jalankan build_models.py jika belum ada.
+        """
+        artifacts = CONFIG['model_artifacts']
+        for key in ('profiles', 'centroids'):
+            if not Path(artifacts[key]).exists():
+                raise FileNotFoundError(
+                    f"{artifacts[key]} not found. Run `python build_models.py` to build model artifacts."
+                )
+        
+        print("Loading existing TSM models...")
+        skill_data = joblib.load(artifacts['profiles'])
+        centroid_data = joblib.load(artifacts['centroids'])
+        
+        self.profiles = skill_data['profiles']
+        self.tfidf_obj = skill_data['tfidf_tag']
+        self.centroids = centroid_data['centroids']
+        del skill_data, centroid_data
+        
+        # Vocabulary compact opsional; jika belum ada diturunkan dari TF-IDF
+        vocab_path = artifacts.get('vocabulary')
+        self.compact_vocabulary = joblib.load(vocab_path) if vocab_path and Path(vocab_path).exists() else None
+        print("✓ TSM models loaded successfully")
+    
+    def _stack_centroids(self):
+        """
+        Susun centroid per engineer menjadi satu matrix float32 (engineers x vocab)
         
-        # Build centroids
-        engineer_centroids = {}
-        for eng, idxs in df_skill.groupby(columns['engineer']).indices.items():
-            rows_tfidf = X_tfidf[list(idxs)]
-            centroid = rows_tfidf.mean(axis=0)
-            
-            if hasattr(centroid, 'A'):
-                centroid = csr_matrix(centroid.A)
-            elif isinstance(centroid, np.ndarray):
-                if centroid.ndim == 1:
-                    centroid = centroid.reshape(1, -1)
-                centroid = csr_matrix(centroid)
-            
-            engineer_centroids[eng] = centroid
+        Baris sudah dinormalisasi L2 sehingga cosine similarity cukup dot product
+        dengan query TF-IDF (yang juga L2-normalized). Dict centroid per engineer
+        dibuang setelahnya.
+        """
+        self.engineer_names = list(self.centroids.keys())
+        self.engineer_index = {eng: i for i, eng in enumerate(self.engineer_names)}
+        matrix = vstack(
+            [self.centroids[eng] for eng in self.engineer_names]
+        ).tocsr().astype(np.float32)
+        
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self.centroid_matrix = csr_matrix(diags(1.0 / norms).astype(np.float32) @ matrix)
+        del self.centroids
+    
+    def _load_vocabulary(self):
+        """
+        Pasang vocabulary compact dan QueryVectorizer
         
-        print(f"✓ Built skill profiles for {len(profiles)} engineers")
+        Kolom centroid_matrix dipangkas ke term dengan massa centroid non-zero
+        (norm baris tidak berubah). TfidfVectorizer dibuang setelahnya; semua
+        query vector dibangun lewat self.vectorizer.
+        """
+        vocabulary = self.compact_vocabulary
+        if vocabulary is None or not vocabulary_matches(vocabulary, self.tfidf_obj):
+            if vocabulary is not None:
+                print("⚠️  Compact vocabulary does not match TF-IDF model, rebuilding in memory")
+            vocabulary = build_compact_vocabulary(self.tfidf_obj, self.centroid_matrix)
+        
+        source = vocabulary['source_columns']
+        if len(source) < self.centroid_matrix.shape[1]:
+            self.centroid_matrix = self.centroid_matrix[:, source].tocsr()
+        self.vectorizer = QueryVectorizer(vocabulary)
+        print(f"✓ Compact vocabulary: {len(source)}/{vocabulary['n_features']} terms")
+        del self.compact_vocabulary, self.tfidf_obj
+    
+    def _build_shards(self):
+        """
+        Partisi centroid_matrix dan tag_index ke worker process untuk match_ticket
         
-        return profiles, engineer_centroids, tfidf
+        Keduanya tetap disimpan di process ini untuk batch scoring dan process
+        hasil fork.
+        """
+        cfg = CONFIG['sharding']
+        if not cfg['enabled'] or len(self.engineer_names) < cfg['min_engineers']:
+            return
+        
+        n_shards = cfg['shards'] or os.cpu_count() or 1
+        if n_shards < 2:
+            return  # Satu shard hanya menambah biaya IPC
+        
+        tag_cfg = CONFIG['tag_index']
+        self.shards = ShardedEngineerIndex(
+            self.centroid_matrix,
+            self.tag_index,
+            n_shards,
+            max(cfg['top_k'], CONFIG['top_k_candidates']),
+            tag_cfg['min_candidates'],
+            tag_cfg['max_candidates'],
+            cfg['channels']
+        )
+        print(f"✓ Engineer index sharded: {self.shards.n_shards} shards, {self.shards.shard_sizes} engineers")
+    
+    def memory_report(self):
+        """Perkiraan bytes resident per komponen"""
+        vectorizer = self.vectorizer
+        return {
+            'centroid_matrix': approx_sizeof(self.centroid_matrix),
+            'tag_index': approx_sizeof(self.tag_index),
+            'vocabulary': approx_sizeof(vectorizer.columns) + approx_sizeof(vectorizer.norm_only),
+            'idf_weights': approx_sizeof(vectorizer.idf) + approx_sizeof(vectorizer.source_columns),
+            'engineer_index': approx_sizeof(self.engineer_names) + approx_sizeof(self.engineer_index)
+        }
     
-    def get_employees_from_api(self):
+    def get_employees_from_api(self, timeout=5):
         """Ambil data employee dari API"""
         url = f"{CONFIG['base_url']}/employees"
         try:
-            resp = requests.get(url, timeout=5)
+            resp = requests.get(url, timeout=timeout)
             resp.raise_for_status()
             data = resp.json()
             
@@ -517,6 +828,8 @@ class TSMCalculator:
             
             df = pd.DataFrame(records)
             print(f"✓ API: Loaded {len(df)} employees")
+            if not df.empty:
+                self.last_roster = df
             return df
         except Exception as e:
             print(f"✗ API Error: {e}")
@@ -536,6 +849,9 @@ class TSMCalculator:
                 is_available = False
             elif 'status' in row and str(row['status']).lower() in ['cuti', 'leave', 'inactive']:
                 is_available = False
+            elif 'attendance' in row and str(row['attendance']).lower() == 'cuti':
+                # Field dari data employee Node ('cuti' / 'bekerja')
+                is_available = False
             
             availability[engineer_name] = 1 if is_available else 0
         
@@ -561,28 +877,32 @@ class TSMCalculator:
         
         return dict(zip(df['name'], df['seniority_weight']))
     
-    def calculate_workload(self):
-        """Hitung current workload"""
-        df_olah = pd.read_csv(self.data_olah)
-        df_cri = pd.read_csv(self.data_cri)
+    def get_open_ticket_counts(self):
+        """Hitung jumlah tiket In Progress per engineer"""
+        df_olah = load_csv(self.data_olah, WORKLOAD_COLUMNS, CONFIG['csv_cache_dir'])
         
         # Filter only In Progress
-        status_col = find_col(df_olah, ['Status','status','Status_x','status_x'])
-        if status_col:
-            df_olah[status_col] = df_olah[status_col].astype(str).str.strip().str.lower()
-            df_olah = df_olah[df_olah[status_col] == 'in progress']
+        if 'status' in df_olah:
+            status = df_olah['status'].astype(str).str.strip().str.lower()
+            df_olah = df_olah[status == 'in progress']
         
-        if df_olah.empty:
+        if df_olah.empty or 'engineer' not in df_olah:
             return {}
         
-        # Get engineer column
-        eng_col = find_col(df_olah, ['Engineer','engineer','Assignee','assignee'])
-        if eng_col is None:
+        counts = df_olah.groupby('engineer', observed=True).size()
+        self.last_open_counts = {str(eng): int(n) for eng, n in counts.items()}
+        return self.last_open_counts
+    
+    def calculate_workload(self, open_counts=None):
+        """Hitung current workload"""
+        if open_counts is None:
+            open_counts = self.get_open_ticket_counts()
+        
+        if not open_counts:
             return {}
         
         # Simple count-based workload
-        df_result = df_olah.groupby(eng_col).size().reset_index(name='ticket_count')
-        df_result.columns = ['Engineer', 'ticket_count']
+        df_result = pd.DataFrame(list(open_counts.items()), columns=['Engineer', 'ticket_count'])
         
         min_val = df_result['ticket_count'].min()
         max_val = df_result['ticket_count'].max()
@@ -595,15 +915,194 @@ class TSMCalculator:
         
         return dict(zip(df_result['Engineer'], df_result['workload_final']))
     
-    def match_ticket(self, ticket_text):
-        """Match ticket dengan engineers berdasarkan skill similarity"""
-        processed_text = preprocess_text(ticket_text)
-        v = self.tfidf_obj.transform([processed_text])
+    def _build_tag_index(self):
+        """
+        Inverted index tag -> engineer dari self.profiles
+        
+        Disimpan sebagai CSR matrix (vocab x engineers) berisi skor profile;
+        baris ke-t adalah posting list untuk term kolom t di vocabulary
+        compact. Dict profiles dibuang setelahnya.
+        """
+        vocab = self.vectorizer.columns
+        rows, cols, vals = [], [], []
+        for eng, tag_scores in self.profiles.items():
+            j = self.engineer_index.get(eng)
+            if j is None:
+                continue
+            for tag, score in tag_scores.items():
+                t = vocab.get(tag)
+                if t is None:
+                    continue
+                rows.append(t)
+                cols.append(j)
+                vals.append(score)
+        
+        self.tag_index = csr_matrix(
+            (np.array(vals, dtype=np.float32), (rows, cols)),
+            shape=(self.vectorizer.n_columns, len(self.engineer_names))
+        )
+        del self.profiles
+        self.tag_index_stats = {'pruned': 0, 'fallback': 0, 'candidates': 0}
+        self._tag_stats_lock = threading.Lock()
+        print(f"✓ Tag index built: {self.tag_index.nnz} postings")
+    
+    @property
+    def tag_pruning(self):
+        """Pruning tag index dipakai di match_ticket (enabled dan roster cukup besar)"""
+        cfg = CONFIG['tag_index']
+        return cfg['enabled'] and len(self.engineer_names) >= cfg['min_engineers']
+    
+    def tag_index_info(self):
+        """Counter pruned / fallback match_ticket"""
+        with self._tag_stats_lock:
+            return {'pruning_active': self.tag_pruning, **self.tag_index_stats}
+    
+    def candidate_rows(self, processed_text, force=False):
+        """
+        Pre-seleksi engineer dari tag tiket lewat inverted index
+        
+        force=True mengabaikan tag_pruning (untuk cek recall sebelum diaktifkan).
+        
+        Returns:
+            list indeks baris centroid_matrix (urut skor profile),
+            atau None jika harus full scan
+        """
+        cfg = CONFIG['tag_index']
+        if not (force or self.tag_pruning):
+            return None
         
-        sims = {}
-        for eng, cent in self.centroids.items():
-            sim = cosine_similarity(v, cent)[0, 0]
-            sims[eng] = float(sim)
+        vocab = self.vectorizer.columns
+        index = self.tag_index
+        scores = defaultdict(float)
+        for tok in set(processed_text.split()):
+            t = vocab.get(tok)
+            if t is None:
+                continue
+            start, end = index.indptr[t], index.indptr[t + 1]
+            for j, score in zip(index.indices[start:end].tolist(), index.data[start:end].tolist()):
+                scores[j] += score
+        
+        # Kandidat terlalu sedikit: fallback ke full scan
+        if len(scores) < cfg['min_candidates']:
+            return None
+        
+        rows = sorted(scores, key=scores.get, reverse=True)
+        if cfg['max_candidates']:
+            rows = rows[:cfg['max_candidates']]
+        return rows
+    
+    def _score_rows(self, v, rows=None):
+        """Cosine similarity query vector terhadap centroid (semua atau sebagian baris)"""
+        q = v.astype(np.float32).T
+        if rows is None:
+            sims = (self.centroid_matrix @ q).toarray().ravel()
+            return {eng: float(sim) for eng, sim in zip(self.engineer_names, sims)}
+        
+        sims = (self.centroid_matrix[rows] @ q).toarray().ravel()
+        return {self.engineer_names[j]: float(sim) for j, sim in zip(rows, sims)}
+    
+    def preprocess(self, ticket_text):
+        """preprocess_text lewat shared cache (stemming paling mahal di jalur request)"""
+        if self.cache is None:
+            return preprocess_text(ticket_text)
+        return self.cache.get_or_compute('stems', ticket_text, lambda: preprocess_text(ticket_text))
+    
+    def query_vector(self, processed_text):
+        """Query vector satu tiket lewat shared cache; key memuat fingerprint vocabulary"""
+        if self.cache is None:
+            return self.vectorizer.transform_one(processed_text)
+        return self.cache.get_or_compute(
+            'vectors', f"{self.vectorizer.fingerprint}:{processed_text}",
+            lambda: self.vectorizer.transform_one(processed_text)
+        )
+    
+    @property
+    def centroid_fingerprint(self):
+        """Hash centroid_matrix (compact) dan urutan engineer; bagian key cache 'explanations'"""
+        if self._centroid_fingerprint is None:
+            matrix = self.centroid_matrix
+            digest = hashlib.sha1(self.vectorizer.fingerprint.encode())
+            for part in (matrix.indptr, matrix.indices, matrix.data):
+                digest.update(np.ascontiguousarray(part).tobytes())
+            digest.update('\n'.join(self.engineer_names).encode())
+            self._centroid_fingerprint = digest.hexdigest()[:16]
+        return self._centroid_fingerprint
+    
+    def explain_terms(self, ticket_text, engineers, top_n=None):
+        """
+        Term yang paling menyumbang cosine skill tiket terhadap centroid engineer
+        
+        Kontribusi term = bobot query x bobot centroid pada kolom yang non-zero
+        di keduanya; jumlah semua kontribusi sama dengan cosine mentah (sebelum
+        dinormalisasi max seperti di match_ticket). Hanya irisan indices sparse
+        yang dihitung, vector tidak pernah di-densify.
+        
+        Returns:
+            {engineer: list dict term, contribution, share}; engineer yang tidak
+            ada di centroid_matrix mendapat list kosong
+        """
+        top_n = top_n or CONFIG['explanations']['top_terms']
+        processed_text = self.preprocess(ticket_text)
+        v = self.query_vector(processed_text)
+        ticket_key = hashlib.sha1(processed_text.encode()).hexdigest()[:16]
+        matrix = self.centroid_matrix
+        terms = self.vectorizer.terms
+        
+        explanations = {}
+        for eng in engineers:
+            cache_key = f"{self.centroid_fingerprint}:{ticket_key}:{eng}:{top_n}"
+            if self.cache is not None:
+                cached = self.cache.get('explanations', cache_key)
+                if cached is not None:
+                    explanations[eng] = cached
+                    continue
+            
+            j = self.engineer_index.get(eng)
+            if j is None:
+                explanations[eng] = []
+                continue
+            start, end = matrix.indptr[j], matrix.indptr[j + 1]
+            cols, qi, ci = np.intersect1d(v.indices, matrix.indices[start:end],
+                                          assume_unique=True, return_indices=True)
+            contrib = v.data[qi].astype(np.float64) * matrix.data[start:end][ci]
+            total = contrib.sum()
+            order = np.argsort(-contrib, kind='stable')[:top_n]
+            explanations[eng] = [
+                {'term': terms[cols[k]],
+                 'contribution': round(float(contrib[k]), 6),
+                 'share': round(float(contrib[k] / total), 4) if total > 0 else 0.0}
+                for k in order.tolist()
+            ]
+            if self.cache is not None:
+                self.cache.set('explanations', cache_key, explanations[eng])
+        return explanations
+    
+    def match_ticket(self, ticket_text, availability=None):
+        """
+        Match ticket dengan engineers berdasarkan skill similarity
+        
+        Dengan tag_pruning aktif, engineer di luar kandidat tag index tidak
+        dihitung (skill 0), kecuali kandidat terlalu sedikit sehingga fallback
+        ke full scan.
+        Dengan index ter-shard, full scan hanya mengembalikan top-k engineer
+        (CONFIG['sharding']['top_k']); sisanya juga dianggap skill 0. Jika
+        availability ({engineer: 0/1}) diberikan, top-k hanya dari engineer
+        available.
+        """
+        processed_text = self.preprocess(ticket_text)
+        v = self.query_vector(processed_text)
+        
+        if self.shards is not None and self.shards.usable:
+            sims, rows = self._match_sharded(v, processed_text, availability)
+        else:
+            rows = self.candidate_rows(processed_text)
+            sims = self._score_rows(v, rows)
+        with self._tag_stats_lock:
+            if rows is None:
+                self.tag_index_stats['fallback'] += 1
+            else:
+                self.tag_index_stats['pruned'] += 1
+                self.tag_index_stats['candidates'] += len(rows)
         
         maxv = max(sims.values()) if sims else 1.0
         if maxv > 0:
@@ -611,10 +1110,133 @@ class TSMCalculator:
         
         return sims
     
-    def calculate_tsm(self, ticket_text):
+    def _match_sharded(self, v, processed_text, availability=None):
+        """
+        Scatter-gather match_ticket lewat shard
+        
+        Returns:
+            (dict engineer -> cosine, baris kandidat tag index atau None jika full scan)
+        """
+        terms = self.vectorizer.term_columns(processed_text)
+        eligible = None
+        if availability is not None:
+            eligible = np.fromiter((availability.get(eng, 0) != 0 for eng in self.engineer_names),
+                                   dtype=bool, count=len(self.engineer_names))
+        rows, sims, pruned = self.shards.match(v, terms, self.tag_pruning, eligible)
+        rows = rows.tolist()
+        scores = {self.engineer_names[j]: sim for j, sim in zip(rows, sims.tolist())}
+        return scores, rows if pruned else None
+    
+    def tag_index_recall(self, ticket_texts, k=None):
+        """
+        Recall@k kandidat tag index terhadap full scan
+        
+        Returns:
+            dict recall_at_k, rata-rata ukuran kandidat, dan fallback rate
+        """
+        k = k or CONFIG['top_k_candidates']
+        hits = total = n_candidates = n_fallback = 0
+        
+        for text in ticket_texts:
+            processed_text = self.preprocess(text)
+            v = self.query_vector(processed_text)
+            full = self._score_rows(v)
+            top_full = {eng for eng, sim in sorted(full.items(), key=lambda x: -x[1])[:k] if sim > 0}
+            if not top_full:
+                continue
+            
+            rows = self.candidate_rows(processed_text, force=True)
+            if rows is None:
+                n_fallback += 1
+                rows = list(range(len(self.engineer_names)))
+            n_candidates += len(rows)
+            pruned = self._score_rows(v, rows)
+            top_pruned = {eng for eng, _ in sorted(pruned.items(), key=lambda x: -x[1])[:k]}
+            
+            hits += len(top_full & top_pruned)
+            total += len(top_full)
+        
+        n = len(ticket_texts)
+        return {
+            'k': k,
+            'tickets': n,
+            'recall_at_k': round(hits / total, 4) if total else None,
+            'mean_candidates': round(n_candidates / n, 2) if n else 0,
+            'roster_size': len(self.engineer_names),
+            'fallback_rate': round(n_fallback / n, 4) if n else 0,
+            'pruning_active': self.tag_pruning
+        }
+    
+    def match_tickets(self, ticket_texts):
+        """
+        Skill similarity untuk banyak tiket sekaligus
+        
+        Returns:
+            ndarray (tickets x engineers) mengikuti urutan self.engineer_names,
+            dinormalisasi per tiket seperti match_ticket
+        """
+        return self.match_processed([self.preprocess(t) for t in ticket_texts])
+    
+    def match_processed(self, processed_texts):
+        """match_tickets untuk teks yang sudah melalui preprocess_text"""
+        V = self.vectorizer.transform(processed_texts)
+        sims = (self.centroid_matrix @ V.T).toarray().T
+        
+        maxv = sims.max(axis=1, keepdims=True)
+        np.divide(sims, maxv, out=sims, where=maxv > 0)
+        return sims
+    
+    def get_engineer_snapshot(self, roster=None, open_counts=None):
+        """
+        Snapshot engineer yang available untuk batch scoring
+        
+        Args:
+            roster: DataFrame employee inline (default: ambil dari API)
+            open_counts: {engineer: tiket In Progress} inline (default: Data Olah)
+        
+        Returns:
+            dict berisi nama engineer dan array seniority, workload, open_tickets
+            (urutan sama), atau None jika roster tidak tersedia
+        """
+        df_employees = roster if roster is not None else self.get_employees_from_api()
+        if df_employees.empty:
+            return None
+        
+        availability = self.get_availability(df_employees)
+        seniority = self.calculate_seniority(df_employees)
+        if open_counts is None:
+            open_counts = self.get_open_ticket_counts()
+        workload = self.calculate_workload(open_counts)
+        
+        engineers = sorted(eng for eng, avail in availability.items() if avail == 1)
+        
+        return {
+            'engineers': engineers,
+            'seniority': np.array([seniority.get(e, 0.25) for e in engineers], dtype=np.float32),
+            'workload': np.array([workload.get(e, 0.5) for e in engineers], dtype=np.float32),
+            'open_tickets': np.array([open_counts.get(e, 0) for e in engineers], dtype=np.int64)
+        }
+    
+    def skill_matrix_for(self, ticket_texts, engineers):
+        """Skill similarity (tickets x engineers) untuk daftar engineer tertentu"""
+        sims = self.match_tickets(ticket_texts)
+        skill = np.zeros((len(ticket_texts), len(engineers)), dtype=np.float32)
+        
+        cols = [(j, self.engineer_index[eng]) for j, eng in enumerate(engineers)
+                if eng in self.engineer_index]
+        if cols:
+            dst, src = map(list, zip(*cols))
+            skill[:, dst] = sims[:, src]
+        return skill
+    
+    def calculate_tsm(self, ticket_text, roster=None, open_counts=None):
         """
         Calculate TSM scores untuk semua engineers
         
+        Args:
+            roster: DataFrame employee inline (default: ambil dari API)
+            open_counts: {engineer: tiket In Progress} inline (default: Data Olah)
+        
         Returns:
             DataFrame dengan ranking engineers
         """
@@ -623,15 +1245,19 @@ class TSMCalculator:
         print(f"{'='*60}")
         
         # Get data
-        df_employees = self.get_employees_from_api()
+        df_employees = roster if roster is not None else self.get_employees_from_api()
         if df_employees.empty:
             return pd.DataFrame()
         
         availability = self.get_availability(df_employees)
         seniority = self.calculate_seniority(df_employees)
-        workload = self.calculate_workload()
-        skill_scores = self.match_ticket(ticket_text)
+        workload = self.calculate_workload(open_counts)
+        skill_scores = self.match_ticket(ticket_text, availability)
         
+        return self.rank_engineers(availability, seniority, workload, skill_scores)
+    
+    def rank_engineers(self, availability, seniority, workload, skill_scores):
+        """Gabungkan skill, seniority dan workload menjadi ranking TSM (DataFrame)"""
         # Calculate TSM for all engineers
         all_engineers = set()
         all_engineers.update(skill_scores.keys())
@@ -662,6 +1288,8 @@ class TSMCalculator:
             })
         
         df_results = pd.DataFrame(tsm_results)
+        if df_results.empty:
+            return df_results
         df_results = df_results.sort_values('tsm_score', ascending=False).reset_index(drop=True)
         
         print(f"✓ TSM calculated for {len(df_results)} available engineers")
@@ -677,7 +1305,7 @@ class AIAssignmentSystem:
     untuk assignment engineer yang optimal
     """
     
-    def __init__(self, data_olah_path, data_cri_path):
+    def __init__(self, data_olah_path, data_cri_path, cache=None):
         print("\n" + "🎯"*40)
         print("INITIALIZING AI ASSIGNMENT SYSTEM")
         print("🎯"*40)
@@ -688,9 +1316,34 @@ class AIAssignmentSystem:
         # Initialize TSM Calculator
         self.tsm_calculator = TSMCalculator(data_olah_path, data_cri_path)
         
+        # Shared cache opsional (shared_cache.make_cache), dipakai CRI dan TSM
+        self.cri_calculator.cache = cache
+        self.tsm_calculator.cache = cache
+        
         print("\n✓ AI Assignment System ready!")
     
-    def assign_engineer(self, ticket_text, request_type='General Request', urgency='Medium'):
+    _stage_costs = None
+    
+    @property
+    def stage_costs(self):
+        """Biaya terukur stage pipeline untuk degraded scoring (dibuat saat pertama dipakai)"""
+        if self._stage_costs is None:
+            cfg = CONFIG['degraded_scoring']
+            self._stage_costs = StageCosts(
+                cfg['stage_cost_priors_ms'], cfg['ewma_alpha'], cfg['decay_seconds'],
+                cfg['max_sample_factor'], cfg['probe_after_skips'], cfg['probe_after_seconds']
+            )
+        return self._stage_costs
+    
+    def memory_report(self):
+        """Perkiraan bytes resident per komponen model"""
+        return {
+            'cri_calculator': self.cri_calculator.memory_report(),
+            'tsm_calculator': self.tsm_calculator.memory_report()
+        }
+    
+    def assign_engineer(self, ticket_text, request_type='General Request', urgency='Medium',
+                        budget_ms=None, roster=None, open_counts=None):
         """
         Main assignment function
         
@@ -699,9 +1352,17 @@ class AIAssignmentSystem:
         2. Get top 5 engineers dari TSM
         3. Select best engineer berdasarkan CRI-TSM matching
         
+        Dengan budget_ms, pipeline turun bertahap agar selesai dalam budget
+        (lihat _assign_within_budget). roster (DataFrame employee) dan
+        open_counts inline menggantikan panggilan API employees / baca Data Olah.
+        
         Returns:
             dict dengan hasil assignment lengkap
         """
+        if budget_ms is not None:
+            return self._assign_within_budget(ticket_text, request_type, urgency, budget_ms,
+                                              roster, open_counts)
+        
         print("\n" + "🚀"*40)
         print("AI ASSIGNMENT PROCESS STARTED")
         print("🚀"*40)
@@ -714,7 +1375,7 @@ class AIAssignmentSystem:
         cri_result = self.cri_calculator.calculate_cri(ticket_text, request_type, urgency)
         
         # ===== STEP 2: Calculate TSM and get top candidates =====
-        tsm_results = self.tsm_calculator.calculate_tsm(ticket_text)
+        tsm_results = self.tsm_calculator.calculate_tsm(ticket_text, roster, open_counts)
         
         if tsm_results.empty:
             print("\n❌ ERROR: No available engineers found")
@@ -731,6 +1392,7 @@ class AIAssignmentSystem:
             print(f"{idx+1}. {row['engineer']:<30} TSM: {row['tsm_score']:.4f}")
         
         # ===== STEP 3: Select best engineer based on CRI-TSM matching =====
+        self._explain_candidates(ticket_text, top_candidates)
         selected_engineer = self._select_best_engineer(cri_result, top_candidates)
         
         # ===== Compile final result =====
@@ -750,7 +1412,8 @@ class AIAssignmentSystem:
                 'tsm_score': selected_engineer['tsm_score'],
                 'skill_score': selected_engineer['skill_score'],
                 'seniority_weight': selected_engineer['seniority_weight'],
-                'workload_capacity': selected_engineer['workload_capacity']
+                'workload_capacity': selected_engineer['workload_capacity'],
+                'top_terms': selected_engineer['top_terms']
             },
             'top_candidates': top_candidates.to_dict('records'),
             'recommendation_reason': selected_engineer['reason']
@@ -761,6 +1424,279 @@ class AIAssignmentSystem:
         
         return result
     
+    def _plan_stages(self, stages, remaining_ms, fallbacks):
+        """
+        Pilih stage yang dijalankan agar estimasi biaya muat di sisa budget
+        
+        Stage dengan biaya terukur terbesar di-degrade lebih dulu (jika punya
+        fallback). Returns (set stage yang dijalankan, cukup_budget)
+        """
+        costs = self.stage_costs.plan_costs()
+        run = set(stages)
+        total = sum(costs[s] for s in stages)
+        for stage in sorted(stages, key=lambda s: -costs[s]):
+            if total <= remaining_ms:
+                break
+            if fallbacks[stage]:
+                run.discard(stage)
+                total -= costs[stage]
+        return run, total <= remaining_ms
+    
+    def _assign_within_budget(self, ticket_text, request_type, urgency, budget_ms,
+                              roster=None, open_counts=None):
+        """
+        assign_engineer dengan latency budget
+        
+        Stage mahal dan fallback-nya:
+        - roster: API employees -> roster terakhir yang berhasil
+        - workload: baca tiket In Progress -> workload cache terakhir (atau netral)
+        - skill_rerank: skill similarity TSM -> ranking seniority/workload saja
+        Jika roster tidak bisa didapat dalam budget, hasil CRI-only
+        (selected_engineer None). Rencana dihitung ulang sebelum setiap stage.
+        Roster / open_counts inline tidak punya biaya, stage-nya dilewati.
+        """
+        started = datetime.now()
+        elapsed_ms = lambda: (datetime.now() - started).total_seconds() * 1000
+        tsm = self.tsm_calculator
+        
+        cri_result = self.cri_calculator.calculate_cri(ticket_text, request_type, urgency)
+        
+        stages = ['roster', 'workload', 'skill_rerank']
+        df_employees = roster
+        if roster is not None:
+            stages.remove('roster')
+        if open_counts is not None:
+            stages.remove('workload')
+        fallbacks = {
+            'roster': tsm.last_roster is not None,
+            'workload': True,
+            'skill_rerank': True
+        }
+        degraded = []
+        cri_only = False
+        skill_scores = {}
+        availability = None
+        
+        for i, stage in enumerate(stages):
+            run, fits = self._plan_stages(stages[i:], budget_ms - elapsed_ms(), fallbacks)
+            if stage == 'roster' and not fits and not fallbacks['roster']:
+                self.stage_costs.skipped(stage)
+                cri_only = True
+                break
+            
+            if stage not in run:
+                self.stage_costs.skipped(stage)
+                degraded.append(stage)
+                if stage == 'roster':
+                    df_employees = tsm.last_roster
+                elif stage == 'workload':
+                    open_counts = tsm.last_open_counts or {}
+                continue
+            
+            stage_started = datetime.now()
+            if stage == 'roster':
+                timeout = max((budget_ms - elapsed_ms()) / 1000, 0.05)
+                df_employees = tsm.get_employees_from_api(timeout=min(timeout, 5))
+                if df_employees.empty and tsm.last_roster is not None:
+                    degraded.append(stage)
+                    df_employees = tsm.last_roster
+            elif stage == 'workload':
+                open_counts = tsm.get_open_ticket_counts()
+            else:
+                if df_employees is not None:
+                    availability = tsm.get_availability(df_employees)
+                skill_scores = tsm.match_ticket(ticket_text, availability)
+            self.stage_costs.record(stage, (datetime.now() - stage_started).total_seconds() * 1000)
+        
+        if not cri_only and (df_employees is None or df_employees.empty):
+            cri_only = True
+        
+        costs = self.stage_costs.estimates()
+        degradation = {
+            'budget_ms': budget_ms,
+            'cri_only': cri_only,
+            'degraded': sorted(degraded, key=lambda s: -costs[s]),
+            'stage_costs_ms': {s: round(c, 2) for s, c in sorted(costs.items(), key=lambda x: -x[1])}
+        }
+        cri_analysis = {
+            'cri_normalized': cri_result['cri_normalized'],
+            'risk_level': cri_result['risk_level'],
+            'complexity_score': cri_result['complexity_score'],
+            'urgency_category': cri_result['urgency_category'],
+            'dependency_count': cri_result['dependency_count'],
+            'likelihood': cri_result['likelihood']
+        }
+        
+        tsm_results = pd.DataFrame()
+        if not cri_only:
+            tsm_results = tsm.rank_engineers(
+                availability if availability is not None else tsm.get_availability(df_employees),
+                tsm.calculate_seniority(df_employees),
+                tsm.calculate_workload(open_counts),
+                skill_scores
+            )
+        
+        if tsm_results.empty:
+            degradation['cri_only'] = True
+            degradation['elapsed_ms'] = round(elapsed_ms(), 2)
+            print(f"\n⚠️ Degraded to CRI-only result (budget {budget_ms}ms)")
+            return {
+                'selected_engineer': None,
+                'assignment_score': None,
+                'cri_analysis': cri_analysis,
+                'tsm_analysis': None,
+                'top_candidates': [],
+                'recommendation_reason': "Latency budget exceeded: CRI-only result, assign later",
+                'degradation': degradation
+            }
+        
+        top_k = min(CONFIG['top_k_candidates'], len(tsm_results))
+        top_candidates = tsm_results.head(top_k).copy()
+        if skill_scores:
+            self._explain_candidates(ticket_text, top_candidates)
+        selected_engineer = self._select_best_engineer(cri_result, top_candidates)
+        degradation['elapsed_ms'] = round(elapsed_ms(), 2)
+        if degraded:
+            print(f"\n⚠️ Degraded stages: {', '.join(degradation['degraded'])} (budget {budget_ms}ms)")
+        
+        return {
+            'selected_engineer': selected_engineer['engineer'],
+            'assignment_score': selected_engineer['final_score'],
+            'cri_analysis': cri_analysis,
+            'tsm_analysis': {
+                'engineer': selected_engineer['engineer'],
+                'tsm_score': selected_engineer['tsm_score'],
+                'skill_score': selected_engineer['skill_score'],
+                'seniority_weight': selected_engineer['seniority_weight'],
+                'workload_capacity': selected_engineer['workload_capacity'],
+                'top_terms': selected_engineer['top_terms']
+            },
+            'top_candidates': top_candidates.to_dict('records'),
+            'recommendation_reason': selected_engineer['reason'],
+            'degradation': degradation
+        }
+    
+    def assign_batch(self, tickets, roster=None, open_counts=None):
+        """
+        Global batch assignment dengan kapasitas per engineer
+        
+        Berbeda dengan assign_engineer yang greedy per tiket, seluruh batch
+        diselesaikan sekaligus: selection score (tickets x engineers) dari bobot
+        CRI-TSM, kandidat dipangkas ke top-k TSM, dan setiap engineer hanya
+        menerima tiket sebanyak sisa kapasitasnya.
+        
+        Args:
+            tickets: list of dict dengan key ticket_text, request_type, urgency
+            roster, open_counts: data inline (lihat get_engineer_snapshot)
+        
+        Returns:
+            list hasil per tiket (None jika tidak kebagian kapasitas),
+            atau None jika tidak ada engineer available
+        """
+        print("\n" + "🚀"*40)
+        print(f"GLOBAL BATCH ASSIGNMENT: {len(tickets)} tickets")
+        print("🚀"*40)
+        
+        snapshot = self.tsm_calculator.get_engineer_snapshot(roster, open_counts)
+        if snapshot is None or not snapshot['engineers']:
+            print("\n❌ ERROR: No available engineers found")
+            return None
+        
+        engineers = snapshot['engineers']
+        cri_results = [
+            self.cri_calculator.calculate_cri(t['ticket_text'], t['request_type'], t['urgency'])
+            for t in tickets
+        ]
+        skill = self.tsm_calculator.skill_matrix_for(
+            [t['ticket_text'] for t in tickets], engineers
+        )
+        
+        levels = [c['risk_level'] for c in cri_results]
+        assignment, selection, tsm = self.solve_batch(levels, skill, snapshot)
+        
+        results = []
+        for i, j in enumerate(assignment):
+            if j < 0:
+                results.append(None)
+                continue
+            cri = cri_results[i]
+            results.append({
+                'selected_engineer': engineers[j],
+                'assignment_score': round(float(selection[i, j]), 4),
+                'cri_analysis': {
+                    'cri_normalized': cri['cri_normalized'],
+                    'risk_level': cri['risk_level'],
+                    'complexity_score': cri['complexity_score'],
+                    'urgency_category': cri['urgency_category'],
+                    'dependency_count': cri['dependency_count'],
+                    'likelihood': cri['likelihood']
+                },
+                'tsm_analysis': {
+                    'engineer': engineers[j],
+                    'tsm_score': round(float(tsm[i, j]), 4),
+                    'skill_score': round(float(skill[i, j]), 4),
+                    'seniority_weight': round(float(snapshot['seniority'][j]), 4),
+                    'workload_capacity': round(float(snapshot['workload'][j]), 4)
+                },
+                'recommendation_reason': SELECTION_REASONS[cri['risk_level']]
+            })
+        
+        assigned = sum(r is not None for r in results)
+        print(f"\n✓ Global batch assigned: {assigned}/{len(tickets)} tickets")
+        
+        return results
+    
+    @staticmethod
+    def solve_batch(levels, skill, snapshot, solver='global'):
+        """
+        Scoring dan assignment untuk batch yang CRI dan skill-nya sudah dihitung
+        
+        Args:
+            levels: risk level per tiket ('LOW'/'MEDIUM'/'HIGH')
+            skill: ndarray (tickets x engineers) mengikuti snapshot['engineers']
+            snapshot: dict seperti get_engineer_snapshot
+            solver: 'global' (kapasitas per engineer) atau 'greedy' (seperti
+                assign_engineer: selection score tertinggi di top-k TSM, tanpa kapasitas)
+        
+        Returns:
+            (assignment, selection, tsm) - assignment berisi indeks engineer
+            per tiket, -1 jika tidak kebagian kapasitas
+        """
+        # TSM matrix untuk pruning kandidat
+        tsm_w = CONFIG['tsm_weights']
+        tsm = (tsm_w['skill'] * skill +
+               tsm_w['seniority'] * snapshot['seniority'][None, :] +
+               tsm_w['workload'] * snapshot['workload'][None, :])
+        
+        # Selection score per tiket mengikuti bobot risk level masing-masing
+        sel_w = CONFIG['selection_weights']
+        w_skill = np.array([sel_w[l]['skill'] for l in levels], dtype=np.float32)[:, None]
+        w_sen = np.array([sel_w[l]['seniority'] for l in levels], dtype=np.float32)[:, None]
+        w_wl = np.array([sel_w[l]['workload'] for l in levels], dtype=np.float32)[:, None]
+        selection = (w_skill * skill +
+                     w_sen * snapshot['seniority'][None, :] +
+                     w_wl * snapshot['workload'][None, :])
+        
+        n_engineers = len(snapshot['engineers'])
+        if solver == 'greedy':
+            candidates = top_k_candidates(tsm, min(CONFIG['top_k_candidates'], n_engineers))
+            best = np.take_along_axis(selection, candidates, axis=1).argmax(axis=1)
+            assignment = candidates[np.arange(len(candidates)), best]
+            return assignment, selection, tsm
+        
+        solver_cfg = CONFIG['batch_solver']
+        capacities = np.maximum(solver_cfg['max_open_tickets'] - snapshot['open_tickets'], 0)
+        candidates = top_k_candidates(tsm, min(solver_cfg['candidate_k'], n_engineers))
+        assignment = solve_capacitated_assignment(selection, capacities, candidates)
+        return assignment, selection, tsm
+    
+    def _explain_candidates(self, ticket_text, top_candidates):
+        """Tambah kolom top_terms (term penyumbang skill score) ke kandidat top, in place"""
+        if not CONFIG['explanations']['enabled'] or top_candidates.empty:
+            return
+        explanations = self.tsm_calculator.explain_terms(ticket_text, top_candidates['engineer'].tolist())
+        top_candidates['top_terms'] = [explanations[eng] for eng in top_candidates['engineer']]
+    
     def _select_best_engineer(self, cri_result, top_candidates):
         """
         Pilih engineer terbaik dari top candidates berdasarkan CRI-TSM matching
@@ -782,35 +1718,23 @@ class AIAssignmentSystem:
         # Add selection score untuk setiap kandidat
         top_candidates = top_candidates.copy()
         
+        weights = CONFIG['selection_weights'][risk_level]
         if risk_level == "HIGH":
             # High risk: prioritas skill dan seniority
             print("Strategy: HIGH RISK - Prioritizing skill and seniority")
-            top_candidates['selection_score'] = (
-                0.6 * top_candidates['skill_score'] +
-                0.3 * top_candidates['seniority_weight'] +
-                0.1 * top_candidates['workload_capacity']
-            )
-            reason = "High complexity task requires most skilled and senior engineer"
-            
         elif risk_level == "LOW":
             # Low risk: prioritas workload capacity
             print("Strategy: LOW RISK - Prioritizing workload capacity")
-            top_candidates['selection_score'] = (
-                0.2 * top_candidates['skill_score'] +
-                0.2 * top_candidates['seniority_weight'] +
-                0.6 * top_candidates['workload_capacity']
-            )
-            reason = "Low complexity task can be handled by engineer with more capacity"
-            
         else:  # MEDIUM
             # Medium risk: balanced approach
             print("Strategy: MEDIUM RISK - Balanced approach")
-            top_candidates['selection_score'] = (
-                0.4 * top_candidates['skill_score'] +
-                0.3 * top_candidates['seniority_weight'] +
-                0.3 * top_candidates['workload_capacity']
-            )
-            reason = "Medium complexity task requires balanced skill and capacity"
+        
+        reason = SELECTION_REASONS[risk_level]
+        top_candidates['selection_score'] = (
+            weights['skill'] * top_candidates['skill_score'] +
+            weights['seniority'] * top_candidates['seniority_weight'] +
+            weights['workload'] * top_candidates['workload_capacity']
+        )
         
         # Sort by selection score
         top_candidates = top_candidates.sort_values('selection_score', ascending=False)
@@ -830,6 +1754,7 @@ class AIAssignmentSystem:
             'seniority_weight': best['seniority_weight'],
             'workload_capacity': best['workload_capacity'],
             'final_score': best['selection_score'],
+            'top_terms': best.get('top_terms', []),
             'reason': reason
         }
     
@@ -871,7 +1796,8 @@ class AIAssignmentSystem:
         print(f"TOP {len(result['top_candidates'])} CANDIDATES")
         print(f"{'='*80}")
         for i, cand in enumerate(result['top_candidates'], 1):
-            print(f"{i}. {cand['engineer']:<30} TSM: {cand['tsm_score']:.4f}")
+            terms = ', '.join(t['term'] for t in cand.get('top_terms', []))
+            print(f"{i}. {cand['engineer']:<30} TSM: {cand['tsm_score']:.4f}" + (f"  [{terms}]" if terms else ""))
         
         print("\n" + "="*80)
 
@@ -888,7 +1814,200 @@ def _prompt_input(prompt, default=None):
     except EOFError:
         return default
 
+# =============================================================================
+# BULK MODE: CSV/JSONL -> JSONL tanpa prompt interaktif
+# =============================================================================
+BULK_FIELDS = {
+    'ticket_text': ('ticket_text', 'text', 'summary', 'Summary', 'judul', 'description', 'Description'),
+    'request_type': ('request_type', 'Request Name', 'Request Type', 'type'),
+    'urgency': ('urgency', 'Urgency', 'priority', 'Priority'),
+    'id': ('id', 'request_id', 'ticket_id', 'ID')
+}
+
+# System untuk worker bulk; di-set sebelum pool dibuat sehingga worker hasil
+# fork berbagi model yang sudah di-load (copy-on-write)
+_bulk_system = None
+
+def _normalize_urgency(urgency):
+    u = urgency.title() if isinstance(urgency, str) else "Medium"
+    return u if u in ['Low', 'Medium', 'High'] else 'Medium'
+
+def read_bulk_tickets(source, fmt=None):
+    """
+    Baca tiket satu per satu (streaming) dari file CSV/JSONL atau stdin ('-')
+    
+    Yields:
+        dict dengan key id, ticket_text, request_type, urgency
+    """
+    if fmt is None:
+        fmt = 'csv' if str(source).lower().endswith('.csv') else 'jsonl'
+    
+    f = sys.stdin if source == '-' else open(source, newline='', encoding='utf-8')
+    try:
+        rows = csv.DictReader(f) if fmt == 'csv' else (
+            json.loads(line) for line in f if line.strip()
+        )
+        for row in rows:
+            ticket = {}
+            for key, aliases in BULK_FIELDS.items():
+                ticket[key] = next((row[a] for a in aliases if row.get(a) not in (None, '')), None)
+            ticket['request_type'] = ticket['request_type'] or 'General Request'
+            ticket['urgency'] = _normalize_urgency(ticket['urgency'])
+            yield ticket
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def _bulk_json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _init_bulk_worker(data_olah_path, data_cri_path):
+    """Initializer worker tanpa fork (spawn): load model sekali per worker"""
+    global _bulk_system
+    if _bulk_system is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _bulk_system = AIAssignmentSystem(data_olah_path, data_cri_path)
+
+def _assign_chunk(chunk):
+    """Assign satu chunk [(index, ticket)] di worker; log assignment dibuang"""
+    records = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for index, ticket in chunk:
+            record = {'index': index, 'id': ticket['id']}
+            if not ticket['ticket_text']:
+                record['error'] = 'ticket_text is required'
+                records.append(record)
+                continue
+            try:
+                record['result'] = _bulk_system.assign_engineer(
+                    ticket['ticket_text'], ticket['request_type'], ticket['urgency']
+                )
+            except Exception as e:
+                record['error'] = str(e)
+            records.append(record)
+    return records
+
+def _chunked(tickets, size):
+    chunk = []
+    for index, ticket in enumerate(tickets):
+        chunk.append((index, ticket))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_bulk(system, tickets, out, workers=1, ordered=True, chunk_size=16, max_inflight=None):
+    """
+    Assign semua tiket lalu tulis satu baris JSON per tiket ke `out`
+    
+    Input dibaca lazily dan jumlah chunk yang sedang diproses dibatasi
+    (max_inflight) sehingga memory tetap konstan untuk input sebesar apa pun.
+    Dengan ordered=False, hasil ditulis segera setelah chunk selesai.
+    
+    Returns:
+        dict ringkasan (tickets, assigned, failed, elapsed_seconds, tickets_per_second)
+    """
+    global _bulk_system
+    _bulk_system = system
+    stats = {'tickets': 0, 'assigned': 0, 'failed': 0}
+    progress = tqdm(desc="Assigning", unit="ticket", file=sys.stderr)
+    started = datetime.now()
+    
+    def emit(records):
+        for record in records:
+            stats['tickets'] += 1
+            if record.get('result'):
+                stats['assigned'] += 1
+            else:
+                stats['failed'] += 1
+            out.write(json.dumps(record, default=_bulk_json_default) + "\n")
+        out.flush()
+        progress.update(len(records))
+    
+    chunks = _chunked(tickets, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            emit(_assign_chunk(chunk))
+    else:
+        max_inflight = max_inflight or workers * 2
+        methods = multiprocessing.get_all_start_methods()
+        if 'fork' in methods:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_bulk_worker,
+                                       initargs=(CONFIG['data_olah'], CONFIG['data_cri']))
+        with pool:
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(_assign_chunk, chunk))
+                while len(pending) >= max_inflight:
+                    if ordered:
+                        emit(pending.pop(0).result())
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                            pending.remove(fut)
+                            emit(fut.result())
+            if ordered:
+                for fut in pending:
+                    emit(fut.result())
+            else:
+                for fut in wait(pending).done:
+                    emit(fut.result())
+    
+    progress.close()
+    elapsed = (datetime.now() - started).total_seconds()
+    stats['elapsed_seconds'] = round(elapsed, 2)
+    stats['tickets_per_second'] = round(stats['tickets'] / elapsed, 2) if elapsed > 0 else None
+    return stats
+
+def _run_bulk_cli(args):
+    # stdout bisa jadi output JSONL: semua log diarahkan ke stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        system = AIAssignmentSystem(
+            data_olah_path=CONFIG['data_olah'],
+            data_cri_path=CONFIG['data_cri']
+        )
+    
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        stats = run_bulk(
+            system, read_bulk_tickets(args.bulk, args.format), out,
+            workers=args.workers, ordered=not args.unordered, chunk_size=args.chunk_size
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    print(f"\n{'─'*60}", file=sys.stderr)
+    print(f"✓ Bulk assignment: {stats['assigned']}/{stats['tickets']} assigned, "
+          f"{stats['failed']} failed", file=sys.stderr)
+    print(f"  {stats['elapsed_seconds']}s ({stats['tickets_per_second']} tickets/s, "
+          f"{args.workers} workers)", file=sys.stderr)
+    print(f"{'─'*60}", file=sys.stderr)
+
+def _parse_cli_args():
+    parser = argparse.ArgumentParser(description="AI assignment (interactive atau bulk)")
+    parser.add_argument('--bulk', metavar='INPUT',
+                        help="File CSV/JSONL berisi tiket, atau '-' untuk stdin (JSONL)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'],
+                        help="Format input (default: dari ekstensi file)")
+    parser.add_argument('--output', default='-', help="File JSONL output (default: stdout)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--unordered', action='store_true',
+                        help="Tulis hasil segera setelah selesai (tidak mengikuti urutan input)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    cli_args = _parse_cli_args()
+    if cli_args.bulk:
+        _run_bulk_cli(cli_args)
+        sys.exit(0)
+    
     print("\n" + "🌟"*40)
     print("AI ASSIGNMENT SYSTEM - INTERACTIVE MODE")
     print("🌟"*40)
@@ -0,0 +1,223 @@
+"""
+BATCH JOB QUEUE
+Antrian job lokal untuk batch recommendation besar. Job dijalankan oleh
+worker pool terbatas dan disimpan di SQLite sehingga hasil yang sudah selesai
+tidak hilang saat service restart, dan job yang belum selesai dilanjutkan.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    solver TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    assigned INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owner TEXT,
+    heartbeat REAL
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+# Kolom yang ditambahkan setelah versi pertama schema (migrasi DB lama)
+MIGRATIONS = {'owner': 'TEXT', 'heartbeat': 'REAL'}
+
+
+def _pid_alive(pid):
+    if os.name != 'posix':
+        return True  # Tanpa cek pid; hanya heartbeat yang dipakai
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    """
+    Job queue dengan persistence SQLite
+
+    Args:
+        db_path: lokasi file SQLite
+        run_batch: callable(requests_list, solver) yang meng-yield satu record
+            (dict JSON-serializable) per item sesuai urutan input
+        max_workers: jumlah job yang boleh berjalan bersamaan
+        json_default: fungsi default untuk json.dumps (mis. NumPy scalar)
+        resume: lanjutkan job yang belum selesai saat dibuat (False: panggil
+            resume_pending() sendiri, mis. hanya di process yang melayani request)
+        stale_seconds: job 'running' milik process lain yang heartbeat-nya lebih
+            lama dari ini dianggap ditinggalkan
+
+    Setiap job di-claim atomik (owner = host:pid) sebelum dijalankan; progress
+    hanya ditulis selama claim masih dipegang, sehingga dua process yang
+    membuka DB yang sama tidak menjalankan / menghitung job yang sama dua kali.
+    """
+
+    def __init__(self, db_path, run_batch, max_workers=2, json_default=None,
+                 resume=True, stale_seconds=300):
+        self.run_batch = run_batch
+        self.json_default = json_default
+        self.stale_seconds = stale_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            existing = {r['name'] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in MIGRATIONS.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._conn.commit()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='batch-job')
+        if resume:
+            self.resume_pending()
+
+    def _execute(self, sql, params=(), commit=False):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            if commit:
+                self._conn.commit()
+            return rows
+
+    def _abandoned(self, job):
+        """Job 'running' yang owner-nya sudah mati / tidak heartbeat lagi"""
+        if job['owner'] is None:
+            return True
+        if time.time() - (job['heartbeat'] or 0) > self.stale_seconds:
+            return True
+        host, _, pid = job['owner'].rpartition(':')
+        return host == socket.gethostname() and pid.isdigit() and not _pid_alive(int(pid))
+
+    def _claim(self, job_id):
+        """Compare-and-set owner job ke process ini; False jika sudah dipegang process lain"""
+        rows = self._execute("SELECT status, owner, heartbeat FROM jobs WHERE job_id = ?", (job_id,))
+        if not rows:
+            return False
+        job = rows[0]
+        if job['status'] == 'running' and (job['owner'] == self.owner or not self._abandoned(job)):
+            return False
+        if job['status'] not in ('queued', 'running'):
+            return False
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, heartbeat = ?, "
+                "started_at = COALESCE(started_at, ?) "
+                "WHERE job_id = ? AND status = ? AND owner IS ?",
+                (self.owner, time.time(), time.time(), job_id, job['status'], job['owner'])
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def resume_pending(self):
+        """Submit ulang job yang belum selesai saat service terakhir berhenti"""
+        rows = self._execute(
+            "SELECT job_id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+        )
+        for row in rows:
+            print(f"↻ Resuming batch job {row['job_id']}")
+            self._executor.submit(self._run, row['job_id'])
+
+    def submit(self, requests_list, solver='greedy'):
+        """Simpan job baru dan jadwalkan ke worker pool, return job_id"""
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (job_id, status, solver, payload, total, created_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?)",
+            (job_id, solver, json.dumps(requests_list), len(requests_list), time.time()),
+            commit=True
+        )
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _run(self, job_id):
+        if not self._claim(job_id):
+            print(f"⚠️ Batch job {job_id} is owned by another process, skipped")
+            return
+        job = self._execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))[0]
+        requests_list = json.loads(job['payload'])
+
+        # Lewati item yang hasilnya sudah tersimpan (resume)
+        done = {r['idx'] for r in self._execute(
+            "SELECT idx FROM job_results WHERE job_id = ?", (job_id,)
+        )}
+        pending = [i for i in range(len(requests_list)) if i not in done]
+
+        try:
+            records = self.run_batch([requests_list[i] for i in pending], job['solver'])
+            for idx, record in zip(pending, records):
+                assigned = 1 if record.get('type') == 'assignment' else 0
+                with self._lock:
+                    # Progress hanya dihitung selama claim masih milik process ini
+                    cursor = self._conn.execute(
+                        "UPDATE jobs SET processed = processed + 1, assigned = assigned + ?, "
+                        "heartbeat = ? WHERE job_id = ? AND owner = ? AND status = 'running'",
+                        (assigned, time.time(), job_id, self.owner)
+                    )
+                    if cursor.rowcount != 1:
+                        self._conn.rollback()
+                        print(f"⚠️ Batch job {job_id} claimed by another process, stopped")
+                        return
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO job_results (job_id, idx, record) VALUES (?, ?, ?)",
+                        (job_id, idx, json.dumps(record, default=self.json_default))
+                    )
+                    self._conn.commit()
+        except Exception as e:
+            print(f"✗ Batch job {job_id} failed: {e}")
+            self._execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE job_id = ? AND owner = ?",
+                (str(e), time.time(), job_id, self.owner), commit=True
+            )
+            return
+
+        self._execute(
+            "UPDATE jobs SET status = 'done', finished_at = ? WHERE job_id = ? AND owner = ?",
+            (time.time(), job_id, self.owner), commit=True
+        )
+        print(f"✓ Batch job {job_id} done")
+
+    def status(self, job_id):
+        """Status dan progress job, None jika job tidak ditemukan"""
+        rows = self._execute(
+            "SELECT job_id, status, solver, total, processed, assigned, error, "
+            "created_at, started_at, finished_at FROM jobs WHERE job_id = ?",
+            (job_id,)
+        )
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job['progress'] = round(job['processed'] / job['total'], 4) if job['total'] else 1.0
+        return job
+
+    def results(self, job_id, offset=0, limit=100):
+        """Hasil job (paged) sesuai urutan request pada batch"""
+        rows = self._execute(
+            "SELECT idx, record FROM job_results WHERE job_id = ? "
+            "ORDER BY idx LIMIT ? OFFSET ?",
+            (job_id, limit, offset)
+        )
+        return [json.loads(r['record']) for r in rows]
@@ -0,0 +1,126 @@
+"""
+MODEL REGISTRY
+Hot reload model tanpa downtime. Snapshot AIAssignmentSystem yang aktif
+disimpan sebagai satu referensi; reload membangun snapshot baru di background
+lalu menukar referensi secara atomik (read-copy-update). Request yang sedang
+berjalan tetap memakai snapshot lama, request baru memakai snapshot baru.
+"""
+
+import os
+import threading
+import time
+
+
+class ModelSnapshot:
+    """Snapshot immutable: system beserta metadata versinya"""
+    __slots__ = ('system', 'version', 'loaded_at', 'fingerprint')
+
+    def __init__(self, system, version, fingerprint):
+        self.system = system
+        self.version = version
+        self.loaded_at = time.time()
+        self.fingerprint = fingerprint
+
+
+class ModelRegistry:
+    """
+    Holder snapshot aktif
+
+    Hot path cukup membaca `registry.current` sekali per request (tanpa lock);
+    lock hanya dipakai agar tidak ada dua reload berjalan bersamaan.
+
+    Args:
+        factory: callable tanpa argumen yang membangun AIAssignmentSystem baru
+        watch_paths: file artifact model yang dipantau perubahannya
+    """
+
+    def __init__(self, factory, watch_paths):
+        self.factory = factory
+        self.watch_paths = list(watch_paths)
+        self.current = ModelSnapshot(factory(), 1, self._fingerprint())
+        self.last_error = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+
+    def _fingerprint(self):
+        fp = []
+        for path in self.watch_paths:
+            try:
+                st = os.stat(path)
+                fp.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                fp.append((path, None, None))
+        return tuple(fp)
+
+    def reload(self):
+        """Bangun snapshot baru lalu swap; return True jika berhasil"""
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            fingerprint = self._fingerprint()
+            started = time.perf_counter()
+            print(f"↻ Reloading models (v{self.current.version + 1})...")
+            try:
+                system = self.factory()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"✗ Model reload failed, keeping v{self.current.version}: {e}")
+                return False
+
+            # Swap atomik: satu assignment referensi
+            self.current = ModelSnapshot(system, self.current.version + 1, fingerprint)
+            self.last_error = None
+            print(f"✓ Models reloaded as v{self.current.version} "
+                  f"in {time.perf_counter() - started:.1f}s")
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def reload_async(self):
+        """Jalankan reload di background thread; False jika reload sedang berjalan"""
+        if self._reload_lock.locked():
+            return False
+        threading.Thread(target=self.reload, name='model-reload', daemon=True).start()
+        return True
+
+    @property
+    def reloading(self):
+        return self._reload_lock.locked()
+
+    def start_watching(self, interval=5.0):
+        """Pantau artifact model; reload saat berubah dan sudah stabil satu interval"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            pending = None
+            attempted = None
+            while True:
+                time.sleep(interval)
+                fp = self._fingerprint()
+                if fp == self.current.fingerprint or fp == attempted:
+                    pending = None
+                elif fp == pending:
+                    # Tidak berubah sejak poll sebelumnya: file sudah selesai ditulis
+                    self.reload()
+                    attempted = fp
+                    pending = None
+                else:
+                    pending = fp
+
+        self._watcher = threading.Thread(target=watch, name='model-watch', daemon=True)
+        self._watcher.start()
+        print(f"✓ Watching model artifacts every {interval}s")
+
+    def info(self):
+        snap = self.current
+        return {
+            'version': snap.version,
+            'loaded_at': snap.loaded_at,
+            'reloading': self.reloading,
+            'last_error': self.last_error,
+            'artifacts': [
+                {'path': path, 'mtime_ns': mtime, 'size': size}
+                for path, mtime, size in snap.fingerprint
+            ]
+        }
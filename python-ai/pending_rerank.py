@@ -0,0 +1,195 @@
+"""
+PENDING TICKET RE-RANK
+Score matrix (tickets x engineers) untuk tiket open yang disimpan di memory.
+Bagian skill dan seniority dari TSM / selection score dihitung sekali saat
+board dimuat; saat availability engineer berubah (cuti / kembali), kolom
+engineer itu di-mask dan hanya baris tiket yang terdampak yang di-solve ulang
+bersama term workload terbaru, lewat solver kapasitas yang sama dengan batch
+assignment. Tidak perlu /ai/assign ulang satu per satu.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from batch_solver import solve_capacitated_assignment, top_k_candidates
+
+
+class PendingTicketBoard:
+    """
+    Tiket open beserta assignment-nya
+
+    Args:
+        system: AIAssignmentSystem (CRI dan skill dihitung sekali saat load)
+        tickets: list dict id, ticket_text, request_type, urgency, dan
+            assigned_to opsional (tiket tanpa assignee / assignee tidak
+            available langsung di-assign)
+        roster: DataFrame employee (termasuk yang sedang tidak available)
+        open_counts: {engineer: tiket In Progress}
+        config: CONFIG (tsm_weights, selection_weights, batch_solver)
+        model_version: versi snapshot model untuk info
+    """
+
+    def __init__(self, system, tickets, roster, open_counts, config, model_version=None):
+        started = time.perf_counter()
+        tsm = system.tsm_calculator
+        self.model_version = model_version
+        self.max_open = config['batch_solver']['max_open_tickets']
+        self.candidate_k = config['batch_solver']['candidate_k']
+        self.w_workload = config['tsm_weights']['workload']
+        self._lock = threading.Lock()
+
+        # Kolom: semua engineer di roster, availability sebagai mask
+        availability = tsm.get_availability(roster)
+        seniority = tsm.calculate_seniority(roster)
+        self.engineers = sorted(availability)
+        self.column = {eng: j for j, eng in enumerate(self.engineers)}
+        self.available = np.array([availability[e] == 1 for e in self.engineers])
+        sen = np.array([seniority.get(e, 0.25) for e in self.engineers], dtype=np.float32)
+
+        # Workload min-max seperti calculate_workload (hanya engineer di open_counts)
+        self.tracked = np.array([e in open_counts for e in self.engineers])
+        self.counts = np.array([open_counts.get(e, 0) for e in self.engineers], dtype=np.int64)
+
+        self.ids = [str(t['id']) for t in tickets]
+        self.row = {tid: i for i, tid in enumerate(self.ids)}
+        if len(self.row) != len(self.ids):
+            raise ValueError('ticket ids must be unique')
+
+        cri = [system.cri_calculator.calculate_cri(t['ticket_text'], t['request_type'], t['urgency'])
+               for t in tickets]
+        self.levels = [c['risk_level'] for c in cri]
+        self.cri = np.array([c['cri_normalized'] for c in cri], dtype=np.float32)
+        skill = tsm.skill_matrix_for([t['ticket_text'] for t in tickets], self.engineers)
+
+        # Bagian statis score; workload ditambahkan per re-rank
+        tsm_w = config['tsm_weights']
+        sel_w = config['selection_weights']
+        w_skill = np.array([sel_w[l]['skill'] for l in self.levels], dtype=np.float32)[:, None]
+        w_sen = np.array([sel_w[l]['seniority'] for l in self.levels], dtype=np.float32)[:, None]
+        self.w_sel_workload = np.array([sel_w[l]['workload'] for l in self.levels], dtype=np.float32)
+        self.base_tsm = tsm_w['skill'] * skill + tsm_w['seniority'] * sen[None, :]
+        self.base_selection = w_skill * skill + w_sen * sen[None, :]
+
+        self.assigned = np.full(len(self.ids), -1, dtype=np.int64)
+        for i, t in enumerate(tickets):
+            j = self.column.get(t.get('assigned_to'))
+            if j is not None:
+                self.assigned[i] = j
+        self.closed = np.zeros(len(self.ids), dtype=bool)
+
+        pending = np.flatnonzero((self.assigned < 0) | ~self.available[np.maximum(self.assigned, 0)])
+        self.initial_changes = self._reassign(pending)
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self.stats = {'reranks': 0, 'rows_reranked': 0, 'rerank_ms_total': 0.0}
+
+    def workload(self):
+        """Workload capacity per kolom dari open count saat ini (calculate_workload)"""
+        workload = np.full(len(self.engineers), 0.5, dtype=np.float32)
+        if not self.tracked.any():
+            return workload
+        counts = self.counts[self.tracked]
+        lo, hi = counts.min(), counts.max()
+        if hi > lo:
+            workload[self.tracked] = 1 - (counts - lo) / (hi - lo)
+        return workload
+
+    def _reassign(self, rows):
+        """Solve ulang baris tertentu; kolom tidak available tidak punya kapasitas"""
+        if len(rows) == 0:
+            return []
+        workload = self.workload()
+        tsm = self.base_tsm[rows] + self.w_workload * workload[None, :]
+        selection = self.base_selection[rows] + self.w_sel_workload[rows, None] * workload[None, :]
+        tsm[:, ~self.available] = -np.inf
+
+        # Tiket yang pindah tidak lagi dihitung di open count engineer lama
+        old = self.assigned[rows]
+        np.subtract.at(self.counts, old[old >= 0], 1)
+        np.maximum(self.counts, 0, out=self.counts)
+
+        capacities = np.maximum(self.max_open - self.counts, 0)
+        capacities[~self.available] = 0
+        candidates = top_k_candidates(tsm, min(self.candidate_k, len(self.engineers)))
+        new = solve_capacitated_assignment(selection, capacities, candidates)
+        np.add.at(self.counts, new[new >= 0], 1)
+        self.assigned[rows] = new
+
+        changes = []
+        for i, r in enumerate(rows.tolist()):
+            changes.append({
+                'id': self.ids[r],
+                'from': self.engineers[old[i]] if old[i] >= 0 else None,
+                'to': self.engineers[new[i]] if new[i] >= 0 else None,
+                'risk_level': self.levels[r],
+                'assignment_score': float(selection[i, new[i]]) if new[i] >= 0 else None
+            })
+        return changes
+
+    def set_availability(self, engineer, available):
+        """
+        Ubah availability engineer dan re-rank tiket yang terdampak
+
+        Cuti: tiket open engineer itu dipindah. Kembali available: tiket yang
+        belum kebagian engineer dicoba di-assign lagi; tiket lain tidak dipindah.
+
+        Returns:
+            dict changes (id, from, to, risk_level, assignment_score) dan elapsed_ms
+        """
+        j = self.column.get(engineer)
+        if j is None:
+            raise KeyError(engineer)
+        started = time.perf_counter()
+        with self._lock:
+            self.available[j] = bool(available)
+            if available:
+                rows = np.flatnonzero((self.assigned < 0) & ~self.closed)
+            else:
+                rows = np.flatnonzero((self.assigned == j) & ~self.closed)
+            changes = self._reassign(rows)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats['reranks'] += 1
+            self.stats['rows_reranked'] += len(rows)
+            self.stats['rerank_ms_total'] += elapsed_ms
+        return {'engineer': engineer, 'available': bool(available),
+                'changes': changes, 'elapsed_ms': round(elapsed_ms, 3)}
+
+    def close(self, ticket_ids):
+        """Tiket selesai: keluar dari board dan open count engineer-nya"""
+        closed = 0
+        with self._lock:
+            for tid in ticket_ids:
+                r = self.row.get(str(tid))
+                if r is None or self.closed[r]:
+                    continue
+                self.closed[r] = True
+                if self.assigned[r] >= 0:
+                    self.counts[self.assigned[r]] = max(self.counts[self.assigned[r]] - 1, 0)
+                    self.assigned[r] = -1
+                closed += 1
+        return closed
+
+    def assignments(self):
+        with self._lock:
+            return [
+                {'id': tid, 'assigned_to': self.engineers[j] if j >= 0 else None,
+                 'risk_level': self.levels[r]}
+                for r, (tid, j) in enumerate(zip(self.ids, self.assigned.tolist()))
+                if not self.closed[r]
+            ]
+
+    def info(self):
+        with self._lock:
+            n = self.stats['reranks']
+            return {
+                'model_version': self.model_version,
+                'tickets': int((~self.closed).sum()),
+                'unassigned': int(((self.assigned < 0) & ~self.closed).sum()),
+                'engineers': len(self.engineers),
+                'unavailable': [e for e, a in zip(self.engineers, self.available) if not a],
+                'build_ms': round(self.build_ms, 2),
+                **self.stats,
+                'rerank_ms_total': round(self.stats['rerank_ms_total'], 3),
+                'rerank_ms_avg': round(self.stats['rerank_ms_total'] / n, 3) if n else None
+            }
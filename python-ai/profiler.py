@@ -0,0 +1,251 @@
+"""
+LIVE PROFILER
+Profiling on-demand untuk proses AI service yang sedang berjalan, tanpa
+restart. Dua mode:
+- cprofile: profiler deterministik (cProfile) selama N detik / N request
+- sampling: sampling stack thread request via sys._current_frames()
+Hasil berupa collapsed stacks (format flamegraph.pl / speedscope), tabel
+fungsi teratas, dan opsional top allocation site dari tracemalloc.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# Sejak Python 3.12 cProfile memakai sys.monitoring: satu profiler aktif
+# berlaku untuk semua thread, dan profiler kedua tidak bisa di-enable
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+
+
+def _frame_label(code):
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _func_label(func):
+    filename, lineno, name = func
+    if filename == '~':  # builtin
+        return name
+    return f"{os.path.basename(filename)}:{name}"
+
+
+def collapsed_from_pstats(stats, max_depth=64):
+    """
+    Collapsed stacks dari call graph pstats
+
+    cProfile hanya menyimpan edge caller -> callee, jadi waktu inclusive tiap
+    fungsi dibagi ke caller secara proporsional (pendekatan yang sama dengan
+    flameprof). Nilai dalam mikrodetik.
+    """
+    children = {}
+    roots = []
+    for func, (_, _, _, ct, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    lines = Counter()
+
+    def walk(func, inclusive, path):
+        _, _, tt, ct, _ = stats.stats[func]
+        path = path + (_func_label(func),)
+        share = inclusive / ct if ct > 0 else 0
+        self_us = int(tt * share * 1e6)
+        if self_us > 0:
+            lines[';'.join(path)] += self_us
+        if len(path) >= max_depth:
+            return
+        for child, edge_ct in children.get(func, ()):
+            if _func_label(child) in path:  # rekursi
+                continue
+            child_inclusive = edge_ct * share
+            if child_inclusive * 1e6 >= 1:
+                walk(child, child_inclusive, path)
+
+    for root in roots:
+        walk(root, stats.stats[root][3], ())
+    return '\n'.join(f"{stack} {value}" for stack, value in lines.most_common())
+
+
+class _Session:
+    def __init__(self, mode, max_requests, interval, all_threads):
+        self.mode = mode
+        self.max_requests = max_requests
+        self.interval = interval
+        self.all_threads = all_threads
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.active_threads = set()
+        self.samples = Counter()
+        self.n_samples = 0
+        self.stats = None
+        self.profiler = None
+
+
+class LiveProfiler:
+    """
+    Satu sesi profiling pada satu waktu
+
+    request_started/request_finished dipanggil dari hook Flask untuk setiap
+    request (di luar endpoint debug); saat tidak ada sesi, biayanya hanya satu
+    pengecekan atribut.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def busy(self):
+        return self._session is not None
+
+    # ===== Hook per request =====
+    def request_started(self):
+        session = self._session
+        if session is None:
+            return
+        with session.lock:
+            session.active_threads.add(threading.get_ident())
+        if session.mode == 'cprofile' and not PROCESS_WIDE_CPROFILE:
+            profile = cProfile.Profile()
+            self._local.profile = (session, profile)
+            profile.enable()
+
+    def request_finished(self):
+        session = self._session
+        entry = getattr(self._local, 'profile', None)
+        if entry is not None:
+            self._local.profile = None
+            owner, profile = entry
+            profile.disable()
+            with owner.lock:
+                if owner.stats is None:
+                    owner.stats = pstats.Stats(profile)
+                else:
+                    owner.stats.add(profile)
+        if session is None:
+            return
+        with session.lock:
+            session.active_threads.discard(threading.get_ident())
+            session.requests += 1
+            if session.max_requests and session.requests >= session.max_requests:
+                session.done.set()
+
+    # ===== Sesi =====
+    def run(self, mode='sampling', seconds=None, max_requests=None, trace_malloc=False,
+            top=30, interval=0.005, all_threads=False, timeout=60):
+        """
+        Jalankan satu sesi profiling dan tunggu sampai selesai
+
+        Sesi berakhir setelah `seconds`, atau setelah `max_requests` request
+        selesai (dibatasi `timeout` detik).
+
+        Returns:
+            dict berisi collapsed stacks, tabel fungsi teratas / jumlah sample,
+            dan top allocation site jika trace_malloc
+        """
+        if mode not in ('cprofile', 'sampling'):
+            raise ValueError("mode must be 'cprofile' or 'sampling'")
+
+        with self._lock:
+            if self._session is not None:
+                raise RuntimeError('profiling session already running')
+            session = _Session(mode, max_requests, interval, all_threads)
+            self._session = session
+
+        started_tracemalloc = False
+        if trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            started_tracemalloc = True
+
+        sampler = None
+        try:
+            if mode == 'cprofile' and PROCESS_WIDE_CPROFILE:
+                session.profiler = cProfile.Profile()
+                session.profiler.enable()
+            elif mode == 'sampling':
+                sampler = threading.Thread(target=self._sample, args=(session, threading.get_ident()),
+                                           name='profiler-sampler', daemon=True)
+                sampler.start()
+
+            wait = seconds if seconds else timeout
+            session.done.wait(min(wait, timeout))
+        finally:
+            if session.profiler is not None:
+                session.profiler.disable()
+            self._session = None
+            session.done.set()
+            if sampler is not None:
+                sampler.join()
+
+        result = {
+            'mode': mode,
+            'elapsed_seconds': round(time.perf_counter() - session.started, 3),
+            'requests': session.requests,
+            'process_wide': mode == 'sampling' and all_threads or
+                            mode == 'cprofile' and PROCESS_WIDE_CPROFILE
+        }
+
+        if mode == 'sampling':
+            result['samples'] = session.n_samples
+            result['interval_ms'] = interval * 1000
+            result['collapsed'] = '\n'.join(
+                f"{stack} {count}" for stack, count in session.samples.most_common()
+            )
+        else:
+            with session.lock:
+                stats = session.stats
+            if session.profiler is not None:
+                stats = pstats.Stats(session.profiler)
+            if stats is None:
+                result['collapsed'] = ''
+                result['top_functions'] = ''
+            else:
+                result['collapsed'] = collapsed_from_pstats(stats)
+                out = io.StringIO()
+                stats.stream = out
+                stats.sort_stats('cumulative').print_stats(top)
+                result['top_functions'] = out.getvalue()
+
+        if trace_malloc:
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__)
+            ])
+            if started_tracemalloc:
+                tracemalloc.stop()
+            result['allocations'] = [
+                {
+                    'site': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size_bytes': stat.size,
+                    'count': stat.count
+                }
+                for stat in snapshot.statistics('lineno')[:top]
+            ]
+
+        return result
+
+    def _sample(self, session, debug_thread):
+        """Loop sampler: ambil stack thread request setiap interval"""
+        own = threading.get_ident()
+        while not session.done.wait(session.interval):
+            with session.lock:
+                targets = None if session.all_threads else set(session.active_threads)
+            for tid, frame in sys._current_frames().items():
+                if tid in (own, debug_thread) or (targets is not None and tid not in targets):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                session.samples[';'.join(reversed(stack))] += 1
+                session.n_samples += 1
@@ -0,0 +1,214 @@
+"""
+HISTORICAL REPLAY
+Simulasi bagaimana AIAssignmentSystem akan membagi tiket historis Data Olah.
+Tiket di-stream sesuai urutan waktu dibuat, di-assign per window waktu lewat
+solve_batch, dan workload In Progress disimulasikan: bertambah saat tiket
+di-assign, berkurang saat tiket selesai. Hasilnya dibandingkan dengan
+assignment historis pada durasi tiket yang sama.
+
+Usage:
+    python replay.py [--tensors sweep.npz] [--solver global|greedy] [--curves loads.csv]
+"""
+
+import argparse
+import heapq
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from integrated_assignment import CONFIG, AIAssignmentSystem
+from weight_sweep import RISK_LEVELS, build_tensors, current_settings, workload_from_counts
+
+
+def risk_levels(tensors):
+    """Risk level per tiket dengan bobot CRI di CONFIG (sama dengan calculate_cri)"""
+    _, cri_w, _ = current_settings()
+    cri = tensors['cri_features'] @ cri_w[0].astype(np.float32)
+    cri = np.clip(cri * tensors['cri_scale'] + tensors['cri_min'], 0, 1)
+    return np.array(RISK_LEVELS)[(cri >= 0.3).astype(np.int64) + (cri >= 0.7)]
+
+
+def ticket_durations(tensors, default_hours):
+    """Durasi tiket (ns): resolved - created, atau default jika tidak tersedia"""
+    created = tensors['created'].astype('datetime64[ns]').astype(np.int64)
+    resolved = tensors['resolved'].astype('datetime64[ns]')
+    default = int(default_hours * 3600 * 1e9)
+
+    durations = np.full(len(created), default, dtype=np.int64)
+    known = ~np.isnat(resolved)
+    durations[known] = resolved[known].astype(np.int64) - created[known]
+    durations[durations < 0] = default
+    return durations
+
+
+def replay(tensors, policy='model', solver='global', batch_minutes=60, default_hours=24):
+    """
+    Replay tiket historis dengan workload yang disimulasikan
+
+    Args:
+        policy: 'model' (solve_batch) atau 'historical' (assignee asli)
+        solver: solver solve_batch untuk policy 'model'
+
+    Returns:
+        dict berisi metrics ringkasan dan load curve (DataFrame waktu x engineer)
+    """
+    engineers = tensors['engineers'].tolist()
+    n_engineers = len(engineers)
+    created = tensors['created'].astype('datetime64[ns]').astype(np.int64)
+    n_tickets = len(created)
+    durations = ticket_durations(tensors, default_hours)
+    levels = risk_levels(tensors)
+    skill, seniority, assignee = tensors['skill'], tensors['seniority'], tensors['assignee']
+
+    window = int(batch_minutes * 60 * 1e9)
+    t0 = created[0] if n_tickets else 0
+    batch_end = t0 + ((created - t0) // window + 1) * window
+
+    counts = np.zeros(n_engineers, dtype=np.int64)
+    assigned_total = np.zeros(n_engineers, dtype=np.int64)
+    closing = []  # heap (waktu selesai, engineer)
+    waits = np.zeros(n_tickets, dtype=np.int64)
+    backlog = np.empty(0, dtype=np.int64)
+    curve_times, curve_loads, batch_sizes = [], [], []
+    pos = 0
+
+    started = time.perf_counter()
+    while pos < n_tickets or len(backlog):
+        now = batch_end[pos] if pos < n_tickets else None
+        if len(backlog) and closing and (now is None or closing[0][0] < now):
+            # Backlog menunggu kapasitas: coba lagi saat tiket berikutnya selesai
+            now = closing[0][0]
+        if now is None:
+            break
+
+        while closing and closing[0][0] <= now:
+            _, j = heapq.heappop(closing)
+            counts[j] -= 1
+
+        end = pos + np.searchsorted(batch_end[pos:], now, side='right')
+        idx = np.concatenate([backlog, np.arange(pos, end)])
+        pos = end
+        if len(idx) == 0:
+            continue
+
+        if policy == 'historical':
+            assignment = assignee[idx]
+        else:
+            snapshot = {
+                'engineers': engineers,
+                'seniority': seniority,
+                'workload': workload_from_counts(counts[None, :])[0],
+                'open_tickets': counts
+            }
+            assignment, _, _ = AIAssignmentSystem.solve_batch(
+                levels[idx], skill[idx], snapshot, solver
+            )
+
+        done = assignment >= 0
+        for i, j in zip(idx[done].tolist(), assignment[done].tolist()):
+            counts[j] += 1
+            assigned_total[j] += 1
+            waits[i] = now - created[i]
+            heapq.heappush(closing, (now + durations[i], j))
+        backlog = idx[~done]
+
+        batch_sizes.append(len(idx))
+        curve_times.append(now)
+        curve_loads.append(counts.copy())
+    elapsed = time.perf_counter() - started
+
+    loads = np.array(curve_loads, dtype=np.float64).reshape(-1, n_engineers)
+    mean_load = loads.mean(axis=1)
+    cv = np.divide(loads.std(axis=1), mean_load, out=np.zeros_like(mean_load), where=mean_load > 0)
+    hours = waits / 3.6e12
+
+    curves = pd.DataFrame(loads.astype(np.int64), columns=engineers,
+                          index=pd.to_datetime(np.array(curve_times, dtype='datetime64[ns]')))
+    curves.index.name = 'time'
+
+    return {
+        'metrics': {
+            'policy': policy if policy == 'historical' else f"model/{solver}",
+            'tickets': n_tickets,
+            'assigned': int(assigned_total.sum()),
+            'unassigned': int(len(backlog)),
+            'batches': len(batch_sizes),
+            'mean_batch_size': round(float(np.mean(batch_sizes)), 2) if batch_sizes else 0,
+            'mean_wait_hours': round(float(hours.mean()), 3) if n_tickets else 0,
+            'p95_wait_hours': round(float(np.percentile(hours, 95)), 3) if n_tickets else 0,
+            'mean_load_cv': round(float(cv.mean()), 4) if len(cv) else 0,
+            'mean_max_load': round(float(loads.max(axis=1).mean()), 2) if len(loads) else 0,
+            'peak_load': int(loads.max()) if loads.size else 0,
+            'assigned_gini': round(gini(assigned_total), 4),
+            'elapsed_seconds': round(elapsed, 3),
+            'tickets_per_second': round(n_tickets / elapsed, 1) if elapsed > 0 else None
+        },
+        'curves': curves
+    }
+
+
+def gini(values):
+    """Koefisien Gini (0 = merata sempurna)"""
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    n = len(values)
+    if n == 0 or values.sum() == 0:
+        return 0.0
+    cum = np.cumsum(values)
+    return float((n + 1 - 2 * (cum / cum[-1]).sum()) / n)
+
+
+def main():
+    cfg = CONFIG['replay']
+    parser = argparse.ArgumentParser(description="Replay historical tickets through the assignment logic")
+    parser.add_argument('--data-olah', default=CONFIG['data_olah'])
+    parser.add_argument('--data-cri', default=CONFIG['data_cri'])
+    parser.add_argument('--tensors', help="File .npz hasil weight_sweep.py (--tensors) untuk dipakai ulang")
+    parser.add_argument('--solver', choices=['global', 'greedy'], default=cfg['solver'])
+    parser.add_argument('--batch-minutes', type=float, default=cfg['batch_minutes'])
+    parser.add_argument('--default-duration-hours', type=float, default=cfg['default_duration_hours'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--curves', help="Tulis load curve per engineer (policy model) ke CSV")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("HISTORICAL REPLAY")
+    print("="*80)
+
+    started = time.perf_counter()
+    if args.tensors and os.path.exists(args.tensors):
+        tensors = dict(np.load(args.tensors, allow_pickle=True))
+        print(f"✓ Loaded tensors from {args.tensors}")
+    else:
+        system = AIAssignmentSystem(data_olah_path=args.data_olah, data_cri_path=args.data_cri)
+        tensors = build_tensors(system, args.data_olah, args.workers)
+        if args.tensors:
+            np.savez(args.tensors, **tensors)
+            print(f"✓ Saved tensors to {args.tensors}")
+    if 'created' not in tensors:
+        raise ValueError("Data Olah has no usable created timestamp column; cannot replay")
+    print(f"✓ Tensors ready ({time.perf_counter() - started:.1f}s)")
+
+    runs = [
+        replay(tensors, 'model', args.solver, args.batch_minutes, args.default_duration_hours),
+        replay(tensors, 'historical', None, args.batch_minutes, args.default_duration_hours)
+    ]
+
+    created = tensors['created']
+    print(f"\nReplayed {len(created)} tickets from {created[0]} to {created[-1]}")
+    print(f"\n{'─'*80}")
+    print(f"{'metric':<25}" + "".join(f"{r['metrics']['policy']:>20}" for r in runs))
+    for key in runs[0]['metrics']:
+        if key == 'policy':
+            continue
+        print(f"{key:<25}" + "".join(f"{str(r['metrics'][key]):>20}" for r in runs))
+    print(f"{'─'*80}")
+
+    if args.curves:
+        runs[0]['curves'].to_csv(args.curves)
+        print(f"\n✓ Wrote load curves to {args.curves}")
+
+
+if __name__ == "__main__":
+    main()
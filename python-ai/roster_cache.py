@@ -0,0 +1,141 @@
+"""
+ROSTER CACHE
+Snapshot roster engineer yang dikirim inline oleh caller (Node), disimpan per
+versi. Request berikutnya cukup mengirim roster_version sehingga AI service
+tidak perlu memanggil balik /api/employees di jalur request. Dengan shared
+cache, roster yang dikirim ke satu replica juga dikenali replica lain.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def roster_version(records):
+    """Versi deterministik dari isi roster (urutan key tidak berpengaruh)"""
+    canonical = json.dumps(records, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def parse_roster(records):
+    """
+    Validasi roster inline menjadi DataFrame seperti get_employees_from_api
+
+    Setiap item minimal berisi name; years_of_service dan field availability
+    (on_leave / is_available / status / attendance) opsional.
+    """
+    if not isinstance(records, list) or len(records) == 0:
+        raise ValueError('roster must be a non-empty array')
+    for item in records:
+        if not isinstance(item, dict) or not isinstance(item.get('name'), str) or not item['name'].strip():
+            raise ValueError('every roster item must be an object with a name')
+
+    df = pd.DataFrame(records)
+    if 'years_of_service' not in df:
+        df['years_of_service'] = None
+    return df
+
+
+def parse_workload(mapping):
+    """Validasi workload inline {engineer: jumlah tiket In Progress}"""
+    if not isinstance(mapping, dict):
+        raise ValueError('workload must be an object of engineer -> open ticket count')
+    counts = {}
+    for eng, n in mapping.items():
+        if isinstance(n, bool) or not isinstance(n, (int, float)) or n < 0:
+            raise ValueError(f'workload for {eng} must be a non-negative number')
+        counts[str(eng)] = int(n)
+    return counts
+
+
+class RosterSnapshot:
+    __slots__ = ('version', 'employees', 'stored_at')
+
+    def __init__(self, version, employees):
+        self.version = version
+        self.employees = employees
+        self.stored_at = time.monotonic()
+
+
+class RosterCache:
+    """
+    Snapshot roster per versi (LRU, dengan TTL)
+
+    Args:
+        max_entries: jumlah versi yang disimpan
+        ttl_seconds: umur maksimal snapshot (None = tidak kedaluwarsa)
+        shared: SharedCache opsional; roster disimpan juga di namespace
+            'roster' dan miss lokal dicari di sana sebelum dianggap tidak dikenal
+    """
+
+    def __init__(self, max_entries=16, ttl_seconds=3600, shared=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats = {'stored': 0, 'hits': 0, 'misses': 0, 'expired': 0, 'shared_hits': 0}
+
+    def put(self, records, version=None):
+        """
+        Simpan roster inline; version dihitung dari isi jika tidak diberikan
+
+        Returns:
+            RosterSnapshot
+        """
+        employees = parse_roster(records)
+        version = str(version) if version else roster_version(records)
+        snapshot = RosterSnapshot(version, employees)
+        self._store(snapshot)
+        if self.shared is not None:
+            self.shared.set('roster', version, records)
+        return snapshot
+
+    def _store(self, snapshot):
+        with self._lock:
+            self._entries[snapshot.version] = snapshot
+            self._entries.move_to_end(snapshot.version)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats['stored'] += 1
+
+    def get(self, version):
+        """Snapshot untuk versi tertentu, None jika tidak ada / kedaluwarsa"""
+        with self._lock:
+            snapshot = self._entries.get(str(version))
+            if snapshot is not None and self.ttl_seconds is not None \
+                    and time.monotonic() - snapshot.stored_at > self.ttl_seconds:
+                del self._entries[snapshot.version]
+                self.stats['expired'] += 1
+                snapshot = None
+            if snapshot is not None:
+                self._entries.move_to_end(snapshot.version)
+                self.stats['hits'] += 1
+                return snapshot
+
+        records = self.shared.get('roster', str(version)) if self.shared is not None else None
+        try:
+            employees = parse_roster(records) if records is not None else None
+        except ValueError:
+            employees = None
+        with self._lock:
+            if employees is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['shared_hits'] += 1
+        snapshot = RosterSnapshot(str(version), employees)
+        self._store(snapshot)
+        return snapshot
+
+    def info(self):
+        with self._lock:
+            return {
+                'versions': list(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                **self.stats
+            }
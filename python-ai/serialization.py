@@ -0,0 +1,154 @@
+"""
+SERIALIZATION
+Encoder response Node <-> Python: JSON yang paham NumPy (orjson jika
+terpasang), MessagePack opsional, pemilihan field untuk response compact, dan
+pengukuran ukuran payload serta waktu serialisasi per route.
+"""
+
+import json
+import threading
+import time
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Field yang dipakai Node (requestController/emailService) untuk response compact
+COMPACT_FIELDS = [
+    'selected_engineer',
+    'assignment_score',
+    'cri_analysis.cri_normalized',
+    'cri_analysis.risk_level',
+    'tsm_analysis.tsm_score',
+    'recommendation_reason'
+]
+
+
+def to_builtin(obj):
+    """Fallback encoder: NumPy scalar/array dan objek dengan to_dict()"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def dumps_json(obj):
+    """Serialize ke JSON bytes; orjson (native NumPy) jika tersedia"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=to_builtin,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=to_builtin, separators=(',', ':')).encode()
+
+
+def dumps_msgpack(obj):
+    return msgpack.packb(obj, default=to_builtin, use_bin_type=True)
+
+
+def parse_fields(value):
+    """Daftar field dari body ("fields": [...] / "a,b") atau query string"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = [f.strip() for f in value if isinstance(f, str) and f.strip()]
+    return fields or None
+
+
+def select_fields(data, fields):
+    """
+    Ambil hanya field tertentu dari dict (path bertitik untuk nested dict)
+
+    select_fields(result, ['selected_engineer', 'cri_analysis.risk_level'])
+    -> {'selected_engineer': ..., 'cri_analysis': {'risk_level': ...}}
+    Field yang tidak ada diabaikan.
+    """
+    if not fields or not isinstance(data, dict):
+        return data
+
+    selected = {}
+    for path in fields:
+        src, dst = data, selected
+        keys = path.split('.')
+        for i, key in enumerate(keys):
+            if not isinstance(src, dict) or key not in src:
+                break
+            if i == len(keys) - 1:
+                dst[key] = src[key]
+            else:
+                src = src[key]
+                dst = dst.setdefault(key, {})
+    return selected
+
+
+class SerializationStats:
+    """Ukuran payload dan waktu serialisasi per route"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, fmt, size, elapsed):
+        with self._lock:
+            s = self._routes.setdefault(route, {
+                'responses': 0, 'bytes_total': 0, 'bytes_max': 0,
+                'serialize_ms_total': 0.0, 'serialize_ms_max': 0.0, 'formats': {}
+            })
+            s['responses'] += 1
+            s['bytes_total'] += size
+            s['bytes_max'] = max(s['bytes_max'], size)
+            s['serialize_ms_total'] += elapsed * 1000
+            s['serialize_ms_max'] = max(s['serialize_ms_max'], elapsed * 1000)
+            s['formats'][fmt] = s['formats'].get(fmt, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            report = {}
+            for route, s in self._routes.items():
+                n = s['responses']
+                report[route] = {
+                    **s,
+                    'formats': dict(s['formats']),
+                    'serialize_ms_total': round(s['serialize_ms_total'], 3),
+                    'serialize_ms_max': round(s['serialize_ms_max'], 3),
+                    'bytes_avg': round(s['bytes_total'] / n, 1),
+                    'serialize_ms_avg': round(s['serialize_ms_total'] / n, 4)
+                }
+            report['encoder'] = {
+                'json': 'orjson' if orjson is not None else 'json',
+                'msgpack': msgpack is not None
+            }
+            return report
+
+
+def wants_msgpack(accept_header):
+    """True jika client meminta MessagePack dan msgpack terpasang"""
+    return msgpack is not None and any(m in (accept_header or '') for m in MSGPACK_MIMETYPES)
+
+
+def encode(payload, use_msgpack=False):
+    """
+    Serialize payload
+
+    Returns:
+        (body bytes, mimetype, format, detik serialisasi)
+    """
+    started = time.perf_counter()
+    if use_msgpack:
+        body, mimetype, fmt = dumps_msgpack(payload), MSGPACK_MIMETYPES[0], 'msgpack'
+    else:
+        body, mimetype, fmt = dumps_json(payload), JSON_MIMETYPE, 'json'
+    return body, mimetype, fmt, time.perf_counter() - started
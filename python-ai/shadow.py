@@ -0,0 +1,332 @@
+"""
+SHADOW EVALUATION
+Scorer skill alternatif dijalankan di samping jalur produksi (TF-IDF centroid
+TSMCalculator.match_ticket) tanpa mempengaruhi response. Setelah /ai/assign
+selesai, tiket dikirim ke executor background; setiap scorer alternatif
+menghasilkan skill per engineer, keputusan dibentuk dengan aturan yang sama
+dengan assign_engineer (TSM -> top-k -> selection weights per risk level),
+lalu dibandingkan dengan keputusan primary. Keputusan, agreement dan latency
+per scorer dicatat ke log JSONL lokal dan diringkas di /ai/shadow.
+
+Scorer baru (mis. embeddings / kNN) didaftarkan lewat register_scorer.
+
+Usage (ringkasan log):
+    python shadow.py [--log shadow_log.jsonl]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from serialization import dumps_json
+
+# =============================================================================
+# SCORERS
+# =============================================================================
+# scorer(tsm, processed_text, v, params) -> ndarray skill mentah per baris
+# tsm.engineer_names; dinormalisasi (bagi max) oleh evaluator seperti match_ticket
+SCORERS = {}
+
+
+def register_scorer(name):
+    def wrap(fn):
+        SCORERS[name] = fn
+        return fn
+    return wrap
+
+
+@register_scorer('primary')
+def primary_skill(tsm, processed_text, v, params):
+    """Skill jalur produksi (kandidat tag index, fallback full scan)"""
+    skill = np.zeros(len(tsm.engineer_names))
+    for eng, sim in tsm._score_rows(v, tsm.candidate_rows(processed_text)).items():
+        skill[tsm.engineer_index[eng]] = sim
+    return skill
+
+
+@register_scorer('full_scan')
+def full_scan_skill(tsm, processed_text, v, params):
+    """Cosine ke semua centroid tanpa pruning tag index"""
+    return (tsm.centroid_matrix @ v.astype(np.float32).T).toarray().ravel()
+
+
+@register_scorer('tag_profile')
+def tag_profile_skill(tsm, processed_text, v, params):
+    """Jumlah skor profile tag engineer untuk term tiket (tanpa centroid)"""
+    terms = tsm.vectorizer.term_columns(processed_text)
+    if not terms:
+        return np.zeros(len(tsm.engineer_names))
+    return np.asarray(tsm.tag_index[terms].sum(axis=0)).ravel()
+
+
+def decide(tsm, skill, snapshot, risk_level, tsm_weights, selection_weights, k):
+    """
+    Keputusan assignment dari skill per engineer, mengikuti assign_engineer
+
+    Returns:
+        (engineer terpilih, list top-k engineer urut TSM, set engineer dengan
+        selection score sama dengan yang terpilih)
+    """
+    engineers = snapshot['engineers']
+    rows = np.array([tsm.engineer_index.get(e, -1) for e in engineers])
+    skill = np.where(rows >= 0, skill[np.maximum(rows, 0)], 0.0).round(4)
+    seniority = snapshot['seniority'].astype(np.float64).round(4)
+    workload = snapshot['workload'].astype(np.float64).round(4)
+
+    tsm_score = (skill * tsm_weights['skill'] + seniority * tsm_weights['seniority']
+                 + workload * tsm_weights['workload']).round(4)
+    top = np.argsort(-tsm_score, kind='stable')[:k]
+    w = selection_weights[risk_level]
+    selection = (w['skill'] * skill[top] + w['seniority'] * seniority[top]
+                 + w['workload'] * workload[top])
+    best = int(np.argmax(selection))
+    # Urutan tie di assign_engineer tidak deterministik; semua pilihan setara dianggap sama
+    tied = {engineers[j] for j in top[np.isclose(selection, selection[best])]}
+    return engineers[top[best]], [engineers[j] for j in top], tied
+
+
+# =============================================================================
+# EVALUATOR
+# =============================================================================
+class ShadowEvaluator:
+    """
+    Executor background untuk scorer alternatif
+
+    Args:
+        scorers: {nama: {'type': nama scorer terdaftar, opsional 'tsm_weights' /
+            'selection_weights' pengganti bobot CONFIG}}
+        tsm_weights, selection_weights, top_k: bobot keputusan primary (CONFIG)
+        max_workers: thread shadow
+        max_pending: job yang menunggu; lebih dari ini job di-drop (tidak antri)
+        budget_ms: budget per scorer; hasil yang lewat budget tidak dihitung
+            di agreement
+        sample_rate: fraksi request yang di-shadow
+        log_path: file JSONL keputusan shadow (None = tanpa log)
+    """
+
+    def __init__(self, scorers, tsm_weights, selection_weights, top_k, max_workers=1,
+                 max_pending=64, budget_ms=500, sample_rate=1.0, log_path=None):
+        for name, cfg in scorers.items():
+            if cfg['type'] not in SCORERS:
+                raise ValueError(f"unknown shadow scorer type {cfg['type']!r} for {name}")
+        self.scorers = scorers
+        self.tsm_weights = tsm_weights
+        self.selection_weights = selection_weights
+        self.top_k = top_k
+        self.max_pending = max_pending
+        self.budget_ms = budget_ms
+        self.sample_rate = sample_rate
+        self.log_path = log_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shadow')
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self.pending = 0
+        self.stats = {'submitted': 0, 'dropped': 0, 'skipped_no_roster': 0, 'errors': 0}
+        self._scorer_stats = {
+            name: {'evaluated': 0, 'agreed': 0, 'top_k_overlap_total': 0.0,
+                   'over_budget': 0, 'errors': 0, 'latency_ms': deque(maxlen=1000)}
+            for name in scorers
+        }
+
+    def submit(self, system, ticket_text, primary, roster=None, open_counts=None):
+        """
+        Jadwalkan shadow evaluation untuk hasil primary; tidak pernah blocking
+
+        Returns:
+            True jika job dijadwalkan
+        """
+        if primary is None or primary.get('selected_engineer') is None:
+            return False
+        # Hasil degraded tidak memakai skill produksi penuh; tidak dibandingkan
+        if (primary.get('degradation') or {}).get('degraded'):
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.stats['dropped'] += 1
+                return False
+            self.pending += 1
+            self.stats['submitted'] += 1
+        self._executor.submit(self._run, system, ticket_text, primary, roster, open_counts)
+        return True
+
+    def _run(self, system, ticket_text, primary, roster, open_counts):
+        try:
+            record = self._evaluate(system, ticket_text, primary, roster, open_counts)
+            if record is not None and self.log_path:
+                line = dumps_json(record) + b'\n'
+                with self._log_lock, open(self.log_path, 'ab') as f:
+                    f.write(line)
+        except Exception as e:
+            print(f"⚠️ Shadow evaluation failed: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _evaluate(self, system, ticket_text, primary, roster, open_counts):
+        tsm = system.tsm_calculator
+        # Roster / workload yang sama dengan primary: inline, atau hasil fetch terakhir
+        roster = roster if roster is not None else tsm.last_roster
+        if roster is None:
+            with self._lock:
+                self.stats['skipped_no_roster'] += 1
+            return None
+        if open_counts is None:
+            open_counts = tsm.last_open_counts or {}
+        snapshot = tsm.get_engineer_snapshot(roster, open_counts)
+        if snapshot is None or not snapshot['engineers']:
+            return None
+
+        processed_text = tsm.preprocess(ticket_text)
+        v = tsm.query_vector(processed_text)
+        risk_level = primary['cri_analysis']['risk_level']
+        primary_engineer = primary['selected_engineer']
+        primary_top = {c['engineer'] for c in primary.get('top_candidates', [])}
+
+        decisions = {}
+        for name, cfg in self.scorers.items():
+            started = time.perf_counter()
+            try:
+                skill = SCORERS[cfg['type']](tsm, processed_text, v, cfg)
+                maxv = skill.max() if len(skill) else 0
+                if maxv > 0:
+                    skill = skill / maxv
+                engineer, top, tied = decide(
+                    tsm, skill, snapshot, risk_level,
+                    cfg.get('tsm_weights', self.tsm_weights),
+                    cfg.get('selection_weights', self.selection_weights),
+                    self.top_k
+                )
+            except Exception as e:
+                decisions[name] = {'status': 'error', 'error': str(e)}
+                self._record(name, 'error')
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            overlap = len(primary_top & set(top)) / len(primary_top) if primary_top else None
+            status = 'ok' if elapsed_ms <= self.budget_ms else 'over_budget'
+            decisions[name] = {
+                'status': status,
+                'engineer': engineer,
+                'agree': primary_engineer in tied,
+                'top_k_overlap': overlap,
+                'latency_ms': round(elapsed_ms, 3)
+            }
+            self._record(name, status, decisions[name])
+
+        return {
+            'ts': time.time(),
+            'ticket': hashlib.sha1(ticket_text.encode('utf-8')).hexdigest()[:16],
+            'risk_level': risk_level,
+            'primary': primary_engineer,
+            'scorers': decisions
+        }
+
+    def _record(self, name, status, decision=None):
+        with self._lock:
+            s = self._scorer_stats[name]
+            if status == 'error':
+                s['errors'] += 1
+                return
+            s['latency_ms'].append(decision['latency_ms'])
+            if status == 'over_budget':
+                s['over_budget'] += 1
+                return
+            s['evaluated'] += 1
+            s['agreed'] += decision['agree']
+            if decision['top_k_overlap'] is not None:
+                s['top_k_overlap_total'] += decision['top_k_overlap']
+
+    def summary(self):
+        with self._lock:
+            scorers = {name: _summarize(s) for name, s in self._scorer_stats.items()}
+            return {
+                'enabled': True,
+                'pending': self.pending,
+                'budget_ms': self.budget_ms,
+                'sample_rate': self.sample_rate,
+                'log_path': self.log_path,
+                **self.stats,
+                'scorers': scorers
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def _summarize(s):
+    latency = np.array(s['latency_ms']) if s['latency_ms'] else None
+    n = s['evaluated']
+    return {
+        'evaluated': n,
+        'agreement_rate': round(s['agreed'] / n, 4) if n else None,
+        'top_k_overlap': round(s['top_k_overlap_total'] / n, 4) if n else None,
+        'over_budget': s['over_budget'],
+        'errors': s['errors'],
+        'latency_ms_p50': round(float(np.percentile(latency, 50)), 3) if latency is not None else None,
+        'latency_ms_p95': round(float(np.percentile(latency, 95)), 3) if latency is not None else None
+    }
+
+
+def make_shadow(cfg, tsm_weights, selection_weights, top_k):
+    """ShadowEvaluator dari CONFIG['shadow'], None jika tidak aktif"""
+    if not cfg.get('enabled'):
+        return None
+    return ShadowEvaluator(
+        cfg['scorers'], tsm_weights, selection_weights, top_k,
+        max_workers=cfg['max_workers'], max_pending=cfg['max_pending'],
+        budget_ms=cfg['budget_ms'], sample_rate=cfg['sample_rate'], log_path=cfg['log_path']
+    )
+
+
+def main():
+    """Ringkasan agreement dan latency per scorer dari log shadow"""
+    parser = argparse.ArgumentParser(description="Summarize shadow evaluation log")
+    parser.add_argument('--log', default='shadow_log.jsonl', help="File log JSONL shadow")
+    args = parser.parse_args()
+
+    stats = {}
+    tickets = 0
+    with open(args.log, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            tickets += 1
+            for name, d in record['scorers'].items():
+                s = stats.setdefault(name, {'evaluated': 0, 'agreed': 0, 'top_k_overlap_total': 0.0,
+                                            'over_budget': 0, 'errors': 0, 'latency_ms': []})
+                if d['status'] == 'error':
+                    s['errors'] += 1
+                    continue
+                s['latency_ms'].append(d['latency_ms'])
+                if d['status'] == 'over_budget':
+                    s['over_budget'] += 1
+                    continue
+                s['evaluated'] += 1
+                s['agreed'] += d['agree']
+                s['top_k_overlap_total'] += d['top_k_overlap'] or 0.0
+
+    print(f"\nShadow log: {args.log} ({tickets} tickets)")
+    print(f"{'Scorer':<20} {'N':>7} {'Agree':>8} {'Top-k':>8} {'p50 ms':>9} {'p95 ms':>9} {'Over':>6} {'Err':>5}")
+    print("─" * 78)
+    for name, s in stats.items():
+        r = _summarize(s)
+        fmt = lambda x, spec: format(x, spec) if x is not None else '-'
+        print(f"{name:<20} {r['evaluated']:>7} {fmt(r['agreement_rate'], '>8.2%')} "
+              f"{fmt(r['top_k_overlap'], '>8.2%')} {fmt(r['latency_ms_p50'], '>9.3f')} "
+              f"{fmt(r['latency_ms_p95'], '>9.3f')} {r['over_budget']:>6} {r['errors']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+SHARDED ENGINEER INDEX
+Centroid dan tag index engineer dipartisi per engineer ke beberapa worker
+process lokal. Query tiket dikirim ke semua shard sekaligus (scatter), tiap
+shard menghitung kandidat tag index dan cosine similarity untuk engineer
+miliknya, lalu hasil per shard di-merge (gather). Waktu scoring per tiket
+tetap rata walaupun roster membesar karena tiap shard hanya menghitung
+sebagian engineer, paralel di core berbeda.
+
+Setiap request memakai satu channel (satu pipe per shard) dari pool, sehingga
+request bersamaan tidak menunggu seluruh scatter-gather request lain.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import weakref
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from batch_solver import top_k_candidates
+
+
+def _top_k(values, k):
+    """Indeks top-k (urut menurun) dari array 1D"""
+    idx = top_k_candidates(values[None, :], k)[0]
+    return idx[np.argsort(-values[idx], kind='stable')]
+
+
+def _shard_query(centroids, tag_index, offset, k, max_candidates, v, terms, use_tag_index,
+                 eligible=None):
+    """
+    Scoring satu query di satu shard
+
+    eligible: mask bool baris shard (engineer available); full scan hanya
+    me-ranking baris eligible
+
+    Returns:
+        use_tag_index: (jumlah kandidat tag index, top max_candidates kandidat
+            shard sebagai baris global, skor profile, cosine); cosine hanya
+            dihitung untuk kandidat
+        selain itu: top-k cosine full scan shard (baris global, cosine)
+    """
+    if use_tag_index:
+        postings = tag_index[terms]
+        cand = np.unique(postings.indices)
+        n_candidates = len(cand)
+        profile = np.asarray(postings.sum(axis=0)).ravel()[cand]
+        if max_candidates and n_candidates > max_candidates:
+            keep = np.argsort(-profile, kind='stable')[:max_candidates]
+            cand, profile = cand[keep], profile[keep]
+        sims = (centroids[cand] @ v.T).toarray().ravel()
+        return n_candidates, cand + offset, profile, sims
+
+    sims = (centroids @ v.T).toarray().ravel()
+    if eligible is not None:
+        sims[~eligible] = -np.inf
+    top = _top_k(sims, min(k, len(sims)))
+    if eligible is not None:
+        top = top[eligible[top]]
+    return top + offset, sims[top]
+
+
+def _shard_worker(conns, centroids, tag_index, offset, k, max_candidates):
+    """
+    Loop worker satu shard: melayani semua channel sampai semuanya ditutup
+
+    Pesan: (query CSR 1 x vocab, term id tiket, use_tag_index, eligible),
+    lihat _shard_query.
+    """
+    active = list(conns)
+    while active:
+        for conn in wait(active):
+            try:
+                msg = conn.recv()
+            except EOFError:
+                msg = None
+            if msg is None:
+                active.remove(conn)
+                conn.close()
+                continue
+            conn.send(_shard_query(centroids, tag_index, offset, k, max_candidates, *msg))
+
+
+def _shutdown(conns, procs):
+    for conn in conns:
+        try:
+            conn.send(None)
+            conn.close()
+        except (OSError, EOFError):
+            pass
+    for proc in procs:
+        proc.join(timeout=1)
+        if proc.is_alive():
+            proc.terminate()
+
+
+class ShardedEngineerIndex:
+    """
+    Scatter-gather matching tiket terhadap centroid + tag index engineer
+
+    Args:
+        centroid_matrix: CSR (engineers x vocab), baris sudah L2-normalized
+        tag_index: CSR (vocab x engineers) skor profile per tag
+        n_shards: jumlah worker process
+        k: top-k full scan per shard dan hasil merge
+        min_candidates, max_candidates: aturan pruning tag index
+            (sama dengan TSMCalculator.candidate_rows)
+        channels: jumlah request yang boleh scatter-gather bersamaan
+
+    Worker hanya dipakai dari process yang membuatnya; process hasil fork
+    (mis. worker bulk mode) scoring lokal, karena pipe ke shard tidak boleh
+    dipakai bersama.
+    """
+
+    def __init__(self, centroid_matrix, tag_index, n_shards, k, min_candidates, max_candidates,
+                 channels=4):
+        n_rows = centroid_matrix.shape[0]
+        self.n_shards = max(1, min(n_shards, n_rows))
+        self.k = k
+        self.min_candidates = min_candidates
+        self.max_candidates = max_candidates
+        self.channels = max(1, channels)
+        self.owner_pid = os.getpid()
+        self._lock = threading.Lock()
+        self.stats = {'queries': 0, 'fallback_rounds': 0, 'seconds_total': 0.0}
+
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        bounds = np.linspace(0, n_rows, self.n_shards + 1).astype(np.int64)
+        self._bounds = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self.shard_sizes = np.diff(bounds).tolist()
+        tag_index = tag_index.tocsc()
+        # _channels[c][s]: pipe channel c ke shard s
+        self._channels = [[] for _ in range(self.channels)]
+        self._procs = []
+        for start, end in self._bounds:
+            pipes = [ctx.Pipe() for _ in range(self.channels)]
+            proc = ctx.Process(
+                target=_shard_worker,
+                args=([child for _, child in pipes], centroid_matrix[start:end],
+                      tag_index[:, start:end].tocsr(), start, k, max_candidates),
+                name=f'engineer-shard-{start}', daemon=True
+            )
+            proc.start()
+            for c, (parent, child) in enumerate(pipes):
+                child.close()
+                self._channels[c].append(parent)
+            self._procs.append(proc)
+        self._free = queue.Queue()
+        for c in range(self.channels):
+            self._free.put(c)
+
+        # Worker dihentikan saat index dibuang (mis. snapshot lama setelah reload)
+        conns = [conn for channel in self._channels for conn in channel]
+        self._finalizer = weakref.finalize(self, _shutdown, conns, self._procs)
+
+    @property
+    def usable(self):
+        return os.getpid() == self.owner_pid and self._finalizer.alive
+
+    def _scatter(self, msgs):
+        """Kirim pesan per shard lewat satu channel bebas dan kumpulkan hasilnya"""
+        c = self._free.get()
+        try:
+            channel = self._channels[c]
+            for conn, msg in zip(channel, msgs):
+                conn.send(msg)
+            return [conn.recv() for conn in channel]
+        finally:
+            self._free.put(c)
+
+    def match(self, v, terms, use_tag_index=True, eligible=None):
+        """
+        Cosine similarity satu tiket dari semua shard
+
+        Dengan use_tag_index shard hanya menghitung cosine kandidat; jika total
+        kandidat kurang dari min_candidates, putaran kedua full scan.
+
+        Args:
+            v: CSR (1 x vocab) query TF-IDF
+            terms: list term id (kolom TF-IDF) dari token tiket
+            eligible: mask bool per baris centroid_matrix (engineer available);
+                top-k full scan hanya dari baris eligible, sehingga engineer
+                tidak available tidak menggeser engineer available keluar top-k
+        Returns:
+            (baris centroid_matrix, cosine similarity, pruned): kandidat tag
+            index jika pruned, selain itu top-k full scan
+        """
+        v = v.astype(np.float32)
+        terms = np.asarray(terms, dtype=np.int64)
+        started = time.perf_counter()
+
+        pruned = False
+        if use_tag_index:
+            parts = self._scatter([(v, terms, True)] * self.n_shards)
+            pruned = sum(p[0] for p in parts) >= self.min_candidates
+        if pruned:
+            # Top max_candidates global pasti termasuk top max_candidates tiap shard
+            rows = np.concatenate([p[1] for p in parts])
+            profile = np.concatenate([p[2] for p in parts])
+            sims = np.concatenate([p[3] for p in parts])
+            order = np.argsort(-profile, kind='stable')
+            if self.max_candidates:
+                order = order[:self.max_candidates]
+        else:
+            parts = self._scatter([
+                (v, terms, False, None if eligible is None else eligible[start:end])
+                for start, end in self._bounds
+            ])
+            rows = np.concatenate([p[0] for p in parts])
+            sims = np.concatenate([p[1] for p in parts])
+            order = _top_k(sims, min(self.k, len(sims)))
+
+        with self._lock:
+            self.stats['queries'] += 1
+            self.stats['fallback_rounds'] += use_tag_index and not pruned
+            self.stats['seconds_total'] += time.perf_counter() - started
+        return rows[order], sims[order], pruned
+
+    def info(self):
+        with self._lock:
+            q = self.stats['queries']
+            return {
+                'shards': self.n_shards,
+                'shard_sizes': self.shard_sizes,
+                'channels': self.channels,
+                'k': self.k,
+                'queries': q,
+                'fallback_rounds': self.stats['fallback_rounds'],
+                'mean_ms': round(self.stats['seconds_total'] * 1000 / q, 3) if q else None
+            }
+
+    def close(self):
+        self._finalizer()
@@ -0,0 +1,609 @@
+"""
+SHARED CACHE
+Cache hasil antara (stem hasil preprocessing, vector TF-IDF, hasil CRI, roster)
+yang bisa dipakai bersama oleh beberapa replica ai_service. Tiga backend:
+- memory: in-process (LRU dengan batas bytes)
+- shm: shared memory antar worker process di satu host (slot table, lock-free)
+- kv: key-value lewat jaringan dengan protokol Redis (RESP); KVStandIn
+  adalah server pengganti lokal untuk development/pengujian
+Semua backend menyimpan bytes dengan TTL; sparse vector di-encode biner
+(indptr/indices int32, data float32), nilai lain JSON.
+
+Usage:
+    python shared_cache.py --serve-kv [--host 127.0.0.1] [--port 6380]
+    python shared_cache.py --check    # self-check ketiga backend (KVStandIn port ephemeral)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+from serialization import dumps_json
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+_SPARSE, _JSON, _TEXT = b'S', b'J', b'T'
+_SPARSE_HEADER = struct.Struct('<III')  # rows, cols, nnz
+
+
+def encode_value(obj):
+    """Encode nilai cache ke bytes (tag 1 byte + payload)"""
+    if issparse(obj):
+        m = obj.tocsr()
+        return b''.join([
+            _SPARSE,
+            _SPARSE_HEADER.pack(m.shape[0], m.shape[1], m.nnz),
+            m.indptr.astype('<i4').tobytes(),
+            m.indices.astype('<i4').tobytes(),
+            m.data.astype('<f4').tobytes()
+        ])
+    if isinstance(obj, str):
+        return _TEXT + obj.encode('utf-8')
+    return _JSON + dumps_json(obj)
+
+
+def decode_value(raw):
+    tag, body = raw[:1], memoryview(raw)[1:]
+    if tag == _TEXT:
+        return bytes(body).decode('utf-8')
+    if tag == _JSON:
+        return json.loads(bytes(body))
+    if tag == _SPARSE:
+        rows, cols, nnz = _SPARSE_HEADER.unpack_from(body)
+        offset = _SPARSE_HEADER.size
+        indptr = np.frombuffer(body, '<i4', rows + 1, offset)
+        offset += indptr.nbytes
+        indices = np.frombuffer(body, '<i4', nnz, offset)
+        offset += indices.nbytes
+        data = np.frombuffer(body, '<f4', nnz, offset)
+        return csr_matrix((data.copy(), indices.copy(), indptr.copy()), shape=(rows, cols))
+    raise ValueError(f"unknown cache value tag {tag!r}")
+
+
+# =============================================================================
+# BACKENDS (bytes -> bytes)
+# =============================================================================
+class InProcessBackend:
+    """LRU in-process dengan batas total bytes (key + value)"""
+
+    name = 'memory'
+
+    def __init__(self, max_bytes=32 << 20):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.stats = {'evictions': 0, 'too_large': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            self.stats['too_large'] += 1
+            return
+        expires = time.time() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+            self._entries[key] = (expires, value)
+            self._bytes += size
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+    def info(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, **self.stats}
+
+
+class SharedMemoryBackend:
+    """
+    Slot table di multiprocessing.shared_memory, dipakai bersama semua process
+    di host yang membuka nama yang sama
+
+    Direct-mapped: key di-hash ke satu slot, entry lama di slot itu tertimpa.
+    Tanpa lock antar process; setiap slot membawa CRC sehingga tulisan yang
+    bertabrakan / terbaca setengah dianggap miss. Nilai yang lebih besar dari
+    slot tidak di-cache.
+    """
+
+    name = 'shm'
+    # digest key, expires (epoch detik, 0 = tanpa TTL), panjang payload, crc32
+    _HEADER = struct.Struct('<16sdII')
+
+    def __init__(self, name='ai_service_cache', slots=8192, slot_bytes=4096):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.max_value = slot_bytes - self._HEADER.size
+        size = slots * slot_bytes
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.owner = True
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self._untrack()
+        if self._shm.size < size:
+            raise ValueError(f"shared memory {name} is smaller than slots x slot_bytes")
+        self._buf = self._shm.buf
+        self.stats = {'too_large': 0, 'torn': 0}
+
+    def _untrack(self, register=False):
+        """
+        Segmen tidak didaftarkan ke resource_tracker: cache tetap hidup walaupun
+        worker yang membuatnya exit; hapus eksplisit dengan close(unlink=True)
+        """
+        try:
+            from multiprocessing import resource_tracker
+            if register:
+                # unlink() akan unregister sendiri
+                resource_tracker.register(self._shm._name, 'shared_memory')
+            else:
+                resource_tracker.unregister(self._shm._name, 'shared_memory')
+        except Exception:
+            pass
+
+    def _slot(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        return digest, (int.from_bytes(digest[:8], 'little') % self.slots) * self.slot_bytes
+
+    def get(self, key):
+        digest, offset = self._slot(key)
+        header = bytes(self._buf[offset:offset + self._HEADER.size])
+        stored, expires, length, crc = self._HEADER.unpack(header)
+        if stored != digest or length > self.max_value:
+            return None
+        start = offset + self._HEADER.size
+        value = bytes(self._buf[start:start + length])
+        if zlib.crc32(header[:-4] + value) != crc:
+            self.stats['torn'] += 1
+            return None
+        if expires and expires < time.time():
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        if len(value) > self.max_value:
+            self.stats['too_large'] += 1
+            return
+        digest, offset = self._slot(key)
+        head = self._HEADER.pack(digest, time.time() + ttl if ttl else 0.0, len(value), 0)[:-4]
+        crc = zlib.crc32(head + value)
+        start = offset + self._HEADER.size
+        self._buf[start:start + len(value)] = value
+        self._buf[offset:start] = head + struct.pack('<I', crc)
+
+    def delete(self, key):
+        digest, offset = self._slot(key)
+        if bytes(self._buf[offset:offset + 16]) == digest:
+            self._buf[offset:offset + 16] = bytes(16)
+
+    def info(self):
+        return {'name': self._shm.name, 'slots': self.slots, 'slot_bytes': self.slot_bytes,
+                'owner': self.owner, **self.stats}
+
+    def close(self, unlink=False):
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._untrack(register=True)
+            self._shm.unlink()
+
+
+class NetworkBackend:
+    """
+    Client key-value protokol Redis (GET / SET PX / DEL)
+
+    Kegagalan jaringan diperlakukan sebagai miss; setelah error, backend
+    dilewati selama retry_after detik agar jalur request tidak ikut lambat.
+    """
+
+    name = 'kv'
+
+    def __init__(self, host='127.0.0.1', port=6379, timeout=0.05, retry_after=5.0):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._sock = None
+        self._reader = None
+        self._pid = None
+        self._down_until = 0.0
+        self.stats = {'errors': 0, 'skipped': 0}
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock, self._reader, self._pid = sock, sock.makefile('rb'), os.getpid()
+
+    def _disconnect(self):
+        for f in (self._reader, self._sock):
+            try:
+                if f is not None:
+                    f.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('connection closed')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest
+        if kind == b'-':
+            raise RuntimeError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            n = int(rest)
+            if n < 0:
+                return None
+            data = self._reader.read(n + 2)
+            return data[:-2]
+        if kind == b'*':
+            return [self._read_reply() for _ in range(int(rest))]
+        raise ConnectionError(f'bad reply {line!r}')
+
+    def _command(self, *args):
+        if time.monotonic() < self._down_until:
+            self.stats['skipped'] += 1
+            return None
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            arg = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        with self._lock:
+            try:
+                if self._sock is None or self._pid != os.getpid():
+                    self._connect()
+                self._sock.sendall(b''.join(parts))
+                return self._read_reply()
+            except (OSError, ConnectionError, RuntimeError, ValueError):
+                self.stats['errors'] += 1
+                self._disconnect()
+                self._down_until = time.monotonic() + self.retry_after
+                return None
+
+    def get(self, key):
+        return self._command(b'GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self._command(b'SET', key, value, b'PX', int(ttl * 1000))
+        else:
+            self._command(b'SET', key, value)
+
+    def delete(self, key):
+        self._command(b'DEL', key)
+
+    def info(self):
+        return {'address': f"{self.address[0]}:{self.address[1]}",
+                'available': time.monotonic() >= self._down_until, **self.stats}
+
+
+# =============================================================================
+# FACADE
+# =============================================================================
+class SharedCache:
+    """
+    Cache bernamespace di atas satu backend
+
+    Args:
+        backend: InProcessBackend / SharedMemoryBackend / NetworkBackend
+        ttl: {namespace: detik}; namespace yang tidak ada memakai ttl['default']
+        prefix: prefix key (pisahkan deployment yang berbagi backend)
+    Key di-hash (sha1) sehingga panjangnya tetap dan aman untuk semua backend.
+    """
+
+    def __init__(self, backend, ttl=None, prefix='ai:'):
+        self.backend = backend
+        self.ttl = dict(ttl or {})
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def _key(self, namespace, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return f"{self.prefix}{namespace}:{digest}".encode()
+
+    def _count(self, namespace, field):
+        with self._lock:
+            s = self.stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'sets': 0})
+            s[field] += 1
+
+    def get(self, namespace, key):
+        raw = self.backend.get(self._key(namespace, key))
+        if raw is None:
+            self._count(namespace, 'misses')
+            return None
+        try:
+            value = decode_value(raw)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            self._count(namespace, 'misses')
+            return None
+        self._count(namespace, 'hits')
+        return value
+
+    def set(self, namespace, key, value):
+        self.backend.set(self._key(namespace, key), encode_value(value),
+                         self.ttl.get(namespace, self.ttl.get('default')))
+        self._count(namespace, 'sets')
+
+    def delete(self, namespace, key):
+        self.backend.delete(self._key(namespace, key))
+
+    def get_or_compute(self, namespace, key, compute):
+        value = self.get(namespace, key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(namespace, key, value)
+        return value
+
+    def info(self):
+        with self._lock:
+            namespaces = {ns: dict(s) for ns, s in self.stats.items()}
+        return {'backend': self.backend.name, **self.backend.info(), 'namespaces': namespaces}
+
+
+def make_cache(cfg):
+    """SharedCache dari CONFIG['shared_cache'], None jika backend None"""
+    backend = cfg.get('backend')
+    if backend is None:
+        return None
+    if backend == 'memory':
+        store = InProcessBackend(cfg['max_bytes'])
+    elif backend == 'shm':
+        store = SharedMemoryBackend(**cfg['shm'])
+    elif backend == 'kv':
+        store = NetworkBackend(**cfg['kv'])
+    else:
+        raise ValueError(f"unknown shared_cache backend {backend!r}")
+    return SharedCache(store, cfg.get('ttl_seconds'), cfg.get('prefix', 'ai:'))
+
+
+# =============================================================================
+# KV STAND-IN (subset protokol Redis untuk development/pengujian)
+# =============================================================================
+class _KVHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            self.wfile.write(server.execute(args))
+            self.wfile.flush()
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if line[:1] != b'*':
+            raise ValueError('expected array')
+        args = []
+        for _ in range(int(line[1:-2])):
+            n = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(n + 2)[:-2])
+        return args
+
+
+class KVStandIn(socketserver.ThreadingTCPServer):
+    """Server key-value lokal: GET, SET [EX|PX], DEL, PING, DBSIZE, FLUSHALL"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=6380):
+        super().__init__((host, port), _KVHandler)
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def execute(self, args):
+        cmd = args[0].upper()
+        now = time.time()
+        with self._lock:
+            if cmd == b'PING':
+                return b'+PONG\r\n'
+            if cmd == b'GET':
+                entry = self._data.get(args[1])
+                if entry is None or (entry[0] and entry[0] < now):
+                    self._data.pop(args[1], None)
+                    return b'$-1\r\n'
+                return b'$%d\r\n%s\r\n' % (len(entry[1]), entry[1])
+            if cmd == b'SET':
+                expires = 0
+                if len(args) >= 5 and args[3].upper() in (b'EX', b'PX'):
+                    scale = 1 if args[3].upper() == b'EX' else 1000
+                    expires = now + int(args[4]) / scale
+                self._data[args[1]] = (expires, args[2])
+                return b'+OK\r\n'
+            if cmd == b'DEL':
+                removed = sum(self._data.pop(k, None) is not None for k in args[1:])
+                return b':%d\r\n' % removed
+            if cmd == b'DBSIZE':
+                return b':%d\r\n' % len(self._data)
+            if cmd == b'FLUSHALL':
+                self._data.clear()
+                return b'+OK\r\n'
+        return b'-ERR unknown command\r\n'
+
+
+# =============================================================================
+# SELF-CHECK
+# =============================================================================
+def _start_stand_in(port=0):
+    server = KVStandIn('127.0.0.1', port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _check_backend(backend, expect_eviction):
+    """Round-trip, TTL, delete dan eviction lewat SharedCache; list (nama cek, lolos)"""
+    results = []
+    cache = SharedCache(backend, {'default': None, 'short': 0.2}, prefix=f'check-{os.getpid()}:')
+    vector = csr_matrix(np.array([[0, 0.5, 0, 0.25]], dtype=np.float32))
+    values = {'sparse': vector, 'json': {'risk_level': 'HIGH', 'cri': 0.81, 'terms': ['vpn', 'server']},
+              'text': 'server down tidak bisa akses vpn'}
+
+    for kind, value in values.items():
+        cache.set('check', kind, value)
+        got = cache.get('check', kind)
+        if kind == 'sparse':
+            ok = got is not None and got.shape == vector.shape and (got != vector).nnz == 0
+        else:
+            ok = got == value
+        results.append((f'round-trip {kind}', ok))
+
+    cache.set('short', 'ttl', 'expires')
+    fresh = cache.get('short', 'ttl') == 'expires'
+    time.sleep(0.3)
+    results.append(('ttl', fresh and cache.get('short', 'ttl') is None))
+
+    cache.delete('check', 'text')
+    results.append(('delete', cache.get('check', 'text') is None))
+
+    if expect_eviction:
+        # Backend check dibuat kecil: tidak semua 64 entry muat, yang terakhir pasti ada
+        for i in range(64):
+            cache.set('fill', str(i), 'x' * 256)
+        kept = sum(cache.get('fill', str(i)) is not None for i in range(64))
+        results.append(('eviction', kept < 64 and cache.get('fill', '63') == 'x' * 256))
+    return results
+
+
+def self_check():
+    """
+    Cek ketiga backend: round-trip sparse / JSON / text, TTL, delete,
+    eviction (memory: LRU, shm: slot tertimpa) dan back-off NetworkBackend
+    saat server mati, memakai KVStandIn di port ephemeral
+
+    Returns:
+        True jika semua cek lolos
+    """
+    sections = {}
+
+    sections['memory'] = _check_backend(InProcessBackend(max_bytes=8 << 10), expect_eviction=True)
+
+    shm_name = f'ai_cache_check_{os.getpid()}'
+    shm = SharedMemoryBackend(shm_name, slots=8, slot_bytes=1024)
+    try:
+        results = _check_backend(shm, expect_eviction=True)
+        other = SharedMemoryBackend(shm_name, slots=8, slot_bytes=1024)
+        other.set(b'shared', b'from-other-process-handle')
+        results.append(('shared segment', shm.get(b'shared') == b'from-other-process-handle'))
+        other.close()
+
+        digest, offset = shm._slot(b'shared')
+        start = offset + shm._HEADER.size
+        shm._buf[start] ^= 0xFF  # payload rusak: CRC gagal -> miss
+        results.append(('torn slot is a miss', shm.get(b'shared') is None and shm.stats['torn'] == 1))
+        shm.set(b'big', b'x' * 2048)
+        results.append(('too large not cached', shm.get(b'big') is None))
+    finally:
+        shm.close(unlink=True)
+    sections['shm'] = results
+
+    server = _start_stand_in()
+    port = server.server_address[1]
+    kv = NetworkBackend('127.0.0.1', port, timeout=0.2, retry_after=0.3)
+    try:
+        results = _check_backend(kv, expect_eviction=False)
+        results.append(('ping', kv._command(b'PING') == b'PONG'))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Server mati: miss + error sekali, lalu dilewati sampai retry_after habis
+    kv._disconnect()
+    down = kv.get(b'anything') is None and kv.stats['errors'] >= 1
+    errors = kv.stats['errors']
+    skipped = kv.get(b'anything') is None and kv.stats['skipped'] >= 1 and kv.stats['errors'] == errors
+    results.append(('down server is a miss', down))
+    results.append(('back-off while down', skipped and not kv.info()['available']))
+
+    server = _start_stand_in(port)
+    try:
+        time.sleep(0.35)
+        kv.set(b'back', b'up')
+        results.append(('recovers after retry_after', kv.get(b'back') == b'up'))
+    finally:
+        server.shutdown()
+        server.server_close()
+        kv._disconnect()
+    sections['kv'] = results
+
+    passed = True
+    for backend, results in sections.items():
+        print(f"\n{backend}")
+        for name, ok in results:
+            print(f"  {'✓' if ok else '✗'} {name}")
+            passed &= bool(ok)
+    print(f"\n{'✓ All backend checks passed' if passed else '✗ Backend checks failed'}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared cache utilities")
+    parser.add_argument('--serve-kv', action='store_true', help="Jalankan KV stand-in server")
+    parser.add_argument('--check', action='store_true', help="Self-check semua backend")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6380)
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(0 if self_check() else 1)
+    if args.serve_kv:
+        server = KVStandIn(args.host, args.port)
+        print(f"✓ KV stand-in listening on {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+SINGLE-FLIGHT
+Deduplikasi komputasi yang sedang berjalan: request identik yang datang
+bersamaan menunggu hasil dari pemanggil pertama, tidak menghitung ulang.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalescing per key untuk pemanggilan yang sedang in-flight"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = {'calls': 0, 'computations': 0, 'coalesced': 0}
+
+    def do(self, key, fn):
+        """
+        Jalankan fn() sekali per key yang sedang in-flight
+
+        Returns:
+            (result, shared) - shared True jika hasil diambil dari pemanggil lain
+        """
+        with self._lock:
+            self.stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['computations'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def snapshot(self):
+        """Salinan metrics beserta jumlah key yang sedang in-flight"""
+        with self._lock:
+            return {**self.stats, 'in_flight': len(self._calls)}
@@ -0,0 +1,248 @@
+"""
+COMPACT VOCABULARY & QUERY VECTORIZER
+Vocabulary TF-IDF yang dipangkas ke term dengan massa centroid non-zero,
+plus vectorizer minimal untuk satu tiket yang membangun query vector
+L2-normalized langsung dari token hasil preprocess_text, tanpa validasi dan
+analyzer per panggilan TfidfVectorizer.transform. Hasilnya identik dengan
+tfidf.transform (kolom dipetakan ke vocabulary compact).
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def tfidf_idf(tfidf):
+    """idf TfidfVectorizer; artifact dari scikit-learn < 1.5 hanya menyimpan _idf_diag"""
+    try:
+        return np.asarray(tfidf.idf_, dtype=np.float64)
+    except AttributeError:
+        return tfidf._tfidf._idf_diag.diagonal().astype(np.float64)
+
+
+def build_compact_vocabulary(tfidf, centroid_matrix):
+    """
+    Export vocabulary compact dari TfidfVectorizer yang sudah di-fit
+
+    Args:
+        tfidf: TfidfVectorizer (norm l2, unigram, use_idf)
+        centroid_matrix: (engineers x vocab) centroid di kolom TF-IDF asli
+    Returns:
+        dict berisi:
+        - columns: term -> kolom compact
+        - idf: ndarray idf per kolom compact
+        - source_columns: kolom compact -> kolom TF-IDF asli
+        - norm_only: term -> (kolom asli, idf) untuk term tanpa massa centroid;
+          tidak punya kolom tapi tetap dihitung di norm L2 query agar cosine
+          tidak berubah
+        - token_pattern, lowercase, n_features: parameter analyzer asli
+    """
+    if tfidf.ngram_range != (1, 1) or tfidf.norm != 'l2' or not tfidf.use_idf \
+            or tfidf.sublinear_tf or tfidf.binary or tfidf.analyzer != 'word':
+        raise ValueError("compact vocabulary requires a unigram l2-normalized TF-IDF with idf")
+
+    idf = tfidf_idf(tfidf)
+    mass = np.asarray(abs(centroid_matrix).sum(axis=0)).ravel()
+    keep = np.flatnonzero(mass > 0)
+    compact = {int(orig): col for col, orig in enumerate(keep.tolist())}
+
+    columns, norm_only = {}, {}
+    for term, orig in tfidf.vocabulary_.items():
+        col = compact.get(int(orig))
+        if col is None:
+            norm_only[term] = (int(orig), float(idf[orig]))
+        else:
+            columns[term] = col
+
+    return {
+        'columns': columns,
+        'idf': idf[keep],
+        'source_columns': keep.astype(np.int64),
+        'norm_only': norm_only,
+        'token_pattern': tfidf.token_pattern,
+        'lowercase': tfidf.lowercase,
+        'n_features': len(tfidf.vocabulary_)
+    }
+
+
+def vocabulary_matches(vocabulary, tfidf):
+    """True jika vocabulary compact dibuat dari TfidfVectorizer yang sama"""
+    if vocabulary.get('n_features') != len(tfidf.vocabulary_):
+        return False
+    source = vocabulary['source_columns']
+    vocab = tfidf.vocabulary_
+    if any(vocab.get(term) != source[col] for term, col in vocabulary['columns'].items()):
+        return False
+    return np.array_equal(vocabulary['idf'], tfidf_idf(tfidf)[source])
+
+
+class QueryVectorizer:
+    """
+    TF-IDF query vector dari vocabulary compact
+
+    Tokenisasi sama dengan analyzer TfidfVectorizer (lowercase + token_pattern);
+    tf mentah x idf, lalu L2 normalize dengan urutan penjumlahan kolom asli
+    seperti sklearn sehingga nilainya bit-identical.
+    """
+
+    def __init__(self, vocabulary):
+        self.columns = vocabulary['columns']
+        self.idf = vocabulary['idf'].tolist()
+        self.source_columns = vocabulary['source_columns'].tolist()
+        self.norm_only = vocabulary['norm_only']
+        self.lowercase = vocabulary['lowercase']
+        self.n_columns = len(self.idf)
+        # Kolom compact -> term (untuk penjelasan kontribusi term)
+        self.terms = [None] * self.n_columns
+        for term, col in self.columns.items():
+            self.terms[col] = term
+        self._token_re = re.compile(vocabulary['token_pattern'])
+        
+        # Identitas vocabulary (mis. untuk key cache query vector)
+        digest = hashlib.sha1(vocabulary['idf'].tobytes())
+        digest.update(vocabulary['source_columns'].tobytes())
+        digest.update(repr(sorted(self.columns.items())).encode())
+        digest.update(vocabulary['token_pattern'].encode())
+        self.fingerprint = digest.hexdigest()[:16]
+
+    def tokens(self, processed_text):
+        if self.lowercase:
+            processed_text = processed_text.lower()
+        return self._token_re.findall(processed_text)
+
+    def weights(self, processed_text):
+        """
+        Bobot L2-normalized query per kolom compact
+
+        Returns:
+            (list kolom compact, list bobot float64), urut kolom
+        """
+        entries = []
+        for term, count in Counter(self.tokens(processed_text)).items():
+            col = self.columns.get(term)
+            if col is not None:
+                entries.append((self.source_columns[col], col, count * self.idf[col]))
+            elif term in self.norm_only:
+                orig, idf = self.norm_only[term]
+                entries.append((orig, -1, count * idf))
+        if not entries:
+            return [], []
+
+        entries.sort()
+        norm = 0.0
+        for _, _, value in entries:
+            norm += value * value
+        norm = math.sqrt(norm)
+
+        cols, vals = [], []
+        for _, col, value in entries:
+            if col >= 0:
+                cols.append(col)
+                vals.append(value / norm)
+        return cols, vals
+
+    def transform_one(self, processed_text):
+        """CSR float32 (1 x kolom compact) untuk satu tiket"""
+        cols, vals = self.weights(processed_text)
+        return csr_matrix(
+            (np.array(vals, dtype=np.float32), np.array(cols, dtype=np.int32),
+             np.array([0, len(cols)], dtype=np.int32)),
+            shape=(1, self.n_columns)
+        )
+
+    def transform(self, processed_texts):
+        """CSR float32 (tickets x kolom compact) untuk banyak tiket"""
+        indptr, indices, data = [0], [], []
+        for text in processed_texts:
+            cols, vals = self.weights(text)
+            indices.extend(cols)
+            data.extend(vals)
+            indptr.append(len(indices))
+        return csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32),
+             np.array(indptr, dtype=np.int32)),
+            shape=(len(processed_texts), self.n_columns)
+        )
+
+    def term_columns(self, processed_text):
+        """Kolom compact dari token unik tiket (untuk tag index)"""
+        columns = self.columns
+        return [columns[tok] for tok in set(processed_text.split()) if tok in columns]
+
+
+def main():
+    """
+    Cek similarity identik dengan TfidfVectorizer.transform dan benchmark
+    mikrodetik per tiket
+
+    Usage:
+        python vectorizer.py [--texts FILE] [-n N]
+    FILE berisi satu teks hasil preprocess_text per baris; tanpa FILE dipakai
+    tiket sintetis dari term vocabulary.
+    """
+    import argparse
+    import time
+
+    from scipy.sparse import diags
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.preprocessing import normalize
+
+    from integrated_assignment import TSMCalculator
+
+    parser = argparse.ArgumentParser(description="Verify and benchmark the compact query vectorizer")
+    parser.add_argument('--texts', help="File teks hasil preprocess_text, satu per baris")
+    parser.add_argument('-n', type=int, default=2000, help="Jumlah tiket sintetis")
+    args = parser.parse_args()
+
+    tsm = TSMCalculator.__new__(TSMCalculator)
+    tsm._load_models()
+    tsm._stack_centroids()
+    tfidf, full_matrix = tsm.tfidf_obj, tsm.centroid_matrix
+    tsm._load_vocabulary()
+    vectorizer, compact_matrix = tsm.vectorizer, tsm.centroid_matrix
+
+    if args.texts:
+        with open(args.texts, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        rng = np.random.default_rng(0)
+        terms = np.array(sorted(tfidf.vocabulary_))
+        texts = [' '.join(rng.choice(terms, rng.integers(3, 30))) for _ in range(args.n)]
+
+    # Referensi: pipeline TfidfTransformer (count x idf lalu normalize l2);
+    # tfidf.transform sendiri mengabaikan idf jika artifact scikit-learn < 1.5
+    # di-load di versi yang lebih baru
+    idf_diag = diags(tfidf_idf(tfidf))
+
+    def reference(text):
+        counts = CountVectorizer.transform(tfidf, [text]).astype(np.float64)
+        return normalize(counts @ idf_diag, norm='l2').astype(np.float32)
+
+    mismatched = 0
+    for text in texts:
+        expected = (full_matrix @ reference(text).T).toarray()
+        actual = (compact_matrix @ vectorizer.transform_one(text).T).toarray()
+        mismatched += not np.array_equal(expected, actual)
+
+    def per_ticket_us(fn):
+        started = time.perf_counter()
+        for text in texts:
+            fn(text)
+        return (time.perf_counter() - started) / len(texts) * 1e6
+
+    sklearn_us = per_ticket_us(lambda t: tfidf.transform([t]))
+    compact_us = per_ticket_us(vectorizer.transform_one)
+
+    print(f"\nTickets: {len(texts)}")
+    print(f"Vocabulary: {vectorizer.n_columns}/{len(tfidf.vocabulary_)} terms")
+    print(f"{'✓' if mismatched == 0 else '✗'} Identical similarities: {len(texts) - mismatched}/{len(texts)}")
+    print(f"TfidfVectorizer.transform : {sklearn_us:8.1f} µs/ticket")
+    print(f"QueryVectorizer           : {compact_us:8.1f} µs/ticket ({sklearn_us / compact_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+WEIGHT SWEEP
+Evaluasi offline kombinasi bobot CRI, TSM dan seleksi terhadap assignee
+historis di Data Olah. Fitur CRI per tiket serta tensor skill, seniority dan
+workload (tickets x engineers) dihitung sekali; ribuan kombinasi bobot lalu
+di-score sebagai operasi NumPy batched dan dilaporkan top-k agreement-nya.
+
+Usage:
+    python weight_sweep.py [--samples N] [--vary tsm,cri,selection] [--out sweep.csv]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from build_models import TICKET_COLUMNS, load_ticket_history, preprocess_parallel
+from integrated_assignment import CONFIG, URGENCY_MAP, AIAssignmentSystem
+
+HISTORY_COLUMNS = {
+    **TICKET_COLUMNS,
+    'created': {'aliases': ['Created','created','Created Date','Tanggal','tanggal','Date'], 'dtype': 'category'},
+    'request_type': {'aliases': ['Request Name','Request Type','Tipe Request','request_type'], 'dtype': 'category'},
+    'urgency': {'aliases': ['Urgency','urgency','Priority','Prioritas'], 'dtype': 'category'},
+    'resolved': {'aliases': ['Resolved','Resolved Date','Resolution Date','Closed Date','Tanggal Selesai'], 'dtype': 'category'},
+}
+
+TSM_KEYS = ('skill', 'seniority', 'workload')
+CRI_KEYS = ('complexity', 'urgency', 'dependency', 'likelihood')
+RISK_LEVELS = ('LOW', 'MEDIUM', 'HIGH')
+
+
+# =============================================================================
+# TENSORS
+# =============================================================================
+def workload_from_counts(counts):
+    """
+    Versi vectorized calculate_workload untuk banyak baris sekaligus
+
+    counts: ndarray (rows x engineers) jumlah tiket open. Engineer tanpa tiket
+    mendapat 0.5 (default calculate_workload), sisanya 1 - min-max normalized.
+    """
+    counts = np.asarray(counts, dtype=np.float32)
+    has = counts > 0
+    lo = np.where(has, counts, np.inf).min(axis=1, keepdims=True)
+    hi = np.where(has, counts, -np.inf).max(axis=1, keepdims=True)
+    span = hi - lo
+
+    workload = np.full(counts.shape, 0.5, dtype=np.float32)
+    varied = has & (span > 0)
+    workload[varied] = 1 - ((counts - lo) / np.where(span > 0, span, 1))[varied]
+    return workload
+
+
+def rolling_open_counts(times, eng_idx, n_engineers, window):
+    """
+    Jumlah tiket per engineer yang dibuat dalam `window` sebelum tiap tiket
+
+    times harus terurut naik. Tiket itu sendiri tidak ikut dihitung.
+    """
+    onehot = np.zeros((len(times) + 1, n_engineers), dtype=np.int32)
+    onehot[np.arange(1, len(times) + 1), eng_idx] = 1
+    cumulative = np.cumsum(onehot, axis=0)
+    start = np.searchsorted(times, times - window, side='left')
+    return cumulative[np.arange(len(times))] - cumulative[start]
+
+
+def build_tensors(system, data_olah_path, workers=1):
+    """
+    Precompute semua input sweep dari tiket historis
+
+    Returns:
+        dict berisi cri_features (tickets x 4, sudah RobustScaler), skill dan
+        workload (tickets x engineers), seniority (engineers,), assignee
+        (tickets,) indeks engineer historis, plus parameter MinMaxScaler CRI.
+        Jika Data Olah punya timestamp, tiket diurutkan menurut waktu dibuat dan
+        dict juga berisi created dan resolved (datetime64, NaT jika tidak ada).
+    """
+    tsm = system.tsm_calculator
+    cri = system.cri_calculator
+    engineers = tsm.engineer_names
+
+    df, eng_col = load_ticket_history(data_olah_path, HISTORY_COLUMNS)
+    assignee = df[eng_col].astype(object).map(tsm.engineer_index)
+    df = df[assignee.notna()].reset_index(drop=True)
+    assignee = assignee.dropna().to_numpy(dtype=np.int64)
+    print(f"✓ {len(df)} historical tickets with a known engineer")
+
+    times = None
+    if 'created' in df:
+        times = pd.to_datetime(df['created'].astype(object), errors='coerce')
+        valid = times.notna().to_numpy()
+        order = np.argsort(times.to_numpy()[valid], kind='stable')
+        df = df[valid].reset_index(drop=True).iloc[order].reset_index(drop=True)
+        assignee = assignee[valid][order]
+        times = times[valid].to_numpy()[order]
+        resolved = np.full(len(times), np.datetime64('NaT'), dtype='datetime64[ns]')
+        if 'resolved' in df:
+            resolved = pd.to_datetime(df['resolved'].astype(object), errors='coerce').to_numpy()
+
+    # Skill: preprocessing paralel lalu satu sparse matmul
+    processed = preprocess_parallel(df['text_raw'].tolist(), workers)
+    skill = tsm.match_processed(processed)
+
+    # CRI features mengikuti calculate_cri, sebelum pembobotan
+    request_types = (df['request_type'].astype(object).fillna('General Request')
+                     if 'request_type' in df else pd.Series('General Request', index=df.index))
+    urgencies = (df['urgency'].astype(object).fillna('Medium').astype(str).str.title()
+                 if 'urgency' in df else pd.Series('Medium', index=df.index))
+    likelihood = {rt: cri.estimate_likelihood(str(rt)) for rt in request_types.unique()}
+    features = np.array([
+        [cri.estimate_complexity(text, urg), URGENCY_MAP.get(urg, 0.75),
+         cri.estimate_dependency(text), likelihood[rt]]
+        for text, urg, rt in zip(df['text_raw'], urgencies, request_types)
+    ], dtype=np.float64).reshape(-1, 4)
+    cri_features = cri.robust_scaler.transform(features)
+
+    # Seniority dari roster API (default 0.25 jika roster tidak tersedia)
+    df_employees = tsm.get_employees_from_api()
+    seniority = tsm.calculate_seniority(df_employees) if not df_employees.empty else {}
+    seniority = np.array([seniority.get(e, 0.25) for e in engineers], dtype=np.float32)
+
+    # Workload: tiket engineer dalam window sebelum tiket dibuat; tanpa timestamp
+    # pakai snapshot In Progress saat ini untuk semua tiket
+    if times is not None:
+        window = np.timedelta64(CONFIG['weight_sweep']['workload_window_days'], 'D')
+        counts = rolling_open_counts(times, assignee, len(engineers), window)
+    else:
+        open_counts = tsm.get_open_ticket_counts()
+        counts = np.array([[open_counts.get(e, 0) for e in engineers]])
+    workload = np.broadcast_to(workload_from_counts(counts), skill.shape)
+
+    tensors = {
+        'cri_features': cri_features.astype(np.float32),
+        'cri_scale': np.float32(cri.minmax_scaler.scale_[0]),
+        'cri_min': np.float32(cri.minmax_scaler.min_[0]),
+        'skill': skill.astype(np.float32),
+        'seniority': seniority,
+        'workload': np.ascontiguousarray(workload, dtype=np.float32),
+        'assignee': assignee,
+        'engineers': np.array(engineers, dtype=object)
+    }
+    if times is not None:
+        tensors['created'] = times
+        tensors['resolved'] = resolved
+    return tensors
+
+
+# =============================================================================
+# WEIGHT SETTINGS
+# =============================================================================
+def current_settings():
+    """Bobot CONFIG saat ini sebagai array (1 setting)"""
+    tsm_w = np.array([[CONFIG['tsm_weights'][k] for k in TSM_KEYS]])
+    cri_w = np.array([[CONFIG['cri_weights'][k] for k in CRI_KEYS]])
+    sel_w = np.array([[[CONFIG['selection_weights'][lvl][k] for k in TSM_KEYS]
+                       for lvl in RISK_LEVELS]])
+    return tsm_w, cri_w, sel_w
+
+
+def sample_settings(n, vary=('tsm', 'cri', 'selection'), seed=0):
+    """
+    Setting 0 = CONFIG saat ini, sisanya bobot acak (Dirichlet) untuk grup
+    di `vary`; grup lain tetap memakai CONFIG
+
+    Returns:
+        (tsm_w (n x 3), cri_w (n x 4), sel_w (n x levels x 3))
+    """
+    rng = np.random.default_rng(seed)
+    tsm_w, cri_w, sel_w = (np.repeat(w, n, axis=0) for w in current_settings())
+    if 'tsm' in vary:
+        tsm_w[1:] = rng.dirichlet(np.ones(len(TSM_KEYS)), n - 1)
+    if 'cri' in vary:
+        cri_w[1:] = rng.dirichlet(np.ones(len(CRI_KEYS)), n - 1)
+    if 'selection' in vary:
+        sel_w[1:] = rng.dirichlet(np.ones(len(TSM_KEYS)), (n - 1, len(RISK_LEVELS)))
+    return tsm_w, cri_w, sel_w
+
+
+def settings_to_config(tsm_w, cri_w, sel_w):
+    """Satu setting dalam format CONFIG (tsm_weights, cri_weights, selection_weights)"""
+    return {
+        'tsm_weights': {k: round(float(w), 4) for k, w in zip(TSM_KEYS, tsm_w)},
+        'cri_weights': {k: round(float(w), 4) for k, w in zip(CRI_KEYS, cri_w)},
+        'selection_weights': {
+            lvl: {k: round(float(w), 4) for k, w in zip(TSM_KEYS, sel_w[i])}
+            for i, lvl in enumerate(RISK_LEVELS)
+        }
+    }
+
+
+# =============================================================================
+# SWEEP
+# =============================================================================
+def score_settings(tensors, tsm_w, cri_w, sel_w, ks, top_k=None):
+    """
+    Top-k agreement setiap setting terhadap assignee historis
+
+    Per setting dan tiket, pipeline assign_engineer direplikasi: top-K TSM
+    sebagai kandidat, risk level dari CRI, lalu kandidat diurutkan dengan
+    bobot seleksi level tersebut. Agreement@k = assignee historis berada di
+    k teratas urutan itu.
+
+    Returns:
+        ndarray (settings x len(ks))
+    """
+    top_k = top_k or CONFIG['top_k_candidates']
+    skill, workload = tensors['skill'], tensors['workload']
+    seniority, assignee = tensors['seniority'], tensors['assignee']
+    n_tickets, n_engineers = skill.shape
+    top_k = min(top_k, n_engineers)
+    ks = np.asarray(ks)
+
+    chunk = max(1, CONFIG['weight_sweep']['chunk_elements'] // max(1, n_tickets * n_engineers))
+    ticket_idx = np.arange(n_tickets)[None, :, None]
+    agreement = np.zeros((len(tsm_w), len(ks)))
+
+    for start in range(0, len(tsm_w), chunk):
+        s = slice(start, start + chunk)
+        tw = tsm_w[s].astype(np.float32)
+
+        # TSM (settings x tickets x engineers) -> kandidat top-K
+        tsm = (tw[:, 0, None, None] * skill[None] +
+               tw[:, 1, None, None] * seniority[None, None, :] +
+               tw[:, 2, None, None] * workload[None])
+        cand = np.argpartition(-tsm, top_k - 1, axis=2)[:, :, :top_k]
+        del tsm
+
+        # Risk level per setting x tiket
+        cri = (cri_w[s].astype(np.float32) @ tensors['cri_features'].T)
+        cri = np.clip(cri * tensors['cri_scale'] + tensors['cri_min'], 0, 1)
+        level = (cri >= 0.3).astype(np.int64) + (cri >= 0.7)
+        w = np.take_along_axis(sel_w[s].astype(np.float32), level[:, :, None], axis=1)
+
+        # Selection score kandidat
+        score = (w[:, :, 0, None] * skill[ticket_idx, cand] +
+                 w[:, :, 1, None] * seniority[cand] +
+                 w[:, :, 2, None] * workload[ticket_idx, cand])
+
+        hit = cand == assignee[None, :, None]
+        own = np.where(hit, score, -np.inf).max(axis=2, keepdims=True)
+        # Skor sama: urut indeks engineer (seperti sort stabil)
+        ahead = (score > own) | ((score == own) & (cand < assignee[None, :, None]))
+        rank = ahead.sum(axis=2)
+        rank[~hit.any(axis=2)] = top_k
+        agreement[s] = (rank[:, :, None] < ks[None, None, :]).mean(axis=1)
+
+    return agreement
+
+
+def run_sweep(tensors, samples, vary, seed, ks):
+    """Sampling setting lalu score; return DataFrame hasil (baris 0 = CONFIG)"""
+    tsm_w, cri_w, sel_w = sample_settings(samples, vary, seed)
+    agreement = score_settings(tensors, tsm_w, cri_w, sel_w, ks)
+
+    columns = {f'tsm_{k}': tsm_w[:, i] for i, k in enumerate(TSM_KEYS)}
+    columns.update({f'cri_{k}': cri_w[:, i] for i, k in enumerate(CRI_KEYS)})
+    for li, lvl in enumerate(RISK_LEVELS):
+        columns.update({f'sel_{lvl.lower()}_{k}': sel_w[:, li, i] for i, k in enumerate(TSM_KEYS)})
+    columns.update({f'agreement_at_{k}': agreement[:, i] for i, k in enumerate(ks)})
+
+    df = pd.DataFrame(columns)
+    df.insert(0, 'is_current', np.arange(samples) == 0)
+    return df, (tsm_w, cri_w, sel_w)
+
+
+def main():
+    cfg = CONFIG['weight_sweep']
+    parser = argparse.ArgumentParser(description="Sweep CRI/TSM/selection weights against historical assignees")
+    parser.add_argument('--data-olah', default=CONFIG['data_olah'])
+    parser.add_argument('--data-cri', default=CONFIG['data_cri'])
+    parser.add_argument('--samples', type=int, default=cfg['samples'])
+    parser.add_argument('--seed', type=int, default=cfg['seed'])
+    parser.add_argument('--vary', default='tsm,cri,selection',
+                        help="Grup bobot yang di-sweep (tsm, cri, selection)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--tensors', help="File .npz untuk menyimpan/memakai ulang tensor precompute")
+    parser.add_argument('--out', help="Tulis hasil semua setting ke CSV")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    vary = tuple(v.strip() for v in args.vary.split(',') if v.strip())
+    ks = cfg['agreement_k']
+
+    print("\n" + "="*80)
+    print("WEIGHT SWEEP")
+    print("="*80)
+
+    started = time.perf_counter()
+    if args.tensors and os.path.exists(args.tensors):
+        tensors = dict(np.load(args.tensors, allow_pickle=True))
+        print(f"✓ Loaded tensors from {args.tensors}")
+    else:
+        system = AIAssignmentSystem(data_olah_path=args.data_olah, data_cri_path=args.data_cri)
+        tensors = build_tensors(system, args.data_olah, args.workers)
+        if args.tensors:
+            np.savez(args.tensors, **tensors)
+            print(f"✓ Saved tensors to {args.tensors}")
+    n_tickets, n_engineers = tensors['skill'].shape
+    print(f"✓ Tensors ready: {n_tickets} tickets x {n_engineers} engineers "
+          f"({time.perf_counter() - started:.1f}s)")
+
+    started = time.perf_counter()
+    df, settings = run_sweep(tensors, args.samples, vary, args.seed, ks)
+    elapsed = time.perf_counter() - started
+    print(f"✓ Scored {args.samples} settings in {elapsed:.2f}s "
+          f"({args.samples / elapsed:.0f} settings/s)")
+
+    metric = f'agreement_at_{ks[0]}'
+    agreement_cols = [f'agreement_at_{k}' for k in ks]
+    ranked = df.sort_values(metric, ascending=False, kind='stable')
+
+    print(f"\n{'─'*80}")
+    print("CURRENT CONFIG: " + "  ".join(f"@{k}={df.loc[0, c]:.4f}" for k, c in zip(ks, agreement_cols)))
+    print(f"TOP {args.top} SETTINGS by {metric}:")
+    for rank, (idx, row) in enumerate(ranked.head(args.top).iterrows(), 1):
+        marker = " (current)" if row['is_current'] else ""
+        print(f"{rank:>3}. #{idx:<6}" + "  ".join(f"@{k}={row[c]:.4f}" for k, c in zip(ks, agreement_cols)) + marker)
+    print(f"{'─'*80}")
+
+    best = int(ranked.index[0])
+    print("\nBest setting (CONFIG format):")
+    print(settings_to_config(*(w[best] for w in settings)))
+
+    if args.out:
+        df.to_csv(args.out, index=False)
+        print(f"\n✓ Wrote {len(df)} settings to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
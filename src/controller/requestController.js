@@ -1,5 +1,6 @@
 // src/controller/requestController.js
 const axios = require('axios');
+const crypto = require('crypto');
 const emailService = require('../services/emailService');
 const employees = require('../data/employees');
 
@@ -10,6 +11,43 @@ let lastRequest = null;
 
 // Config untuk Python AI Service
 const AI_SERVICE_URL = 'http://127.0.0.1:5000';
+// Latency budget /ai/assign saat submit form (AI service men-degrade scoring agar muat)
+const AI_ASSIGN_BUDGET_MS = Number(process.env.AI_ASSIGN_BUDGET_MS) || 3000;
+
+// Roster dikirim inline ke AI service agar Python tidak memanggil balik /api/employees.
+// Setelah satu versi diterima, request berikutnya cukup membawa roster_version.
+let aiRosterVersion = null;
+
+function buildAiRoster() {
+  return employees.map(e => ({
+    name: e.name,
+    years_of_service: e.years_of_service,
+    attendance: e.attendance
+  }));
+}
+
+async function postToAi(path, body, options) {
+  const roster = buildAiRoster();
+  const version = crypto.createHash('sha1').update(JSON.stringify(roster)).digest('hex').slice(0, 16);
+  const payload = version === aiRosterVersion
+    ? { ...body, roster_version: version }
+    : { ...body, roster, roster_version: version };
+
+  try {
+    const resp = await axios.post(`${AI_SERVICE_URL}${path}`, payload, options);
+    aiRosterVersion = version;
+    return resp;
+  } catch (err) {
+    // AI service restart / versi sudah dibuang dari cache: kirim ulang roster lengkap
+    const data = err.response && err.response.data;
+    if (err.response && err.response.status === 409 && data && data.code === 'roster_version_unknown'
+        && aiRosterVersion !== null) {
+      aiRosterVersion = null;
+      return postToAi(path, body, options);
+    }
+    throw err;
+  }
+}
 
 // POST /api/submit-request
 exports.submitRequest = async (req, res) => {
@@ -70,12 +108,13 @@ exports.submitRequest = async (req, res) => {
 
     // Call AI service synchronously for immediate assignment
     try {
-      const aiResp = await axios.post(
-        `${AI_SERVICE_URL}/ai/assign`,
+      const aiResp = await postToAi(
+        '/ai/assign',
         {
           ticket_text: newRequest.description || newRequest.title,
           request_type: newRequest.serviceTitle || newRequest.title,
-          urgency: (newRequest.urgency || 'medium').toLowerCase().replace(/^./, s => s.toUpperCase())
+          urgency: (newRequest.urgency || 'medium').toLowerCase().replace(/^./, s => s.toUpperCase()),
+          budget_ms: AI_ASSIGN_BUDGET_MS
         },
         { 
           timeout: 30000,
@@ -83,7 +122,7 @@ exports.submitRequest = async (req, res) => {
         }
       );
 
-      if (aiResp.data && aiResp.data.success && aiResp.data.data) {
+      if (aiResp.data && aiResp.data.success && aiResp.data.data && aiResp.data.data.selected_engineer) {
         const result = aiResp.data.data;
         
         newRequest.assignedTo = result.selected_engineer;
@@ -309,8 +348,8 @@ exports.aiRecommend = async (req, res) => {
       }))
     };
 
-    const aiResponse = await axios.post(
-      `${AI_SERVICE_URL}/ai/recommend-batch`,
+    const aiResponse = await postToAi(
+      '/ai/recommend-batch',
       {
         requests: aiRequestPayload.requests,
         apply: req.body?.apply === true
@@ -405,8 +444,8 @@ exports.aiAssignSingle = async (req, res) => {
 
     console.log(`\n🤖 Requesting AI assignment for: ${requestId}`);
 
-    const aiResponse = await axios.post(
-      `${AI_SERVICE_URL}/ai/assign`,
+    const aiResponse = await postToAi(
+      '/ai/assign',
       {
         ticket_text: request.description || request.title,
         request_type: request.serviceTitle || request.title,
@@ -751,4 +790,4 @@ module.exports = {
   manualAssignment: exports.manualAssignment,
   updateServiceCatalog: exports.updateServiceCatalog,
   getLastRequest: exports.getLastRequest
-};
\ No newline at end of file
+};
\ No newline at end of file